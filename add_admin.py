@@ -16,29 +16,28 @@ def add_admin(user_email, table_name, user_pool_id, profile=None):
     table = dynamodb.Table(table_name)
     
     try:
-        # Look up username by email
-        users = cognito.list_users(
-            UserPoolId=user_pool_id,
-            Filter=f'email = "{user_email}"'
-        )
-        
-        if not users['Users']:
-            print(f"✗ No user found with email {user_email}", file=sys.stderr)
-            return False
-        
-        username = users['Users'][0]['Username']
-        
-        # Get user's Cognito sub
-        response = cognito.admin_get_user(
-            UserPoolId=user_pool_id,
-            Username=username
-        )
-        
+        # Look up sub in the CoreTable email index first
         user_sub = None
-        for attr in response['UserAttributes']:
-            if attr['Name'] == 'sub':
-                user_sub = attr['Value']
-                break
+        index_item = table.get_item(
+            Key={'PK': f'EMAIL#{user_email.strip().lower()}', 'SK': 'USER'}
+        ).get('Item')
+        if index_item:
+            user_sub = index_item['userId']
+        else:
+            # Fall back to Cognito for users not yet indexed
+            users = cognito.list_users(
+                UserPoolId=user_pool_id,
+                Filter=f'email = "{user_email}"'
+            )
+            
+            if not users['Users']:
+                print(f"✗ No user found with email {user_email}", file=sys.stderr)
+                return False
+            
+            for attr in users['Users'][0]['Attributes']:
+                if attr['Name'] == 'sub':
+                    user_sub = attr['Value']
+                    break
         
         if not user_sub:
             print(f"✗ Could not find Cognito sub for {user_email}", file=sys.stderr)
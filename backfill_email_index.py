@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Backfill the EMAIL#<email> -> sub index and USER#<sub>/PROFILE items in CoreTable
+from every user in the Cognito user pool. Safe to re-run.
+Usage: python backfill_email_index.py --user-pool-id <pool_id> [--table-name TABLE_NAME] [--profile PROFILE]
+"""
+
+import argparse
+import boto3
+import sys
+from datetime import datetime, timezone
+
+
+def normalize_email(email):
+    """Match ddbHelper.CoreTableDyn.normalize_email."""
+    return (email or '').strip().lower()
+
+
+def backfill_email_index(table_name, user_pool_id, profile=None):
+    """Write index and profile items for all Cognito users."""
+    session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+    cognito = session.client('cognito-idp')
+    table = session.resource('dynamodb').Table(table_name)
+
+    indexed = 0
+    skipped = 0
+    updated_at = datetime.now(timezone.utc).isoformat()
+
+    try:
+        paginator = cognito.get_paginator('list_users')
+        with table.batch_writer(overwrite_by_pkeys=['PK', 'SK']) as batch:
+            for page in paginator.paginate(UserPoolId=user_pool_id):
+                for user in page['Users']:
+                    attributes = {attr['Name']: attr['Value'] for attr in user.get('Attributes', [])}
+                    sub = attributes.get('sub')
+                    email = attributes.get('email')
+                    if not sub or not email:
+                        skipped += 1
+                        continue
+
+                    full_name = f"{attributes.get('given_name', '')} {attributes.get('family_name', '')}".strip() or email
+                    batch.put_item(Item={
+                        'PK': f'EMAIL#{normalize_email(email)}',
+                        'SK': 'USER',
+                        'Type': 'UserEmail',
+                        'userId': sub,
+                        'email': email,
+                        'username': user['Username'],
+                        'fullName': full_name,
+                        'updatedAt': updated_at
+                    })
+                    batch.put_item(Item={
+                        'PK': f'USER#{sub}',
+                        'SK': 'PROFILE',
+                        'Type': 'UserProfile',
+                        'username': user['Username'],
+                        'email': email,
+                        'fullName': full_name,
+                        'updatedAt': updated_at
+                    })
+                    indexed += 1
+
+        print(f"✓ Indexed {indexed} users ({skipped} skipped without sub/email)")
+        return True
+    except Exception as e:
+        print(f"✗ Error after indexing {indexed} users: {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill the CoreTable email index from Cognito')
+    parser.add_argument('--table-name', default='msd-dev-CoreTable', help='DynamoDB table name')
+    parser.add_argument('--user-pool-id', required=True, help='Cognito User Pool ID')
+    parser.add_argument('--profile', help='AWS profile name')
+
+    args = parser.parse_args()
+
+    success = backfill_email_index(args.table_name, args.user_pool_id, args.profile)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark the runtime interval engine in layers/ec2Helper on synthetic
+timelines: pair N start/stop transitions into intervals, then summarize a
+month with daily and hourly buckets in a server timezone. No AWS access needed.
+Usage: python benchmark_runtime_summary.py [--transitions N] [--timezone TZ] [--repeat R] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'layers', 'ec2Helper'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'layers', 'clientHelper'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from ec2Helper import pair_runtime_transitions, summarize_runtime  # noqa: E402
+
+
+def synthetic_transitions(count, start_time, end_time, seed=42):
+    """Build count alternating start/stop points spread randomly over the window, oldest first."""
+    rng = random.Random(seed)
+    span = (end_time - start_time).total_seconds()
+    offsets = sorted(rng.uniform(0, span) for _ in range(count))
+    return [
+        {'s': 'StartInstances' if n % 2 == 0 else 'StopInstances',
+         'x': (start_time + timedelta(seconds=offset)).strftime('%Y-%m-%dT%H:%M:%SZ')}
+        for n, offset in enumerate(offsets)
+    ]
+
+
+def best_of(repeat, func):
+    """Run func repeat times and return (best seconds, last result)."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark runtime interval pairing and bucketing')
+    parser.add_argument('--transitions', type=int, default=10000, help='Synthetic transitions per timeline')
+    parser.add_argument('--timezone', default='America/Los_Angeles', help='Bucket timezone')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is reported)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    start_time = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    end_time = datetime(2024, 4, 1, tzinfo=timezone.utc)
+    transitions = synthetic_transitions(args.transitions, start_time, end_time)
+
+    pair_seconds, intervals = best_of(args.repeat, lambda: pair_runtime_transitions(transitions, end_time, 'running'))
+    total_seconds, _ = best_of(args.repeat, lambda: summarize_runtime(
+        intervals, start_time, end_time, buckets=False, now=end_time))
+    bucket_seconds, summary = best_of(args.repeat, lambda: summarize_runtime(
+        intervals, start_time, end_time, args.timezone, now=end_time))
+
+    results = {
+        'transitions': len(transitions),
+        'intervals': len(intervals),
+        'timezone': args.timezone,
+        'pairMs': round(pair_seconds * 1000, 2),
+        'totalMs': round(total_seconds * 1000, 2),
+        'bucketsMs': round(bucket_seconds * 1000, 2),
+        'totalMinutes': summary['totalMinutes'],
+        'days': len(summary['daily']),
+        'hours': len(summary['hourly'])
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['transitions']} transitions -> {results['intervals']} intervals "
+          f"({results['totalMinutes']} minutes, {results['days']} days, {results['hours']} hours in {args.timezone})")
+    print(f"  pair transitions:      {results['pairMs']:>8} ms")
+    print(f"  total only:            {results['totalMs']:>8} ms")
+    print(f"  total + daily/hourly:  {results['bucketsMs']:>8} ms")
+
+
+if __name__ == '__main__':
+    main()
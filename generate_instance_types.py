@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Regenerate layers/ec2Helper/instance_types.json, the instance-type catalog
+snapshot shipped in the EC2 layer, from describe_instance_types.
+Usage: python generate_instance_types.py [--types t3.micro t3.small ...] [--region REGION] [--profile PROFILE]
+"""
+
+import argparse
+import boto3
+import json
+import os
+import sys
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layers', 'ec2Helper', 'instance_types.json')
+
+# Keep in sync with ec2Helper.SUPPORTED_INSTANCE_TYPES
+DEFAULT_TYPES = ['t3.micro', 't3.small', 't3.medium', 't3.large', 't3.xlarge', 't3.2xlarge']
+
+
+def generate_snapshot(instance_types, region=None, profile=None):
+    """Describe the instance types and return {type: {'vCpus', 'memSize'}}."""
+    session = boto3.Session(profile_name=profile, region_name=region)
+    ec2 = session.client('ec2')
+
+    specs = {}
+    paginator = ec2.get_paginator('describe_instance_types')
+    for page in paginator.paginate(InstanceTypes=instance_types):
+        for info in page['InstanceTypes']:
+            specs[info['InstanceType']] = {
+                'vCpus': info['VCpuInfo']['DefaultVCpus'],
+                'memSize': info['MemoryInfo']['SizeInMiB']
+            }
+    return specs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regenerate the shipped instance-type catalog snapshot')
+    parser.add_argument('--types', nargs='+', default=DEFAULT_TYPES, help='Instance types to include')
+    parser.add_argument('--region', help='AWS region (default: session region)')
+    parser.add_argument('--profile', help='AWS profile name')
+    args = parser.parse_args()
+
+    try:
+        specs = generate_snapshot(args.types, args.region, args.profile)
+    except Exception as e:
+        print(f"Error describing instance types: {e}")
+        sys.exit(1)
+
+    ordered = {instance_type: specs[instance_type] for instance_type in args.types if instance_type in specs}
+    with open(SNAPSHOT_PATH, 'w') as snapshot_file:
+        snapshot_file.write('{\n')
+        snapshot_file.write(',\n'.join(f'  {json.dumps(name)}: {json.dumps(spec)}' for name, spec in ordered.items()))
+        snapshot_file.write('\n}\n')
+
+    print(f"Wrote {len(ordered)} instance types to {SNAPSHOT_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,7 @@ def handler(event, context):
     Triggered by EventBridge on a schedule (e.g., every hour).
     """
     logger.info("------- calculateMonthlyRuntime Lambda started")
+    dyn.reset_request_cache()
     
     try:
         # Get all servers with the app tag
@@ -34,6 +35,15 @@ def handler(event, context):
         
         processed_count = 0
         error_count = 0
+
+        # Fill any missing ledgers with one CloudTrail pass for the whole fleet
+        now = datetime.now(timezone.utc)
+        month_start = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
+        try:
+            ec2_utils.backfill_runtime_ledgers(servers["Instances"], month_start, core_dyn=dyn)
+        except Exception as e:
+            # Each server still backfills on its own in get_total_hours_running_per_month
+            logger.warning(f"Bulk runtime backfill failed: {e}")
         
         for instance in servers["Instances"]:
             instance_id = instance["InstanceId"]
@@ -41,8 +51,8 @@ def handler(event, context):
             try:
                 logger.info(f"Calculating runtime for {instance_id}")
                 
-                # Calculate total running minutes for the month
-                runtime_data = ec2_utils.get_total_hours_running_per_month(instance_id)
+                # Calculate total running minutes for the month from the runtime ledger
+                runtime_data = ec2_utils.get_total_hours_running_per_month(instance_id, core_dyn=dyn)
                 running_minutes = runtime_data['minutes']
                 
                 # Get current timestamp
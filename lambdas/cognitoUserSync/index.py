@@ -0,0 +1,91 @@
+import logging
+import ddbHelper
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+core_dyn = ddbHelper.CoreTableDyn()
+
+# Cognito has no attribute-change trigger; PostAuthentication re-syncs on
+# every sign-in, which is the first point a changed email can be used.
+SYNC_TRIGGER_SOURCES = (
+    'PostConfirmation_ConfirmSignUp',
+    'PostConfirmation_ConfirmForgotPassword',
+    'PostAuthentication_Authentication',
+)
+
+
+def user_from_event(event):
+    """
+    Build a user profile from a Cognito trigger event.
+
+    Returns:
+        dict: {'sub', 'username', 'email', 'fullName'} or None if attributes are missing
+    """
+    attributes = event.get('request', {}).get('userAttributes', {})
+    sub = attributes.get('sub')
+    email = attributes.get('email')
+    if not sub or not email:
+        return None
+
+    full_name = f"{attributes.get('given_name', '')} {attributes.get('family_name', '')}".strip()
+    return {
+        'sub': sub,
+        'username': event.get('userName', sub),
+        'email': email,
+        'fullName': full_name or email
+    }
+
+
+def sync_user(user):
+    """
+    Write the EMAIL# index and PROFILE items for a user.
+    Each item is checked on its own: a PROFILE cached from Cognito lookups
+    can exist before this user's EMAIL# index item does.
+
+    Returns:
+        bool: True if CoreTable was updated
+    """
+    existing = core_dyn.get_user_profiles([user['sub']]).get(user['sub'])
+    indexed = core_dyn.get_user_by_email(user['email'])
+
+    profile_current = bool(existing) and existing.get('email') == user['email'] \
+        and existing.get('fullName') == user['fullName']
+    index_current = bool(indexed) and indexed['sub'] == user['sub'] \
+        and indexed['email'] == user['email'] and indexed['fullName'] == user['fullName']
+    if profile_current and index_current:
+        return False
+
+    previous_email = existing.get('email') if existing else None
+    if previous_email and core_dyn.normalize_email(previous_email) != core_dyn.normalize_email(user['email']):
+        logger.info(f"Email changed for {user['sub']}, removing index entry for {previous_email}")
+        core_dyn.delete_user_email_index(previous_email, user['sub'])
+
+    if not index_current:
+        core_dyn.put_user_email_index(user)
+    if not profile_current:
+        core_dyn.put_user_profiles([user])
+    return True
+
+
+def handler(event, context):
+    core_dyn.reset_request_cache()
+    trigger_source = event.get('triggerSource')
+    logger.info(f"------- cognitoUserSync triggered by {trigger_source}")
+
+    if trigger_source not in SYNC_TRIGGER_SOURCES:
+        return event
+
+    user = user_from_event(event)
+    if not user:
+        logger.warning(f"Missing sub or email in {trigger_source} event")
+        return event
+
+    # Never block sign-up or sign-in; lookups fall back to Cognito on a miss
+    try:
+        if sync_user(user):
+            logger.info(f"Indexed {user['email']} -> {user['sub']}")
+    except Exception as e:
+        logger.error(f"Error syncing user {user['sub']}: {str(e)}", exc_info=True)
+
+    return event
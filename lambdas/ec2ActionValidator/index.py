@@ -1,9 +1,9 @@
-import boto3
 import logging
 import os
 import json
 import time
 import re
+import clientHelper
 import authHelper
 import ec2Helper
 import utilHelper
@@ -13,8 +13,8 @@ import ddbHelper
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-ec2_client = boto3.client('ec2')
-sqs_client = boto3.client('sqs')
+ec2_client = clientHelper.get_client('ec2')
+sqs_client = clientHelper.get_client('sqs')
 
 appValue = os.getenv('TAG_APP_VALUE')
 ec2_instance_profile_name = os.getenv('EC2_INSTANCE_PROFILE_NAME')
@@ -250,7 +250,9 @@ def action_process_sync(action, instance_id, arguments=None):
 def handle_get_server_users(instance_id):
     """
     Helper function to handle get server users action using DynamoDB membership.
-    Retrieves all users with access to a server, including their roles and full names from Cognito.
+    Retrieves all users with access to a server, including their roles and full names.
+    Names come from cached CoreTable profiles in one batch read; only missing or
+    stale profiles are resolved from Cognito.
     
     Args:
         instance_id (str): EC2 instance ID
@@ -269,30 +271,7 @@ def handle_get_server_users(instance_id):
             logger.info(f"No users found for server {instance_id}")
             return []
         
-        # Convert to the expected ServerUsers format
-        server_users = []
-        for member in members:
-            try:
-                # Get user details from Cognito to get fullName
-                user_info = auth.get_user_by_sub(member['userId'])
-                full_name = user_info.get('fullName', member['email']) if user_info else member['email']
-                
-                server_users.append({
-                    'id': member['userId'],
-                    'email': member['email'],
-                    'fullName': full_name,
-                    'role': member['role']
-                })
-                
-            except Exception as user_error:
-                # If we can't get user details from Cognito, use email as fallback
-                logger.warning(f"Could not get user details from Cognito for {member['userId']}: {str(user_error)}")
-                server_users.append({
-                    'id': member['userId'],
-                    'email': member['email'],
-                    'fullName': member['email'],  # Use email as fallback
-                    'role': member['role']
-                })
+        server_users = build_server_users(instance_id, members)
         
         logger.info(f"Retrieved {len(server_users)} users for server {instance_id} from DynamoDB")
         return server_users
@@ -301,6 +280,60 @@ def handle_get_server_users(instance_id):
         logger.error("Error retrieving users for instance %s: %s", instance_id, str(e))
         return utl.response(500, {"error": f"Failed to retrieve users: {str(e)}"})
 
+def handle_get_server_users_page(instance_id, limit=None, next_token=None):
+    """
+    Helper function to get one page of server users.
+    
+    Args:
+        instance_id (str): EC2 instance ID
+        limit (int, optional): Page size
+        next_token (str, optional): Opaque cursor returned by the previous page
+        
+    Returns:
+        dict: ServerUsersPage with items and nextToken
+        dict: Error response if operation fails
+    """
+    try:
+        page = core_dyn.list_server_members_page(instance_id, limit=limit, cursor=next_token)
+    except ValueError as e:
+        return utl.response(400, {"err": str(e)})
+    except Exception as e:
+        logger.error("Error retrieving users page for instance %s: %s", instance_id, str(e))
+        return utl.response(500, {"error": f"Failed to retrieve users: {str(e)}"})
+    
+    return {
+        'items': build_server_users(instance_id, page['items']),
+        'nextToken': page['nextCursor']
+    }
+
+def build_server_users(instance_id, members):
+    """Convert memberships to ServerUsers objects, resolving profiles in bulk."""
+    if not members:
+        return []
+    
+    # Resolve all member profiles in bulk
+    try:
+        user_profiles = auth.get_users_by_sub([member['userId'] for member in members], profile_store=core_dyn)
+    except Exception as user_error:
+        # If we can't get user details, use email as fallback
+        logger.warning(f"Could not resolve user details for server {instance_id}: {str(user_error)}")
+        user_profiles = {}
+    
+    # Convert to the expected ServerUsers format
+    server_users = []
+    for member in members:
+        user_info = user_profiles.get(member['userId']) or {}
+        email = user_info.get('email') or member.get('email', '')
+        
+        server_users.append({
+            'id': member['userId'],
+            'email': email,
+            'fullName': user_info.get('fullName') or email,
+            'role': member['role']
+        })
+    
+    return server_users
+
 def handle_get_admin_users():
     """Helper function to get admin group members"""
     try:
@@ -324,8 +357,8 @@ def handle_search_user_by_email(email):
     try:
         logger.info(f"Searching for user by email: {email}")
         
-        # Use the existing find_user_by_email method from authHelper
-        user_info = auth.find_user_by_email(email)
+        # Email index in CoreTable first, Cognito only on a miss
+        user_info = auth.find_user_by_email(email, profile_store=core_dyn)
         
         if user_info is None:
             logger.info(f"No user found with email: {email}")
@@ -450,8 +483,8 @@ def handle_add_user_to_server(instance_id, user_email, user_attributes):
     try:
         logger.info(f"Adding user to server: email={user_email}, instance={instance_id}")
         
-        # Step 1: Find user by email in Cognito to get their sub
-        user_info = auth.find_user_by_email(user_email)
+        # Step 1: Find user by email (CoreTable index, then Cognito) to get their sub
+        user_info = auth.find_user_by_email(user_email, profile_store=core_dyn)
         
         if user_info is None:
             # ErrorHandler.log_error('USER_NOT_FOUND',
@@ -509,7 +542,7 @@ def handle_add_user_to_server(instance_id, user_email, user_attributes):
         logger.error('INTERNAL_ERROR')
         return None
 
-def handle_update_user_role(instance_id, user_id, new_role, requesting_user_attributes):
+def handle_update_user_role(instance_id, user_id, new_role, requesting_user_attributes, auth_decision=None):
     """
     Helper function to update a user's role for a server
     
@@ -518,6 +551,7 @@ def handle_update_user_role(instance_id, user_id, new_role, requesting_user_attr
         user_id: Cognito user sub of the user whose role to update
         new_role: New role to assign (admin, moderator, viewer)
         requesting_user_attributes: Attributes of the user making the request
+        auth_decision: AuthorizationDecision already fetched for the requester, if any
         
     Returns:
         dict: Success response with updated membership or error response
@@ -529,17 +563,17 @@ def handle_update_user_role(instance_id, user_id, new_role, requesting_user_attr
         logger.info(f"Updating user role: user={user_id}, instance={instance_id}, new_role={new_role}, requester={requesting_user_email}")
                 
         # Step 1: Check if requesting user has admin permissions
-        requesting_user_access = core_dyn.check_user_server_access(requesting_user_sub, instance_id)
-        is_global_admin = core_dyn.check_global_admin(requesting_user_sub)
+        if auth_decision is None:
+            auth_decision = core_dyn.check_user_authorization(requesting_user_sub, instance_id, 'manage_users')
         
-        if not (requesting_user_access and requesting_user_access['role'] == 'admin') and not is_global_admin:
+        if not auth_decision.allows('manage_users'):
             logger.warning(f"Unauthorized role update attempt: requester={requesting_user_email}")
             # return ErrorHandler.create_error_response(403, 'INSUFFICIENT_PERMISSIONS', 
             #                                         error="Insufficient permissions. Admin role required.")
             return None
         
         # Step 2: Prevent users from modifying their own admin role (lockout protection)
-        if user_id == requesting_user_sub and requesting_user_access and requesting_user_access['role'] == 'admin' and new_role != 'admin':
+        if user_id == requesting_user_sub and auth_decision.membership_role == 'admin' and new_role != 'admin':
             logger.warning(f"Self-admin-role modification blocked: user={requesting_user_email}")
             # return ErrorHandler.create_error_response(403, 'SELF_ADMIN_ROLE_PROTECTION', 
             #                                         error="Cannot modify your own admin role to prevent lockout")
@@ -591,7 +625,7 @@ def handle_update_user_role(instance_id, user_id, new_role, requesting_user_attr
         logger.error(f"Error updating user role: user={user_id}, instance={instance_id}, error={str(e)}", exc_info=True)
         # return ErrorHandler.create_error_response(500, 'INTERNAL_ERROR', error=f"An unexpected error occurred: {str(e)}")
 
-def handle_remove_user_from_server(instance_id, user_id, requesting_user_attributes):
+def handle_remove_user_from_server(instance_id, user_id, requesting_user_attributes, auth_decision=None):
     """
     Helper function to remove a user from a server
     
@@ -599,6 +633,7 @@ def handle_remove_user_from_server(instance_id, user_id, requesting_user_attribu
         instance_id: EC2 instance ID
         user_id: Cognito user sub of the user to remove
         requesting_user_attributes: Attributes of the user making the request
+        auth_decision: AuthorizationDecision already fetched for the requester, if any
         
     Returns:
         dict: Success response or error response
@@ -610,17 +645,17 @@ def handle_remove_user_from_server(instance_id, user_id, requesting_user_attribu
         logger.info(f"Removing user from server: user={user_id}, instance={instance_id}, requester={requesting_user_email}")
         
         # Step 1: Check if requesting user has admin permissions
-        requesting_user_access = core_dyn.check_user_server_access(requesting_user_sub, instance_id)
-        is_global_admin = core_dyn.check_global_admin(requesting_user_sub)
+        if auth_decision is None:
+            auth_decision = core_dyn.check_user_authorization(requesting_user_sub, instance_id, 'manage_users')
         
-        if not (requesting_user_access and requesting_user_access['role'] == 'admin') and not is_global_admin:
+        if not auth_decision.allows('manage_users'):
             logger.warning(f"Unauthorized user removal attempt: requester={requesting_user_email}")
             # return ErrorHandler.create_error_response(403, 'INSUFFICIENT_PERMISSIONS', 
             #                                         error="Insufficient permissions. Admin role required.")
             return None
         
         # Step 2: Prevent users from removing themselves if they're the only admin (lockout protection)
-        if user_id == requesting_user_sub and requesting_user_access and requesting_user_access['role'] == 'admin':
+        if user_id == requesting_user_sub and auth_decision.membership_role == 'admin':
             # Check if there are other admins
             all_members = core_dyn.list_server_members(instance_id)
             admin_members = [m for m in all_members if m.get('role') == 'admin']
@@ -754,12 +789,13 @@ def route_instance_operation(event, instance_id, user_attributes):
         
     # Check authorization with role-based permissions
     try:
-        is_authorized, user_role, auth_reason = core_dyn.check_user_authorization(user_attributes['sub'], instance_id, required_permission)
-        if not is_authorized:
-            logger.error(f"User {user_attributes['email']} not authorized for {field_name} on instance {instance_id}: {auth_reason}")
-            return utl.response(403, {"err": f"Insufficient permissions. {auth_reason}"})
+        # One BatchGetItem for the admin marker and membership; handlers reuse the decision
+        auth_decision = core_dyn.check_user_authorization(user_attributes['sub'], instance_id, required_permission)
+        if not auth_decision.authorized:
+            logger.error(f"User {user_attributes['email']} not authorized for {field_name} on instance {instance_id}: {auth_decision.reason}")
+            return utl.response(403, {"err": f"Insufficient permissions. {auth_decision.reason}"})
         
-        logger.info(f"Authorization granted: user={user_attributes['email']}, role={user_role}, operation={field_name}")
+        logger.info(f"Authorization granted: user={user_attributes['email']}, role={auth_decision.role}, operation={field_name}")
         
     except Exception as e:
         logger.error(f"Authorization check FAILED: user={user_attributes.get('email', 'unknown')}, instance={instance_id}, error={str(e)}", exc_info=True)
@@ -769,6 +805,9 @@ def route_instance_operation(event, instance_id, user_attributes):
     if field_name in ["getserverconfig", "getserverusers"]:
         return action_process_sync(field_name, instance_id, input_data)
     
+    if field_name == "getserveruserspage":
+        return handle_get_server_users_page(instance_id, event["arguments"].get("limit"), event["arguments"].get("nextToken"))
+    
     # Add user operation - create DynamoDB membership with default viewer role
     if field_name == "addusertoserver":
         user_email = event["arguments"].get("userEmail")
@@ -782,14 +821,14 @@ def route_instance_operation(event, instance_id, user_attributes):
         new_role = event["arguments"].get("role")
         if not user_id or not new_role:
             return utl.response(400, {"err": "userId and role are required"})
-        return handle_update_user_role(instance_id, user_id, new_role, user_attributes)
+        return handle_update_user_role(instance_id, user_id, new_role, user_attributes, auth_decision)
     
     # Remove user from server operation - new DynamoDB-based user removal
     if field_name == "removeuserfromserver":
         user_id = event["arguments"].get("userId")
         if not user_id:
             return utl.response(400, {"err": "userId is required"})
-        return handle_remove_user_from_server(instance_id, user_id, user_attributes)
+        return handle_remove_user_from_server(instance_id, user_id, user_attributes, auth_decision)
     
     # Update server name
     if field_name == "updateservername":
@@ -824,6 +863,7 @@ def handler(event, context):
     Main handler for ec2ActionValidator Lambda
     Validates authorization and routes requests to appropriate handlers
     """
+    core_dyn.reset_request_cache()
     try:
         # Check if this is an EventBridge scheduled event (no auth required)
         if "action" in event and "instanceId" in event and "source" in event:
@@ -14,6 +14,7 @@ os.environ['COGNITO_USER_POOL_ID'] = 'test-pool-id'
 os.environ['USER_MEMBERSHIP_TABLE_NAME'] = 'test-user-membership-table'
 
 # Mock the imports that would normally come from Lambda layers
+sys.modules['clientHelper'] = Mock()
 sys.modules['authHelper'] = Mock()
 sys.modules['ec2Helper'] = Mock()
 sys.modules['utilHelper'] = Mock()
@@ -87,214 +88,147 @@ class TestGetServerUsers(unittest.TestCase):
             }
         }
     
+    def _mock_get_users_by_sub(self, user_subs, profile_store=None):
+        return {sub: self.mock_cognito_users[sub] for sub in user_subs if sub in self.mock_cognito_users}
+
+    @patch('index.core_dyn')
     @patch('index.auth')
-    def test_get_server_users_success_with_cognito_data(self, mock_auth):
+    def test_get_server_users_success_with_cognito_data(self, mock_auth, mock_core_dyn):
         """Test successful retrieval of server users with Cognito user data"""
         # Arrange
-        with patch('builtins.__import__') as mock_import:
-            # Mock the dynamic import of UserMembershipDyn
-            mock_ddb_helper = Mock()
-            mock_membership_class = Mock()
-            mock_ddb_helper.UserMembershipDyn = mock_membership_class
-            
-            def side_effect(name, *args, **kwargs):
-                if name == 'ddbHelper':
-                    return mock_ddb_helper
-                return Mock()
-            
-            mock_import.side_effect = side_effect
-            
-            # Mock UserMembershipDyn instance
-            mock_membership_dyn = Mock()
-            mock_membership_class.return_value = mock_membership_dyn
-            mock_membership_dyn.list_server_members.return_value = self.mock_members
-            
-            # Mock auth.get_user_by_sub to return user details
-            def mock_get_user_by_sub(user_sub):
-                return self.mock_cognito_users.get(user_sub)
-            
-            mock_auth.get_user_by_sub.side_effect = mock_get_user_by_sub
-            
-            # Act
-            result = handle_get_server_users(self.instance_id)
-            
-            # Assert
-            self.assertIsInstance(result, list)
-            self.assertEqual(len(result), 3)
-            
-            # Verify membership query was called correctly
-            mock_membership_dyn.list_server_members.assert_called_once_with(self.instance_id)
-            
-            # Verify Cognito queries were made for each user
-            self.assertEqual(mock_auth.get_user_by_sub.call_count, 3)
-            
-            # Verify the structure and content of returned data
-            expected_users = [
-                {
-                    'id': 'cognito-sub-admin-123',
-                    'email': 'admin@example.com',
-                    'fullName': 'Admin User',
-                    'role': 'admin'
-                },
-                {
-                    'id': 'cognito-sub-moderator-456',
-                    'email': 'moderator@example.com',
-                    'fullName': 'Moderator User',
-                    'role': 'moderator'
-                },
-                {
-                    'id': 'cognito-sub-viewer-789',
-                    'email': 'viewer@example.com',
-                    'fullName': 'Viewer User',
-                    'role': 'viewer'
-                }
-            ]
-            
-            # Sort both lists by id for consistent comparison
-            result_sorted = sorted(result, key=lambda x: x['id'])
-            expected_sorted = sorted(expected_users, key=lambda x: x['id'])
-            
-            self.assertEqual(result_sorted, expected_sorted)
+        mock_core_dyn.list_server_members.return_value = self.mock_members
+        mock_auth.get_users_by_sub.side_effect = self._mock_get_users_by_sub
+        
+        # Act
+        result = handle_get_server_users(self.instance_id)
+        
+        # Assert
+        self.assertIsInstance(result, list)
+        self.assertEqual(len(result), 3)
+        
+        # Verify membership query was called correctly
+        mock_core_dyn.list_server_members.assert_called_once_with(self.instance_id)
+        
+        # Verify all users were resolved in a single bulk call backed by CoreTable profiles
+        mock_auth.get_users_by_sub.assert_called_once_with(
+            ['cognito-sub-admin-123', 'cognito-sub-moderator-456', 'cognito-sub-viewer-789'],
+            profile_store=mock_core_dyn
+        )
+        mock_auth.get_user_by_sub.assert_not_called()
+        
+        # Verify the structure and content of returned data
+        expected_users = [
+            {
+                'id': 'cognito-sub-admin-123',
+                'email': 'admin@example.com',
+                'fullName': 'Admin User',
+                'role': 'admin'
+            },
+            {
+                'id': 'cognito-sub-moderator-456',
+                'email': 'moderator@example.com',
+                'fullName': 'Moderator User',
+                'role': 'moderator'
+            },
+            {
+                'id': 'cognito-sub-viewer-789',
+                'email': 'viewer@example.com',
+                'fullName': 'Viewer User',
+                'role': 'viewer'
+            }
+        ]
+        
+        # Sort both lists by id for consistent comparison
+        result_sorted = sorted(result, key=lambda x: x['id'])
+        expected_sorted = sorted(expected_users, key=lambda x: x['id'])
+        
+        self.assertEqual(result_sorted, expected_sorted)
     
+    @patch('index.core_dyn')
     @patch('index.auth')
-    def test_get_server_users_cognito_fallback(self, mock_auth):
+    def test_get_server_users_cognito_fallback(self, mock_auth, mock_core_dyn):
         """Test that email is used as fallback when Cognito user data is unavailable"""
         # Arrange
-        with patch('builtins.__import__') as mock_import:
-            # Mock the dynamic import of UserMembershipDyn
-            mock_ddb_helper = Mock()
-            mock_membership_class = Mock()
-            mock_ddb_helper.UserMembershipDyn = mock_membership_class
-            
-            def side_effect(name, *args, **kwargs):
-                if name == 'ddbHelper':
-                    return mock_ddb_helper
-                return Mock()
-            
-            mock_import.side_effect = side_effect
-            
-            # Mock UserMembershipDyn instance
-            mock_membership_dyn = Mock()
-            mock_membership_class.return_value = mock_membership_dyn
-            mock_membership_dyn.list_server_members.return_value = [self.mock_members[0]]  # Only one user
-            
-            # Mock auth.get_user_by_sub to raise exception (simulating Cognito unavailable)
-            mock_auth.get_user_by_sub.side_effect = Exception("Cognito unavailable")
-            
-            # Act
-            result = handle_get_server_users(self.instance_id)
-            
-            # Assert
-            self.assertIsInstance(result, list)
-            self.assertEqual(len(result), 1)
-            
-            # Verify fallback behavior - email used as fullName
-            user = result[0]
-            self.assertEqual(user['id'], 'cognito-sub-admin-123')
-            self.assertEqual(user['email'], 'admin@example.com')
-            self.assertEqual(user['fullName'], 'admin@example.com')  # Email used as fallback
-            self.assertEqual(user['role'], 'admin')
+        mock_core_dyn.list_server_members.return_value = [self.mock_members[0]]  # Only one user
+        
+        # Mock bulk resolution to raise exception (simulating Cognito unavailable)
+        mock_auth.get_users_by_sub.side_effect = Exception("Cognito unavailable")
+        
+        # Act
+        result = handle_get_server_users(self.instance_id)
+        
+        # Assert
+        self.assertIsInstance(result, list)
+        self.assertEqual(len(result), 1)
+        
+        # Verify fallback behavior - email used as fullName
+        user = result[0]
+        self.assertEqual(user['id'], 'cognito-sub-admin-123')
+        self.assertEqual(user['email'], 'admin@example.com')
+        self.assertEqual(user['fullName'], 'admin@example.com')  # Email used as fallback
+        self.assertEqual(user['role'], 'admin')
     
-    def test_get_server_users_empty_membership_list(self):
+    @patch('index.core_dyn')
+    @patch('index.auth')
+    def test_get_server_users_empty_membership_list(self, mock_auth, mock_core_dyn):
         """Test graceful handling of empty membership lists"""
         # Arrange
-        with patch('builtins.__import__') as mock_import:
-            # Mock the dynamic import of UserMembershipDyn
-            mock_ddb_helper = Mock()
-            mock_membership_class = Mock()
-            mock_ddb_helper.UserMembershipDyn = mock_membership_class
-            
-            def side_effect(name, *args, **kwargs):
-                if name == 'ddbHelper':
-                    return mock_ddb_helper
-                return Mock()
-            
-            mock_import.side_effect = side_effect
-            
-            # Mock UserMembershipDyn instance
-            mock_membership_dyn = Mock()
-            mock_membership_class.return_value = mock_membership_dyn
-            mock_membership_dyn.list_server_members.return_value = []  # Empty list
-            
-            # Act
-            result = handle_get_server_users(self.instance_id)
-            
-            # Assert
-            self.assertIsInstance(result, list)
-            self.assertEqual(len(result), 0)
-            
-            # Verify membership query was called
-            mock_membership_dyn.list_server_members.assert_called_once_with(self.instance_id)
+        mock_core_dyn.list_server_members.return_value = []  # Empty list
+        
+        # Act
+        result = handle_get_server_users(self.instance_id)
+        
+        # Assert
+        self.assertIsInstance(result, list)
+        self.assertEqual(len(result), 0)
+        
+        # Verify membership query was called and no user lookups were made
+        mock_core_dyn.list_server_members.assert_called_once_with(self.instance_id)
+        mock_auth.get_users_by_sub.assert_not_called()
     
+    @patch('index.core_dyn')
     @patch('index.utl')
-    def test_get_server_users_dynamodb_error(self, mock_utl):
+    def test_get_server_users_dynamodb_error(self, mock_utl, mock_core_dyn):
         """Test error handling when DynamoDB operation fails"""
         # Arrange
-        with patch('builtins.__import__') as mock_import:
-            # Mock the dynamic import of UserMembershipDyn to raise exception
-            def side_effect(name, *args, **kwargs):
-                if name == 'ddbHelper':
-                    raise Exception("DynamoDB error")
-                return Mock()
-            
-            mock_import.side_effect = side_effect
-            
-            # Mock utl.response to return error response
-            mock_utl.response.return_value = {"statusCode": 500, "body": {"error": "Failed to retrieve users: DynamoDB error"}}
-            
-            # Act
-            result = handle_get_server_users(self.instance_id)
-            
-            # Assert
-            mock_utl.response.assert_called_once_with(500, {"error": "Failed to retrieve users: DynamoDB error"})
-            self.assertEqual(result["statusCode"], 500)
+        mock_core_dyn.list_server_members.side_effect = Exception("DynamoDB error")
+        
+        # Mock utl.response to return error response
+        mock_utl.response.return_value = {"statusCode": 500, "body": {"error": "Failed to retrieve users: DynamoDB error"}}
+        
+        # Act
+        result = handle_get_server_users(self.instance_id)
+        
+        # Assert
+        mock_utl.response.assert_called_once_with(500, {"error": "Failed to retrieve users: DynamoDB error"})
+        self.assertEqual(result["statusCode"], 500)
     
+    @patch('index.core_dyn')
     @patch('index.auth')
-    def test_get_server_users_includes_role_information(self, mock_auth):
+    def test_get_server_users_includes_role_information(self, mock_auth, mock_core_dyn):
         """Test that role information is included in responses (Requirements 5.4)"""
         # Arrange
-        with patch('builtins.__import__') as mock_import:
-            # Mock the dynamic import of UserMembershipDyn
-            mock_ddb_helper = Mock()
-            mock_membership_class = Mock()
-            mock_ddb_helper.UserMembershipDyn = mock_membership_class
-            
-            def side_effect(name, *args, **kwargs):
-                if name == 'ddbHelper':
-                    return mock_ddb_helper
-                return Mock()
-            
-            mock_import.side_effect = side_effect
-            
-            # Mock UserMembershipDyn instance
-            mock_membership_dyn = Mock()
-            mock_membership_class.return_value = mock_membership_dyn
-            mock_membership_dyn.list_server_members.return_value = self.mock_members
-            
-            # Mock auth.get_user_by_sub to return user details
-            def mock_get_user_by_sub(user_sub):
-                return self.mock_cognito_users.get(user_sub)
-            
-            mock_auth.get_user_by_sub.side_effect = mock_get_user_by_sub
-            
-            # Act
-            result = handle_get_server_users(self.instance_id)
-            
-            # Assert
-            self.assertIsInstance(result, list)
-            self.assertEqual(len(result), 3)
-            
-            # Verify each user has role information
-            for user in result:
-                self.assertIn('role', user)
-                self.assertIn(user['role'], ['admin', 'moderator', 'viewer'])
-            
-            # Verify specific roles are correct
-            roles_by_id = {user['id']: user['role'] for user in result}
-            self.assertEqual(roles_by_id['cognito-sub-admin-123'], 'admin')
-            self.assertEqual(roles_by_id['cognito-sub-moderator-456'], 'moderator')
-            self.assertEqual(roles_by_id['cognito-sub-viewer-789'], 'viewer')
+        mock_core_dyn.list_server_members.return_value = self.mock_members
+        mock_auth.get_users_by_sub.side_effect = self._mock_get_users_by_sub
+        
+        # Act
+        result = handle_get_server_users(self.instance_id)
+        
+        # Assert
+        self.assertIsInstance(result, list)
+        self.assertEqual(len(result), 3)
+        
+        # Verify each user has role information
+        for user in result:
+            self.assertIn('role', user)
+            self.assertIn(user['role'], ['admin', 'moderator', 'viewer'])
+        
+        # Verify specific roles are correct
+        roles_by_id = {user['id']: user['role'] for user in result}
+        self.assertEqual(roles_by_id['cognito-sub-admin-123'], 'admin')
+        self.assertEqual(roles_by_id['cognito-sub-moderator-456'], 'moderator')
+        self.assertEqual(roles_by_id['cognito-sub-viewer-789'], 'viewer')
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
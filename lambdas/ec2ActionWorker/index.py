@@ -3,24 +3,20 @@ import logging
 import json
 import os
 import time
+import clientHelper
+import appsyncClient
 import ec2Helper
 import ddbHelper
 import utilHelper
-from aws_croniter import AwsCroniter
 from datetime import datetime
-import pytz
-from botocore.session import Session
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
-from botocore.httpsession import URLLib3Session
 from botocore.exceptions import ClientError
 # from errorHandler import ErrorHandler
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-ec2_client = boto3.client('ec2')
-eventbridge_client = boto3.client('events')
+ec2_client = clientHelper.get_client('ec2')
+eventbridge_client = clientHelper.get_client('events')
 ec2_utils = ec2Helper.Ec2Utils()
 utils = utilHelper.Utils()
 dyn = ddbHelper.CoreTableDyn()
@@ -34,9 +30,7 @@ ec2_instance_profile_name = os.getenv('EC2_INSTANCE_PROFILE_NAME')
 ec2_instance_profile_arn = os.getenv('EC2_INSTANCE_PROFILE_ARN')
 endpoint = os.getenv('APPSYNC_URL', None)
 
-# Get AWS account and region info
-sts_client = boto3.client('sts')
-account_id = sts_client.get_caller_identity()['Account']
+# Region comes from the environment; the account ID is resolved lazily by ec2_utils
 aws_region = boto3_session.region_name
 
 # ============================================================================
@@ -48,6 +42,9 @@ def _format_schedule_expression(cron_expression, timezone='UTC'):
     if not cron_expression:
         return None
     
+    # aws-croniter is only needed when a schedule is being configured
+    from aws_croniter import AwsCroniter
+
     cron_expression = cron_expression.strip()
     
     # If already in EventBridge format, validate and return
@@ -108,6 +105,8 @@ def _convert_timezone_to_utc(hour, minute, timezone):
         return hour, minute
     
     try:
+        import pytz
+
         tz = pytz.timezone(timezone)
         # Use current date to properly handle DST
         now = datetime.now()
@@ -156,7 +155,7 @@ def configure_scheduled_shutdown_event(instance_id, cron_expression, timezone='U
     
     # Create the target to invoke ec2ActionValidator Lambda
     lambda_function_name = f"{appName}-{envName}-ec2ActionValidator"
-    lambda_arn = f"arn:aws:lambda:{aws_region}:{account_id}:function:{lambda_function_name}"
+    lambda_arn = f"arn:aws:lambda:{aws_region}:{ec2_utils.account_id}:function:{lambda_function_name}"
     
     target = {
         'Id': f"shutdown-target-{instance_id}",
@@ -172,6 +171,7 @@ def configure_scheduled_shutdown_event(instance_id, cron_expression, timezone='U
         Rule=rule_name,
         Targets=[target]
     )
+    ec2_utils.invalidate_rule_index()
     logger.info(f"Shutdown event configured for {instance_id} with schedule: {formatted_schedule}")
 
 def remove_scheduled_shutdown_event(instance_id):
@@ -189,6 +189,7 @@ def remove_scheduled_shutdown_event(instance_id):
             Ids=[f"shutdown-target-{instance_id}"]
         )
         eventbridge_client.delete_rule(Name=rule_name)
+        ec2_utils.invalidate_rule_index()
         logger.info(f"Shutdown event removed for {instance_id}")
 
     except ClientError as e:
@@ -232,7 +233,7 @@ def configure_start_event(instance_id, cron_expression, timezone='UTC'):
     
     # Create the target to invoke ec2ActionValidator Lambda
     lambda_function_name = f"{appName}-{envName}-ec2ActionValidator"
-    lambda_arn = f"arn:aws:lambda:{aws_region}:{account_id}:function:{lambda_function_name}"
+    lambda_arn = f"arn:aws:lambda:{aws_region}:{ec2_utils.account_id}:function:{lambda_function_name}"
     
     target = {
         'Id': f"start-target-{instance_id}",
@@ -248,6 +249,7 @@ def configure_start_event(instance_id, cron_expression, timezone='UTC'):
         Rule=rule_name,
         Targets=[target]
     )
+    ec2_utils.invalidate_rule_index()
     logger.info(f"Start event configured for {instance_id} with schedule: {formatted_schedule}")
 
 def remove_start_event(instance_id):
@@ -265,6 +267,7 @@ def remove_start_event(instance_id):
             Ids=[f"start-target-{instance_id}"]
         )
         eventbridge_client.delete_rule(Name=rule_name)
+        ec2_utils.invalidate_rule_index()
         logger.info(f"Start event removed for {instance_id}")
 
     except ClientError as e:
@@ -301,35 +304,14 @@ def send_to_appsync(action, instance_id, status, message=None, user_email=None):
             }
         }
         
-        payload = {
-            "query": mutation,
-            "variables": variables
-        }
-        
-        # Create AWS request with SigV4 signing
-        session = Session()
-        credentials = session.get_credentials()
-        request = AWSRequest(
-            method='POST',
-            url=endpoint,
-            data=json.dumps(payload),
-            headers={'Content-Type': 'application/json'}
-        )
-        
-        # Sign the request
-        SigV4Auth(credentials, 'appsync', aws_region).add_auth(request)
-        
-        # Send request using prepared request
-        http_session = URLLib3Session()
-        response = http_session.send(request.prepare())
-        
-        if response.status_code == 200:
-            logger.info(f"Status sent to AppSync: {status}")
-            return True
-        else:
-            logger.error(f"AppSync request failed: {response.status_code} - {response.content}")
+        body = appsyncClient.get_appsync_client(endpoint).execute(mutation, variables)
+        if body.get('errors'):
+            logger.error(f"AppSync returned errors: {body['errors']}")
             return False
-            
+
+        logger.info(f"Status sent to AppSync: {status}")
+        return True
+
     except Exception as e:
         logger.error(f"Failed to send to AppSync: {str(e)}")
         return False
@@ -566,6 +548,9 @@ def handle_update_server_config(instance_id, arguments):
         logger.info(f"Config updated successfully for {instance_id}")
         return True
         
+    except ddbHelper.VersionConflictError as e:
+        logger.warning(f"Config update rejected: {str(e)}")
+        return False
     except Exception as e:
         logger.error(f"Config update failed: {str(e)}")
         return False
@@ -728,6 +713,7 @@ def handle_update_server_name(instance_id, arguments):
 
 def handler(event, context):
     """SQS event handler"""
+    dyn.reset_request_cache()
     logger.info(f"SQS handler invoked: record_count={len(event.get('Records', []))}")
     
     for idx, record in enumerate(event['Records']):
@@ -8,6 +8,7 @@ def test_process_create_server_structure():
     """Test that process_create_server function exists and has correct structure"""
     # Import the module
     import sys
+    sys.path.insert(0, '../../layers/clientHelper')
     sys.path.insert(0, '../../layers/ec2Helper')
     sys.path.insert(0, '../../layers/ddbHelper')
     sys.path.insert(0, '../../layers/utilHelper')
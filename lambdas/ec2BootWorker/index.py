@@ -23,6 +23,7 @@ def handler(event, context):
     Process server boot events - validate configuration and apply defaults.
     Triggered when EC2 instance state changes to 'running'.
     """
+    core_dyn.reset_request_cache()
     try:
         # Parse EventBridge event
         detail = event.get('detail', {})
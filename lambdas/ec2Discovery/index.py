@@ -1,47 +1,50 @@
-import boto3
 import logging
 import os
 import concurrent.futures
+import functools
+from datetime import datetime, timezone
+import clientHelper
 import authHelper
 import ec2Helper
 import ddbHelper
-import pytz
 # from errorHandler import ErrorHandler
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-ec2_client = boto3.client('ec2')
-ec2 = boto3.resource('ec2')
-cognito_idp = boto3.client('cognito-idp')
-lambda_client = boto3.client('lambda')
+cognito_idp = clientHelper.get_client('cognito-idp')
+lambda_client = clientHelper.get_client('lambda')
 ENCODING = 'utf-8'
 
 appValue = os.getenv('TAG_APP_VALUE')
 cognito_pool_id = os.getenv('COGNITO_USER_POOL_ID')
 servers_table_name = os.getenv('SERVERS_TABLE_NAME')
 fix_server_role_lambda = os.getenv('FIX_SERVER_ROLE_LAMBDA_ARN')
+# Root volume sizes cached in server metadata are re-read from EC2 after this long
+DISK_SIZE_CACHE_TTL_SECONDS = int(os.getenv('DISK_SIZE_CACHE_TTL_SECONDS', '86400'))
 
 auth = authHelper.Auth(cognito_pool_id)
 ec2_utils = ec2Helper.Ec2Utils()
 ddb = ddbHelper.CoreTableDyn(servers_table_name)
-utc = pytz.utc
-pst = pytz.timezone('US/Pacific')
+
+@functools.lru_cache(maxsize=None)
+def get_pacific_timezone():
+    """US/Pacific tzinfo; pytz is imported on first use rather than at init."""
+    import pytz
+    return pytz.timezone('US/Pacific')
 
 def get_user_instances(user_sub, app_value):
     """Get instances based on user permissions using DynamoDB membership."""
     try:
-        core_dyn = ddbHelper.CoreTableDyn()
-        
         # Check if user has global admin role
-        if core_dyn.check_global_admin(user_sub):
+        if ddb.check_global_admin(user_sub):
             logger.info(f"Global admin user - listing all instances by app tag: {app_value}")
             user_instances = ec2_utils.list_instances_by_app_tag(app_value)
             logger.info(f"Found {user_instances['TotalInstances']} instances with App={app_value}")
             return user_instances
         
         # Get user server memberships
-        user_memberships = core_dyn.list_user_servers(user_sub)
+        user_memberships = ddb.list_user_servers(user_sub)
         
         if not user_memberships:
             logger.info(f"User has no server memberships: {user_sub}")
@@ -54,24 +57,8 @@ def get_user_instances(user_sub, app_value):
         server_ids = [membership['serverId'] for membership in user_memberships]
         logger.info(f"User has membership for servers: {server_ids}")
         
-        # Get instance details for each server the user has access to
-        user_instances = []
-        for server_id in server_ids:
-            try:
-                response = ec2_client.describe_instances(InstanceIds=[server_id])
-                if response["Reservations"]:
-                    for reservation in response["Reservations"]:
-                        for instance in reservation["Instances"]:
-                            # Verify instance has the correct app tag
-                            tags = instance.get('Tags', [])
-                            app_tag = next((tag['Value'] for tag in tags if tag['Key'] == 'App'), None)
-                            if app_tag == app_value:
-                                user_instances.append(instance)
-                            else:
-                                logger.warning(f"Instance {server_id} does not have App={app_value} tag")
-            except Exception as e:
-                logger.error(f"Error getting instance {server_id}: {str(e)}")
-                continue
+        # One describe per 1,000 memberships; unknown IDs and other apps are dropped
+        user_instances = ec2_utils.describe_instances_by_ids(server_ids, app_tag_value=app_value)
         
         total_instances = len(user_instances)
         logger.info(f"Found {total_instances} instances for user memberships")
@@ -85,52 +72,108 @@ def get_user_instances(user_sub, app_value):
         logger.error(f"Error retrieving user instances: {str(e)}")
         raise ValueError(f"Error retrieving user instances: {str(e)}")
 
-def get_server_validation(instance_id):
-    """Get stored server configuration validation from DynamoDB."""
-    try:
-        core_dyn = ddbHelper.CoreTableDyn()
-        # Get stored validation results from ec2BootWorker
-        server_info = core_dyn.get_server_info(instance_id)
-        
-        if server_info:
-            return {
-                'instanceId': instance_id,
-                'configStatus': server_info.get('configStatus', 'unknown'),
-                'isValid': server_info.get('configValid', False),
-                'warnings': server_info.get('configWarnings', []),
-                'errors': server_info.get('configErrors', []),
-                'autoConfigured': server_info.get('autoConfigured', False)
-            }
-        
-        # Fallback if no server info found (server not processed by ec2BootWorker yet)
+def get_server_validation(instance_id, server_info):
+    """Build server configuration validation from stored server metadata."""
+    if server_info:
         return {
             'instanceId': instance_id,
-            'configStatus': 'pending',
-            'isValid': False,
-            'warnings': ['Server validation pending'],
-            'errors': [],
-            'autoConfigured': False
+            'configStatus': server_info.get('configStatus', 'unknown'),
+            'isValid': server_info.get('configValid', False),
+            'warnings': server_info.get('configWarnings', []),
+            'errors': server_info.get('configErrors', []),
+            'autoConfigured': server_info.get('autoConfigured', False)
         }
-        
+    
+    # Fallback if no server info found (server not processed by ec2BootWorker yet)
+    return {
+        'instanceId': instance_id,
+        'configStatus': 'pending',
+        'isValid': False,
+        'warnings': ['Server validation pending'],
+        'errors': [],
+        'autoConfigured': False
+    }
+
+def load_server_validations(instance_ids):
+    """
+    Get stored configuration validation (from ec2BootWorker) for all servers.
+    One BatchGetItem per 100 servers; the items stay in the request cache
+    for get_cached_running_minutes.
+    """
+    try:
+        servers = ddb.get_servers_bulk(instance_ids)
     except Exception as e:
-        logger.error(f"Error retrieving server validation for {instance_id}: {str(e)}")
+        logger.error(f"Error retrieving server validations: {str(e)}")
         return {
-            'instanceId': instance_id,
-            'configStatus': 'error',
-            'isValid': False,
-            'warnings': [],
-            'errors': [f"Validation retrieval error: {str(e)}"],
-            'autoConfigured': False
+            instance_id: {
+                'instanceId': instance_id,
+                'configStatus': 'error',
+                'isValid': False,
+                'warnings': [],
+                'errors': [f"Validation retrieval error: {str(e)}"],
+                'autoConfigured': False
+            }
+            for instance_id in instance_ids
         }
+    
+    return {instance_id: get_server_validation(instance_id, servers.get(instance_id)) for instance_id in instance_ids}
+
+def resolve_disk_sizes(instances):
+    """
+    Root volume size per instance. Sizes cached in CoreTable metadata for the
+    same volume are used while fresh; the rest cost one describe_volumes per
+    500 volumes and are written back to the metadata.
+    """
+    root_volumes = {
+        instance['InstanceId']: instance['BlockDeviceMappings'][0]['Ebs']['VolumeId']
+        for instance in instances if instance.get('BlockDeviceMappings')
+    }
+    
+    try:
+        # Served from the request cache filled by load_server_validations
+        servers = ddb.get_servers_bulk(list(root_volumes))
+    except Exception as e:
+        logger.warning(f"Error reading cached disk sizes: {str(e)}")
+        servers = {}
+    
+    disk_sizes = {}
+    stale = {}
+    now = datetime.now(timezone.utc)
+    for instance_id, volume_id in root_volumes.items():
+        info = servers.get(instance_id) or {}
+        updated_at = info.get('diskSizeUpdatedAt')
+        if (info.get('diskVolumeId') == volume_id and info.get('diskSize') is not None and updated_at
+                and (now - datetime.fromisoformat(updated_at)).total_seconds() < DISK_SIZE_CACHE_TTL_SECONDS):
+            disk_sizes[instance_id] = info['diskSize']
+        else:
+            stale[instance_id] = volume_id
+    
+    if not stale:
+        return disk_sizes
+    
+    volume_sizes = ec2_utils.describe_volume_sizes(list(stale.values()))
+    for instance_id, volume_id in stale.items():
+        if volume_id not in volume_sizes:
+            continue
+        disk_sizes[instance_id] = volume_sizes[volume_id]
+        if instance_id in servers:
+            try:
+                ddb.update_server_disk_size(instance_id, volume_id, volume_sizes[volume_id])
+            except Exception as e:
+                logger.warning(f"Error caching disk size for {instance_id}: {str(e)}")
+    
+    return disk_sizes
 
 def fetch_parallel_data(instances):
-    """Fetch instance data in parallel using ThreadPoolExecutor."""
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        instance_types = {executor.submit(ec2_client.describe_instance_types, InstanceTypes=[instance['InstanceType']]): instance for instance in instances}
-        instance_status = {executor.submit(ec2_utils.describe_instance_status, instance['InstanceId']): instance for instance in instances}
-        config_validation = {executor.submit(get_server_validation, instance['InstanceId']): instance for instance in instances}
+    """Fetch instance type specs, statuses and disk sizes for all instances in bulk, in parallel."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        # Known types come from the catalog; only unknown ones cost an API call
+        types_future = executor.submit(ec2_utils.get_instance_type_specs, [instance['InstanceType'] for instance in instances])
+        # One fleet-wide status + IAM association sweep instead of two calls per instance
+        statuses_future = executor.submit(ec2_utils.describe_instance_statuses, [instance['InstanceId'] for instance in instances])
+        disk_sizes_future = executor.submit(resolve_disk_sizes, instances)
     
-    return instance_types, instance_status, config_validation
+    return types_future.result(), statuses_future.result(), disk_sizes_future.result()
 
 def auto_fix_iam_if_needed(instance_id, iam_status):
     """Automatically trigger IAM fix if status is not 'ok'."""
@@ -145,17 +188,13 @@ def auto_fix_iam_if_needed(instance_id, iam_status):
         except Exception as e:
             logger.error(f"Failed to trigger IAM fix for {instance_id}: {str(e)}")
 
-def build_server_response(server, instance_types, instance_status, config_validation, user_email):
+def build_server_response(server, instance_types, instance_status, disk_sizes, config_validation, user_email):
     """Build individual server response object."""
     instance_id = server['InstanceId']
     
-    # Get parallel execution results
-    instance_type_future = next(future for future in instance_types if future.result()['InstanceTypes'][0]['InstanceType'] == server['InstanceType'])
-    instance_type = instance_type_future.result()
-    instance_status_future = next(future for future in instance_status if future.result()['instanceId'] == instance_id)
-    status = instance_status_future.result()
-    config_validation_future = next(future for future in config_validation if future.result()['instanceId'] == instance_id)
-    validation = config_validation_future.result()
+    type_specs = instance_types.get(server['InstanceType'], {})
+    status = instance_status[instance_id]
+    validation = config_validation[instance_id]
 
     # Auto-fix IAM if needed
     iam_status = status['iamStatus'].lower()
@@ -164,13 +203,11 @@ def build_server_response(server, instance_types, instance_status, config_valida
     # Extract server details
     instance_name = next((tag['Value'] for tag in server['Tags'] if tag['Key'] == 'Name'), 'Undefined')
     public_ip = server['NetworkInterfaces'][0].get('Association', {}).get('PublicIp', 'none')
-    vcpus = instance_type['InstanceTypes'][0]['VCpuInfo']['DefaultVCpus']
-    memory_info = instance_type['InstanceTypes'][0]['MemoryInfo']['SizeInMiB']
-    volume_id = server['BlockDeviceMappings'][0]['Ebs']['VolumeId']
-    volume = ec2.Volume(volume_id)
+    vcpus = type_specs.get('vCpus')
+    memory_info = type_specs.get('memSize')
     
-    pst_launch_time = server["LaunchTime"].astimezone(pst)
-    running_time_data = ec2_utils.get_cached_running_minutes(instance_id)
+    pst_launch_time = server["LaunchTime"].astimezone(get_pacific_timezone())
+    running_time_data = ec2_utils.get_cached_running_minutes(instance_id, core_dyn=ddb)
 
     return {
         'id': instance_id,
@@ -180,7 +217,7 @@ def build_server_response(server, instance_types, instance_status, config_valida
         'state': server['State']['Name'].lower(),
         'vCpus': vcpus,
         'memSize': memory_info,
-        'diskSize': volume.size,
+        'diskSize': disk_sizes.get(instance_id),
         'publicIp': public_ip,
         'initStatus': status['initStatus'].lower(),
         'iamStatus': 'fixing' if iam_status != 'ok' else 'ok',
@@ -195,6 +232,7 @@ def build_server_response(server, instance_types, instance_status, config_valida
     }
 
 def handler(event, context): 
+    ddb.reset_request_cache()
     try:
         # Extract and validate token
         token = auth.extract_auth_token(event)
@@ -215,18 +253,19 @@ def handler(event, context):
             logger.info(f"No servers found for user {user_sub}")
             return []
         
-        # Fetch data in parallel
+        # Fetch type specs, statuses and validations in bulk
         instances = user_instances["Instances"]
-        instance_types, instance_status, config_validation = fetch_parallel_data(instances)
+        config_validation = load_server_validations([instance['InstanceId'] for instance in instances])
+        instance_types, instance_status, disk_sizes = fetch_parallel_data(instances)
         
         # Build response
         result = []
         for server in instances:
-            server_data = build_server_response(server, instance_types, instance_status, config_validation, user_attributes['email'])
+            server_data = build_server_response(server, instance_types, instance_status, disk_sizes, config_validation, user_attributes['email'])
             result.append(server_data)
             continue
             # try:
-            #     server_data = build_server_response(server, instance_types, instance_status, config_validation, user_attributes['email'])
+            #     server_data = build_server_response(server, instance_types, instance_status, disk_sizes, config_validation, user_attributes['email'])
             #     result.append(server_data)
             # except Exception as e:
             #     # Log error but continue processing other servers
@@ -1,11 +1,11 @@
 import json
 import os
-import boto3
 from datetime import datetime, timedelta
 from botocore.exceptions import ClientError
+import clientHelper
 import utilHelper
 
-cloudwatch = boto3.client('cloudwatch')
+cloudwatch = clientHelper.get_client('cloudwatch')
 
 utl = utilHelper.Utils()
 
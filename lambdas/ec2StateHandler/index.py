@@ -1,27 +1,20 @@
-import boto3
 import logging
+import json
 import os
 from datetime import datetime, timezone, timedelta
-import httpx
-from httpx_aws_auth import AwsSigV4Auth, AwsCredentials 
-from botocore.config import Config
+import functools
+import clientHelper
+import appsyncClient
 import ec2Helper
 import utilHelper
 import ddbHelper
-import pytz
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Configure boto3 clients with timeouts
-boto_config = Config(
-    connect_timeout=5,
-    read_timeout=10,
-    retries={'max_attempts': 3, 'mode': 'standard'}
-)
-
-eb_client = boto3.client('events', config=boto_config)
+# Shared events client with a shorter read timeout
+eb_client = clientHelper.get_client('events', read_timeout=10)
 
 appValue = os.getenv('TAG_APP_VALUE')
 appName = os.getenv('APP_NAME') 
@@ -33,46 +26,56 @@ cognito_pool_id = os.getenv('COGNITO_USER_POOL_ID', None)
 utl = utilHelper.Utils()
 ec2_utils = ec2Helper.Ec2Utils()
 ddb = ddbHelper.CoreTableDyn(servers_table_name)
-utc = pytz.utc
-pst = pytz.timezone('US/Pacific')
 
-scheduled_event_bridge_rule = utl.get_ssm_param(f"/{appName}/{envName}/scheduledrule")
-logger.info(f"Scheduled EventBridge Rule: {scheduled_event_bridge_rule}")
+# Resolved on first use so the init phase makes no network calls
+_scheduled_event_bridge_rule = None
 
-# Connection pool for AppSync client
-_appsync_client = None
 
-def get_appsync_client():
-    """Get or create AppSync client with connection pooling."""
-    global _appsync_client
-    if _appsync_client is None:
-        session = boto3.Session()
-        creds = session.get_credentials()
-        _appsync_client = httpx.Client(
-            auth=AwsSigV4Auth(
-                credentials=AwsCredentials(
-                    access_key=creds.access_key,
-                    secret_key=creds.secret_key,
-                    session_token=creds.token,
-                ),
-                region=session.region_name,
-                service='appsync',
-            ),
-            timeout=30.0
-        )
-    return _appsync_client
-
-putServerMetric = """
-mutation PutServerMetric($input: ServerMetricInput!) {
-    putServerMetric(input: $input) {
-        id
-        memStats
-        cpuStats
-        networkStats
-        activeUsers
-    }
+# putServerMetric fields and the CloudWatch series behind them
+SERVER_METRICS = {
+    'memStats': ('MinecraftDashboard', 'mem_usage', 'Percent', 'Average'),
+    'cpuStats': ('MinecraftDashboard', 'cpu_usage', 'Percent', 'Average'),
+    'networkStats': ('MinecraftDashboard', 'transmit_bandwidth', 'Bytes/Second', 'Sum'),
+    'activeUsers': ('MinecraftDashboard', 'user_count', 'Count', 'Maximum')
 }
-"""
+
+# Metric history window, and how often each server gets a full window instead of a delta
+METRIC_WINDOW = timedelta(hours=1)
+METRIC_FULL_RESYNC_SECONDS = int(os.getenv('METRIC_FULL_RESYNC_SECONDS', '900'))
+# A series with no new datapoints still moves its watermark up to this far behind now,
+# so one quiet series doesn't keep the whole batch fetching the full window
+METRIC_LATE_DATA_SECONDS = 300
+
+# Last published datapoint per server and series, backed by CoreTable for cold starts
+_metric_watermarks = {}
+
+# Aliased putServerMetric mutations are packed into requests of at most this many bytes
+METRIC_BATCH_MAX_BYTES = int(os.getenv('METRIC_BATCH_MAX_BYTES', str(256 * 1024)))
+METRIC_PUBLISH_WORKERS = 4
+
+# States that end a running interval in the runtime ledger
+RUNTIME_STOP_STATES = ('stopping', 'stopped', 'shutting-down', 'terminated')
+
+def get_scheduled_rule_name():
+    """Get the scheduled EventBridge rule name from SSM, memoized once found."""
+    global _scheduled_event_bridge_rule
+    if _scheduled_event_bridge_rule is None:
+        _scheduled_event_bridge_rule = utl.get_ssm_param(f"/{appName}/{envName}/scheduledrule")
+        logger.info(f"Scheduled EventBridge Rule: {_scheduled_event_bridge_rule}")
+    return _scheduled_event_bridge_rule
+
+@functools.lru_cache(maxsize=None)
+def get_pacific_timezone():
+    """US/Pacific tzinfo; pytz is only imported when a launch time is formatted."""
+    import pytz
+    return pytz.timezone('US/Pacific')
+
+def get_appsync_client():
+    """Shared AppSync client; its connection pool stays warm across invocations."""
+    return appsyncClient.get_appsync_client(endpoint)
+
+# Fields selected on each aliased putServerMetric; subscribers only receive selected fields
+SERVER_METRIC_SELECTION = "id memStats cpuStats networkStats activeUsers isDelta"
 
 changeServerState = """
   mutation ChangeServerState($input: ServerInfoInput!) {
@@ -96,16 +99,11 @@ changeServerState = """
 
 def send_to_appsync(payload):
     logger.info("------- send_to_appsync")
-    if not endpoint:
-        raise ValueError("APPSYNC_URL environment variable not set")
-    
-    headers = {"Content-Type": "application/json"}
-    client = get_appsync_client()
     try:
-        response = client.post(endpoint, headers=headers, json=payload)
-        response.raise_for_status()
-        logger.info(response.json())
-    except httpx.HTTPStatusError as e:
+        body = get_appsync_client().send(payload)
+        logger.info(body)
+        return body
+    except appsyncClient.AppSyncError as e:
         logger.error(f"HTTP error sending to AppSync: {e}")
         raise
     except Exception as e:
@@ -114,31 +112,85 @@ def send_to_appsync(payload):
     
 def schedule_event_response():
     logger.info("------- schedule_event_response")
-    # Check for instances running to update their stats. It can only be a Schedule Event
-    instances_running = ec2_utils.list_servers_by_state("running")    
-
-    logger.info(instances_running)
+    # Check for instances running to update their stats. It can only be a Schedule Event.
+    # Read the whole running set from the fleet index; the paged listings stop at 10
+    instances_running = ec2_utils.fleet.by_state("running")
 
-    if not instances_running or "TotalInstances" not in instances_running or instances_running["TotalInstances"] == 0:  
+    if not instances_running:
         logger.error("No Instances Found for updating")
         return None
 
-    instances_payload = []
-    dt_start_time = datetime.now(tz=timezone.utc) - timedelta(hours=1)
     dt_now = datetime.now(tz=timezone.utc)
+    now_ms = int(dt_now.timestamp() * 1000)
+    instance_ids = [instance["InstanceId"] for instance in instances_running]
+    logger.info(f"Running servers: {instance_ids}")
+    watermarks = load_metric_watermarks(instance_ids)
+
+    # Servers due a resync get the whole window; the rest only what is newer than their watermark
+    full_ids = [instance_id for instance_id in instance_ids
+                if not watermarks.get(instance_id) or
+                now_ms - watermarks[instance_id]['fullSyncAt'] >= METRIC_FULL_RESYNC_SECONDS * 1000]
+    delta_ids = [instance_id for instance_id in instance_ids if instance_id not in full_ids]
+
+    # One batched GetMetricData request per group covers every instance and metric
+    metrics = {}
+    if full_ids:
+        metrics.update(utl.get_instance_metrics(full_ids, SERVER_METRICS, dt_now - METRIC_WINDOW, dt_now, 60))
+    if delta_ids:
+        since_ms = min(min(watermarks[instance_id]['series'].values(), default=0) for instance_id in delta_ids)
+        dt_since = max(dt_now - METRIC_WINDOW, datetime.fromtimestamp(since_ms / 1000, tz=timezone.utc))
+        metrics.update(utl.get_instance_metrics(delta_ids, SERVER_METRICS, dt_since, dt_now, 60))
 
-    # TODO: Optimize with CloudWatch get_metric_data batch API to reduce N+1 queries
-    for instance in instances_running["Instances"]:
-        instance_info = {
-            'id': instance["InstanceId"],
-            'memStats': utl.get_metrics_data(instance["InstanceId"], 'MinecraftDashboard', 'mem_usage', 'Percent', 'Average', dt_start_time, dt_now, 60),
-            'cpuStats': utl.get_metrics_data(instance["InstanceId"], 'MinecraftDashboard', 'cpu_usage', 'Percent', 'Average', dt_start_time, dt_now, 60),
-            'networkStats': utl.get_metrics_data(instance["InstanceId"], 'MinecraftDashboard', 'transmit_bandwidth', 'Bytes/Second', 'Sum', dt_start_time, dt_now, 60),
-            'activeUsers': utl.get_metrics_data(instance["InstanceId"], 'MinecraftDashboard', 'user_count', 'Count', 'Maximum', dt_start_time, dt_now, 60)
-        }
-        instances_payload.append(instance_info)
+    # A failed fetch is not "no data": skip the server so its chart and watermark stay put until the next tick
+    failed_ids = [instance_id for instance_id in instance_ids if metrics.get(instance_id) is None]
+    if failed_ids:
+        logger.error(f"Skipping metrics for {len(failed_ids)} servers after fetch failures: {failed_ids}")
+
+    logger.info(f"Metric tick: {len(full_ids)} full, {len(delta_ids)} delta")
+    return [(instance_id, *build_metric_update(instance_id, metrics[instance_id], watermarks.get(instance_id),
+                                               instance_id in full_ids, now_ms))
+            for instance_id in instance_ids if instance_id not in failed_ids]
+
+def load_metric_watermarks(instance_ids):
+    """Get metric watermarks from memory, reading servers this container hasn't seen from CoreTable."""
+    missing = [instance_id for instance_id in instance_ids if instance_id not in _metric_watermarks]
+    if missing:
+        try:
+            _metric_watermarks.update(ddb.get_metric_watermarks(missing))
+        except Exception as e:
+            logger.warning(f"Could not read metric watermarks, resyncing: {e}")
+    return {instance_id: _metric_watermarks.get(instance_id) for instance_id in instance_ids}
 
-    return instances_payload
+def build_metric_update(instance_id, series, watermark, full_sync, now_ms):
+    """
+    Build the putServerMetric input for one server and its next watermark.
+
+    A full sync publishes every series as fetched. A delta keeps only datapoints
+    newer than the series watermark and is skipped (input None) when nothing is new.
+
+    Returns:
+        tuple: (input dict or None, watermark dict)
+    """
+    previous = watermark['series'] if watermark and not full_sync else {}
+    late_floor_ms = now_ms - METRIC_LATE_DATA_SECONDS * 1000
+
+    metric_input = {'id': instance_id, 'isDelta': not full_sync}
+    marks = {}
+    has_new_points = False
+    for field in SERVER_METRICS:
+        points = [point for point in json.loads(series.get(field, '[]')) if point['x'] > previous.get(field, 0)]
+        metric_input[field] = json.dumps(points)
+        marks[field] = max([previous.get(field, 0)] + [point['x'] for point in points]) if points \
+            else max(previous.get(field, 0), late_floor_ms)
+        has_new_points = has_new_points or bool(points)
+
+    next_watermark = {
+        'series': marks,
+        'fullSyncAt': now_ms if full_sync else watermark['fullSyncAt']
+    }
+    if not full_sync and not has_new_points:
+        return None, next_watermark
+    return metric_input, next_watermark
 
 def manage_scheduled_rule(increment=True):
     """Enable or disable scheduled rule based on atomic counter."""
@@ -160,7 +212,7 @@ def manage_scheduled_rule(increment=True):
                 
                 if previous_count == 0:
                     try:
-                        eb_client.enable_rule(Name=scheduled_event_bridge_rule)
+                        eb_client.enable_rule(Name=get_scheduled_rule_name())
                         logger.info("Enabled EventBridge Rule (first instance)")
                     except Exception as e:
                         logger.error(f"Failed to enable EventBridge rule: {e}")
@@ -186,7 +238,7 @@ def manage_scheduled_rule(increment=True):
                 
                 if previous_count == 1:
                     try:
-                        eb_client.disable_rule(Name=scheduled_event_bridge_rule)
+                        eb_client.disable_rule(Name=get_scheduled_rule_name())
                         logger.info("Disabled EventBridge Rule (last instance)")
                     except Exception as e:
                         logger.error(f"Failed to disable EventBridge rule: {e}")
@@ -235,10 +287,10 @@ def state_change_response(instance_id):
     instanceName = tags.get("Name", "Undefined")
 
     # Converting to PST as the logs are in PST        
-    pstLaunchTime = launchTime.astimezone(pst)
+    pstLaunchTime = launchTime.astimezone(get_pacific_timezone())
 
     # Get cached running minutes with timestamp
-    runtime_data = ec2_utils.get_cached_running_minutes(instance_id)
+    runtime_data = ec2_utils.get_cached_running_minutes(instance_id, core_dyn=ddb)
     
     # building payload
     input = {
@@ -260,9 +312,25 @@ def state_change_response(instance_id):
 
     return input
     
+def record_runtime_transition(instance_id, state, event_time):
+    """Append a running/stopped transition to the server's runtime ledger in CoreTable."""
+    if state != 'running' and state not in RUNTIME_STOP_STATES:
+        return
+    try:
+        # Only dashboard servers get a ledger; the metadata read is shared with the cache lookup
+        if not ddb.get_server_info(instance_id):
+            logger.info(f"{instance_id} is not a registered server, skipping runtime ledger")
+            return
+        if state == 'running':
+            ddb.open_runtime_interval(instance_id, event_time)
+        else:
+            ddb.close_runtime_interval(instance_id, event_time)
+    except Exception as e:
+        logger.error(f"Failed to record runtime transition for {instance_id}: {e}")
+
 def handle_instance_state_change(event):
     """Handle EC2 Instance State-change Notification events."""
-    if not scheduled_event_bridge_rule:
+    if not get_scheduled_rule_name():
         logger.error("Scheduled Event Name not registered")
         return "No Scheduled Event"
     
@@ -270,6 +338,11 @@ def handle_instance_state_change(event):
     state = event['detail']['state']
     
     logger.info("Found InstanceId: " + instance_id + ' at ' + state + ' state')
+
+    # The fleet snapshot in this container no longer matches EC2
+    ec2_utils.invalidate_fleet_snapshot()
+
+    record_runtime_transition(instance_id, state, event.get('time') or datetime.now(timezone.utc))
     
     if state == "running":
         manage_scheduled_rule(increment=True)
@@ -293,13 +366,120 @@ def handle_scheduled_event():
         logger.warning("No running instances found")
         return
     
-    for metrics in input_data:
-        payload = {"query": putServerMetric, 'variables': {"input": metrics}}
-        send_to_appsync(payload)
+    watermarks = {}
+    metric_inputs = []
+    for instance_id, metric_input, watermark in input_data:
+        if metric_input is None:
+            # Nothing new; only the in-memory watermark moves
+            _metric_watermarks[instance_id] = watermark
+        else:
+            watermarks[instance_id] = watermark
+            metric_inputs.append(metric_input)
+
+    published = {}
+    for instance_id, error in publish_metrics(metric_inputs).items():
+        if error:
+            logger.error(f"Failed to publish metrics for {instance_id}: {error}")
+            continue
+        _metric_watermarks[instance_id] = watermarks[instance_id]
+        published[instance_id] = watermarks[instance_id]
+
+    if published:
+        try:
+            ddb.put_metric_watermarks(published)
+        except Exception as e:
+            logger.warning(f"Could not save metric watermarks: {e}")
+
+def build_metric_batches(metric_inputs, max_bytes=METRIC_BATCH_MAX_BYTES):
+    """Split putServerMetric inputs into batches whose serialized inputs stay under max_bytes."""
+    batches, current, current_bytes = [], [], 0
+    for metric_input in metric_inputs:
+        # Input JSON plus room for the alias, variable definition and selection set
+        input_bytes = len(json.dumps(metric_input)) + len(SERVER_METRIC_SELECTION) + 96
+        if current and current_bytes + input_bytes > max_bytes:
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(metric_input)
+        current_bytes += input_bytes
+    if current:
+        batches.append(current)
+    return batches
+
+def aliased_metric_mutation(count):
+    """One GraphQL document with count aliased putServerMetric mutations (m0, m1, ...)."""
+    variables = ", ".join(f"$m{n}: ServerMetricInput!" for n in range(count))
+    mutations = "\n".join(f"    m{n}: putServerMetric(input: $m{n}) {{ {SERVER_METRIC_SELECTION} }}"
+                          for n in range(count))
+    return f"mutation PutServerMetrics({variables}) {{\n{mutations}\n}}"
+
+def metric_batch_payload(batch):
+    """GraphQL payload sending a batch of putServerMetric inputs as one aliased mutation."""
+    return {
+        "query": aliased_metric_mutation(len(batch)),
+        "variables": {f"m{n}": metric_input for n, metric_input in enumerate(batch)}
+    }
+
+def metric_batch_results(batch, body):
+    """
+    Map an aliased mutation response back to the servers in the batch.
+
+    Args:
+        batch (list): putServerMetric inputs, in alias order
+        body (dict|Exception): Response body, or the error that failed the whole request
+
+    Returns:
+        dict: {instance_id: None on success, or the error for that alias}
+    """
+    if isinstance(body, Exception):
+        return {metric_input['id']: str(body) for metric_input in batch}
+
+    # GraphQL errors carry the alias as the first path element
+    alias_errors = {}
+    request_error = None
+    for error in body.get('errors') or []:
+        path = error.get('path') or []
+        if path:
+            alias_errors.setdefault(path[0], error.get('message', 'Unknown error'))
+        else:
+            request_error = request_error or error.get('message', 'Unknown error')
+
+    data = body.get('data') or {}
+    results = {}
+    for n, metric_input in enumerate(batch):
+        alias = f"m{n}"
+        if alias in alias_errors:
+            results[metric_input['id']] = alias_errors[alias]
+        elif data.get(alias) is None:
+            results[metric_input['id']] = request_error or 'No data returned'
+        else:
+            results[metric_input['id']] = None
+    return results
+
+def publish_metrics(metric_inputs):
+    """
+    Publish putServerMetric inputs for the whole fleet in a few aliased requests,
+    sent concurrently over the shared AppSync client's pool.
+
+    Returns:
+        dict: {instance_id: None on success, or the error message}
+    """
+    if not metric_inputs:
+        return {}
+
+    batches = build_metric_batches(metric_inputs)
+    logger.info(f"Publishing {len(metric_inputs)} metric updates in {len(batches)} requests")
+    client = get_appsync_client()
+    bodies = client.send_many([metric_batch_payload(batch) for batch in batches], max_workers=METRIC_PUBLISH_WORKERS)
+
+    results = {}
+    for batch, body in zip(batches, bodies):
+        results.update(metric_batch_results(batch, body))
+    logger.info(f"AppSync latency: {client.latency_stats()}")
+    return results
 
 def handler(event, context):
     """Main handler for ec2StateHandler Lambda."""
-    global _appsync_client
+    ddb.reset_request_cache()
     try:
         # Check if this is an EventBridge event
         if 'detail-type' not in event:
@@ -331,8 +511,3 @@ def handler(event, context):
         #                      exception=e, error=str(e))
         logger.error(f"Error processing event: {str(e)}")
         return f"Error processing event: {str(e)}"
-    finally:
-        # Clean up AppSync client connection
-        if _appsync_client is not None:
-            _appsync_client.close()
-            _appsync_client = None
\ No newline at end of file
@@ -1,6 +1,6 @@
-import boto3
 import logging
 import os
+import clientHelper
 import authHelper
 import ec2Helper
 import utilHelper
@@ -8,7 +8,7 @@ import utilHelper
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-ec2_client = boto3.client('ec2')
+ec2_client = clientHelper.get_client('ec2')
 ec2_utils = ec2Helper.Ec2Utils()
 utl = utilHelper.Utils()
 
@@ -24,7 +24,7 @@ class IamProfile:
     """Manages IAM instance profile association for EC2 instances"""
     
     def __init__(self, instance_id):
-        self.ec2_client = boto3.client('ec2')
+        self.ec2_client = clientHelper.get_client('ec2')
         self.instance_id = instance_id
         self.association_id = None
 
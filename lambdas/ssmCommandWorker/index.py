@@ -1,8 +1,8 @@
-import boto3
 import logging
 import os
 import json
 import time
+import clientHelper
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -11,8 +11,8 @@ appValue = os.getenv('TAG_APP_VALUE')
 appName = os.getenv('APP_NAME') 
 envName = os.getenv('ENVIRONMENT_NAME')
 
-ssm = boto3.client('ssm')
-ec2_client = boto3.client('ec2')
+ssm = clientHelper.get_client('ssm')
+ec2_client = clientHelper.get_client('ec2')
 
 def check_instance_ready(instance_id):
     """
@@ -1,20 +1,211 @@
-import boto3
+import concurrent.futures
+import hashlib
 import logging
 import os
+import threading
 import time
 import requests
-from jose import jwk, jwt
-from jose.utils import base64url_decode
+from collections import OrderedDict
+from datetime import datetime, timezone
+import clientHelper
 # from errorHandler import ErrorHandler
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-session = boto3.session.Session()
+session = clientHelper.get_session()
 aws_region = session.region_name
-             
+
+# JWKS keys rotate rarely; keep them for the life of a warm container and
+# refresh on TTL expiry or when a token names a kid we have not seen.
+JWKS_CACHE_TTL_SECONDS = int(os.getenv('JWKS_CACHE_TTL_SECONDS', '3600'))
+# Lower bound between kid-miss refreshes so forged kids can't hammer the endpoint
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 30
+JWKS_FETCH_TIMEOUT_SECONDS = 5
+
+# Verified tokens are kept until their exp so repeat requests skip verification
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', '256'))
+# Build user_attributes from ID-token claims instead of calling admin_get_user
+AUTH_ATTRIBUTES_FROM_CLAIMS = os.getenv('AUTH_ATTRIBUTES_FROM_CLAIMS', 'false').lower() == 'true'
+
+# Cached USER#<sub>/PROFILE items older than this are re-resolved from Cognito
+USER_PROFILE_TTL_SECONDS = int(os.getenv('USER_PROFILE_TTL_SECONDS', '86400'))
+# Cognito admin APIs are rate limited per pool; keep bulk lookups narrow
+USER_RESOLVE_MAX_WORKERS = 4
+
+USER_ATTRIBUTE_NAMES = ["email", "given_name", "family_name", "sub", "name", "username", "cognito:username"]
+
+
+class JwksCache:
+    """
+    Process-wide cache of Cognito public keys, indexed by kid.
+
+    Keys are constructed once with jwk.construct and reused by every request
+    served by the container. Refreshes are single-flight: concurrent callers
+    that miss wait on the lock and reuse the key set fetched by the first one.
+    """
+
+    def __init__(self, jwk_url, ttl_seconds=JWKS_CACHE_TTL_SECONDS,
+                 min_refresh_interval=JWKS_MIN_REFRESH_INTERVAL_SECONDS):
+        self.jwk_url = jwk_url
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval = min_refresh_interval
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_key(self, kid):
+        """
+        Return the constructed public key for kid, refreshing the key set if
+        it is expired or the kid is unknown.
+
+        Returns:
+            Key object or None if the kid is not published by the pool
+        """
+        key = self._keys.get(kid)
+        if key is not None and not self._is_expired():
+            return key
+
+        self._refresh(kid)
+        return self._keys.get(kid)
+
+    def invalidate(self):
+        """Drop cached keys so the next lookup downloads the key set."""
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = 0.0
+            self._failed_at = 0.0
+
+    def _is_expired(self):
+        return time.time() - self._fetched_at >= self.ttl_seconds
+
+    def _refresh(self, kid):
+        observed_attempt = (self._fetched_at, self._failed_at)
+
+        with self._lock:
+            # Another thread refreshed (or failed to) while we were waiting on the lock
+            if (self._fetched_at, self._failed_at) != observed_attempt:
+                return
+
+            # Unknown kid on a fresh key set: only refetch after the cooldown
+            if not self._is_expired() and time.time() - self._fetched_at < self.min_refresh_interval:
+                logger.warning(f"Key {kid} not in recently fetched jwks.json, skipping refresh")
+                return
+
+            # Endpoint failed recently: serve the stale keys rather than block every request on the timeout
+            if time.time() - self._failed_at < self.min_refresh_interval:
+                return
+
+            try:
+                with requests.get(self.jwk_url, timeout=JWKS_FETCH_TIMEOUT_SECONDS) as keys_response:
+                    keys_response.raise_for_status()
+                    keys = keys_response.json()["keys"]
+
+                from jose import jwk
+
+                self._keys = {key['kid']: jwk.construct(key) for key in keys}
+                self._fetched_at = time.time()
+                self._failed_at = 0.0
+                logger.info(f"Loaded {len(self._keys)} keys from jwks.json")
+
+            except (requests.RequestException, ValueError, KeyError) as e:
+                # Keep serving the previous key set; it is still valid for tokens it signed
+                self._failed_at = time.time()
+                logger.error(f"Error fetching JWT keys: {e}")
+
+
+_jwks_caches = {}
+_jwks_caches_lock = threading.Lock()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified tokens, keyed by a SHA-256 of the raw token.
+
+    Each entry holds the resolved user_attributes and the token's exp claim;
+    an entry is dropped as soon as the token expires.
+    """
+
+    def __init__(self, max_entries=TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(str(token).encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        """Return a copy of the cached user_attributes, or None on miss."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user_attributes = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(user_attributes)
+
+    def put(self, token, expires_at, user_attributes):
+        """Cache user_attributes for token until expires_at (epoch seconds)."""
+        if self.max_entries <= 0 or time.time() >= expires_at:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(user_attributes))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters for tuning TOKEN_CACHE_MAX_ENTRIES."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxEntries': self.max_entries,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_token_cache = VerifiedTokenCache()
+
+
+def get_jwks_cache(jwk_url):
+    """Return the shared JwksCache for a jwks.json URL."""
+    cache = _jwks_caches.get(jwk_url)
+    if cache is None:
+        with _jwks_caches_lock:
+            cache = _jwks_caches.setdefault(jwk_url, JwksCache(jwk_url))
+    return cache
+
+
 class Auth:
-    def __init__(self,cognito_pool_id):
+    # Shared client from clientHelper, created on first use
+    cognito_idp = clientHelper.LazyClient('cognito-idp')
+
+    def __init__(self,cognito_pool_id, attributes_from_claims=None):
         logger.info("------- Auth Class Initialization")
 
         cognito_pool_id = cognito_pool_id or os.getenv('COGNITO_USER_POOL_ID')
@@ -23,23 +214,23 @@ class Auth:
 
         self.cognito_pool_id = cognito_pool_id
         self.jwk_url = 'https://cognito-idp.{}.amazonaws.com/{}/.well-known/jwks.json'.format(aws_region, cognito_pool_id)
-        self.cognito_idp = boto3.client('cognito-idp')
+        self.jwks_cache = get_jwks_cache(self.jwk_url)
+        self.token_cache = _token_cache
+        self.attributes_from_claims = AUTH_ATTRIBUTES_FROM_CLAIMS if attributes_from_claims is None else attributes_from_claims
 
-    def is_token_valid(self,token,keys):
+    def is_token_valid(self,token):
         # https://github.com/awslabs/aws-support-tools/tree/master/Cognito/decode-verify-jwt
+        # python-jose pulls in the cryptography backend; import it on the first verification
+        from jose import jwt
+        from jose.utils import base64url_decode
+
         headers = jwt.get_unverified_headers(token)
         kid = headers['kid']
-        # search for the kid in the downloaded public keys
-        key_index = -1
-        for i in range(len(keys)):
-            if kid == keys[i]['kid']:
-                key_index = i
-                break
-        if key_index == -1:
+        # look up the constructed public key for the kid
+        public_key = self.jwks_cache.get_key(kid)
+        if public_key is None:
             logger.error('Public key not found in jwks.json')
             return None
-        # construct the public key
-        public_key = jwk.construct(keys[key_index])
         # get the last two sections of the token,
         # message and signature (encoded in base64)
         message, encoded_signature = str(token).rsplit('.', 1)
@@ -74,25 +265,46 @@ class Auth:
                 raise ValueError("No Authorization header found")
 
     def process_token(self,token):
-        # download the key
-        try:
-            with requests.get(self.jwk_url) as keys_response:
-                keys_response.raise_for_status()
-                keys = keys_response.json()["keys"]
-        except (requests.RequestException, ValueError, KeyError) as e:
-            logger.error(f"Error fetching JWT keys: {e}")
-            return None
+        cached_attributes = self.token_cache.get(token)
+        if cached_attributes is not None:
+            return cached_attributes
 
-        token_claims = self.is_token_valid(token,keys)
+        token_claims = self.is_token_valid(token)
 
         if token_claims is None:
             logger.error("Invalid Token")
             return None
-        
-        user_attributes = {}
 
         user_name = token_claims.get("cognito:username") or token_claims.get("username")
 
+        user_attributes = None
+        if self.attributes_from_claims:
+            user_attributes = self._attributes_from_claims(token_claims, user_name)
+
+        if user_attributes is None:
+            user_attributes = self._attributes_from_cognito(user_name)
+
+        self.token_cache.put(token, token_claims['exp'], user_attributes)
+        return user_attributes
+
+    def _attributes_from_claims(self, token_claims, user_name):
+        """
+        Build user_attributes from ID-token claims.
+        Access tokens carry no email, so they return None and fall back to Cognito.
+        """
+        if token_claims.get("token_use") != "id" or not token_claims.get("email") or not token_claims.get("sub"):
+            return None
+
+        user_attributes = {"username": user_name}
+        for name in USER_ATTRIBUTE_NAMES:
+            if name in token_claims and name not in user_attributes:
+                user_attributes[name] = token_claims[name]
+
+        return user_attributes
+
+    def _attributes_from_cognito(self, user_name):
+        user_attributes = {}
+
         # Get User attributes from Cognito
         cog_user = self.cognito_idp.admin_get_user(
             UserPoolId=self.cognito_pool_id,
@@ -102,11 +314,15 @@ class Auth:
         user_attributes["username"] = user_name
 
         for att in cog_user["UserAttributes"]:
-            if att["Name"].lower() in ["email", "given_name", "family_name", "sub", "name", "username", "cognito:username"]:
+            if att["Name"].lower() in USER_ATTRIBUTE_NAMES:
                 user_attributes[att["Name"].lower()] = att["Value"]
 
         return user_attributes
 
+    def token_cache_stats(self):
+        """Hit/miss counters for the verified-token cache."""
+        return self.token_cache.stats()
+
     def group_exists(self, instanceId):
         try:
             self.cognito_idp.get_group(
@@ -221,17 +437,41 @@ class Auth:
             logger.warning(str(e))
             return []
       
-    def find_user_by_email(self, email):
+    def find_user_by_email(self, email, profile_store=None):
         """
-        Find a user in Cognito by their email address.
+        Find a user by their email address.
+
+        The EMAIL#<email> index in CoreTable is checked first when a
+        profile_store (ddbHelper.CoreTableDyn) is given. On a miss the
+        Cognito list_users filter is used and the result is indexed.
         
         Args:
             email (str): The email address to search for
+            profile_store (CoreTableDyn, optional): CoreTable helper holding the email index
             
         Returns:
             dict: User information if found, None if not found
             Format: {'username': str, 'email': str, 'fullName': str, 'sub': str}
         """
+        if profile_store is not None:
+            try:
+                indexed_user = profile_store.get_user_by_email(email)
+                if indexed_user:
+                    return indexed_user
+            except Exception as e:
+                logger.warning(f"Error reading email index for {email}: {str(e)}")
+
+        user_info = self._find_cognito_user_by_email(email)
+
+        if user_info and profile_store is not None:
+            try:
+                profile_store.put_user_email_index(user_info)
+            except Exception as e:
+                logger.warning(f"Error indexing email {email}: {str(e)}")
+
+        return user_info
+
+    def _find_cognito_user_by_email(self, email):
         try:
             # Use list_users with email filter
             response = self.cognito_idp.list_users(
@@ -359,6 +599,93 @@ class Auth:
             logger.error(str(e))
             return None
     
+    def get_users_by_sub(self, user_subs, profile_store=None, max_workers=USER_RESOLVE_MAX_WORKERS):
+        """
+        Resolve many Cognito subs to user information.
+
+        Profiles cached in CoreTable are read with one batch call when a
+        profile_store (ddbHelper.CoreTableDyn) is given. Missing or stale
+        profiles are resolved from Cognito with bounded concurrency and
+        written back. A stale profile is still returned if Cognito fails.
+
+        Args:
+            user_subs (list): Cognito user subs
+            profile_store (CoreTableDyn, optional): CoreTable helper holding USER#<sub>/PROFILE items
+            max_workers (int): Maximum concurrent Cognito lookups
+
+        Returns:
+            dict: {sub: {'username': str, 'email': str, 'fullName': str, 'sub': str}} for resolved users
+        """
+        user_subs = list(dict.fromkeys(sub for sub in user_subs if sub))
+        if not user_subs:
+            return {}
+
+        cached_profiles = {}
+        if profile_store is not None:
+            try:
+                cached_profiles = profile_store.get_user_profiles(user_subs)
+            except Exception as e:
+                logger.warning(f"Error reading cached user profiles: {str(e)}")
+
+        resolved = {}
+        to_resolve = []
+        for sub in user_subs:
+            profile = cached_profiles.get(sub)
+            if profile and profile.get('email') and not self._is_profile_stale(profile):
+                resolved[sub] = self._format_profile(profile)
+            else:
+                to_resolve.append(sub)
+
+        if not to_resolve:
+            return resolved
+
+        logger.info(f"Resolving {len(to_resolve)} of {len(user_subs)} users from Cognito")
+        fresh_profiles = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_resolve)))) as executor:
+            futures = {executor.submit(self.get_user_by_sub, sub): sub for sub in to_resolve}
+            for future in concurrent.futures.as_completed(futures):
+                sub = futures[future]
+                try:
+                    user_info = future.result()
+                except Exception as e:
+                    logger.warning(f"Could not get user details from Cognito for {sub}: {str(e)}")
+                    user_info = None
+
+                if user_info:
+                    resolved[sub] = user_info
+                    fresh_profiles.append(user_info)
+                elif cached_profiles.get(sub, {}).get('email'):
+                    # Cognito unavailable or throttled - a stale profile beats no name
+                    resolved[sub] = self._format_profile(cached_profiles[sub])
+
+        if profile_store is not None and fresh_profiles:
+            try:
+                profile_store.put_user_profiles(fresh_profiles)
+            except Exception as e:
+                logger.warning(f"Error caching user profiles: {str(e)}")
+
+        return resolved
+
+    @staticmethod
+    def _is_profile_stale(profile):
+        updated_at = profile.get('updatedAt')
+        if not updated_at:
+            return True
+        try:
+            age = datetime.now(timezone.utc) - datetime.fromisoformat(updated_at)
+        except (TypeError, ValueError):
+            return True
+        return age.total_seconds() > USER_PROFILE_TTL_SECONDS
+
+    @staticmethod
+    def _format_profile(profile):
+        return {
+            'username': profile.get('username'),
+            'email': profile['email'],
+            'fullName': profile.get('fullName') or profile['email'],
+            'sub': profile['sub']
+        }
+
     def list_groups_for_user(self, username):
         groups = []
         next_token = None
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the JWKS key-set cache in authHelper.py
+Tests warm-container reuse, kid-miss refresh, TTL expiry and single-flight refresh.
+"""
+import sys
+import os
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['COGNITO_USER_POOL_ID'] = 'test-pool-id'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+import authHelper
+from authHelper import JwksCache
+
+
+def _jwks_response(kids):
+    response = Mock()
+    response.__enter__ = Mock(return_value=response)
+    response.__exit__ = Mock(return_value=False)
+    response.raise_for_status.return_value = None
+    response.json.return_value = {'keys': [{'kid': kid, 'kty': 'RSA'} for kid in kids]}
+    return response
+
+
+class TestJwksCache(unittest.TestCase):
+    """Test suite for JwksCache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.get_patcher = patch('authHelper.requests.get')
+        self.mock_get = self.get_patcher.start()
+
+        self.construct_patcher = patch('jose.jwk.construct', side_effect=lambda key: f"key-{key['kid']}")
+        self.mock_construct = self.construct_patcher.start()
+
+        self.cache = JwksCache('https://example.com/jwks.json', ttl_seconds=3600, min_refresh_interval=30)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.get_patcher.stop()
+        self.construct_patcher.stop()
+
+    def test_keys_fetched_once_and_reused(self):
+        """Test that repeated lookups reuse the constructed keys"""
+        self.mock_get.return_value = _jwks_response(['kid-a', 'kid-b'])
+
+        for _ in range(5):
+            self.assertEqual(self.cache.get_key('kid-a'), 'key-kid-a')
+        self.assertEqual(self.cache.get_key('kid-b'), 'key-kid-b')
+
+        self.assertEqual(self.mock_get.call_count, 1)
+        self.assertEqual(self.mock_construct.call_count, 2)
+
+    def test_unknown_kid_refreshes_after_cooldown(self):
+        """Test that a kid miss refetches only once the cooldown has elapsed"""
+        self.mock_get.return_value = _jwks_response(['kid-a'])
+        self.cache.get_key('kid-a')
+
+        # Rotated key published, but the cooldown blocks an immediate refetch
+        self.mock_get.return_value = _jwks_response(['kid-a', 'kid-new'])
+        self.assertIsNone(self.cache.get_key('kid-new'))
+        self.assertEqual(self.mock_get.call_count, 1)
+
+        self.cache._fetched_at -= 31
+        self.assertEqual(self.cache.get_key('kid-new'), 'key-kid-new')
+        self.assertEqual(self.mock_get.call_count, 2)
+
+    def test_expired_key_set_is_refreshed(self):
+        """Test that the key set is refetched after the TTL"""
+        self.mock_get.return_value = _jwks_response(['kid-a'])
+        self.cache.get_key('kid-a')
+
+        self.cache._fetched_at -= 3601
+        self.cache.get_key('kid-a')
+
+        self.assertEqual(self.mock_get.call_count, 2)
+
+    def test_fetch_failure_keeps_previous_keys(self):
+        """Test that a failed refresh keeps serving the stale key set"""
+        self.mock_get.return_value = _jwks_response(['kid-a'])
+        self.cache.get_key('kid-a')
+
+        self.cache._fetched_at -= 3601
+        self.mock_get.side_effect = requests.RequestException("endpoint down")
+
+        self.assertEqual(self.cache.get_key('kid-a'), 'key-kid-a')
+
+    def test_fetch_failure_backs_off(self):
+        """Test that a failed refresh is not retried on every request until the cooldown"""
+        self.mock_get.return_value = _jwks_response(['kid-a'])
+        self.cache.get_key('kid-a')
+
+        self.cache._fetched_at -= 3601
+        self.mock_get.side_effect = requests.RequestException("endpoint down")
+        for _ in range(3):
+            self.assertEqual(self.cache.get_key('kid-a'), 'key-kid-a')
+        self.assertEqual(self.mock_get.call_count, 2)
+
+        self.cache._failed_at -= 31
+        self.mock_get.side_effect = None
+        self.cache.get_key('kid-a')
+        self.assertEqual(self.mock_get.call_count, 3)
+
+    def test_fetch_failure_without_keys_returns_none(self):
+        """Test that lookups fail closed when no key set was ever loaded"""
+        self.mock_get.side_effect = requests.RequestException("endpoint down")
+
+        self.assertIsNone(self.cache.get_key('kid-a'))
+
+    def test_concurrent_misses_share_one_fetch(self):
+        """Test that concurrent threads do not stampede the endpoint"""
+        def slow_get(*args, **kwargs):
+            time.sleep(0.05)
+            return _jwks_response(['kid-a'])
+
+        self.mock_get.side_effect = slow_get
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get_key('kid-a'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['key-kid-a'] * 8)
+        self.assertEqual(self.mock_get.call_count, 1)
+
+    def test_get_jwks_cache_is_shared_per_url(self):
+        """Test that Auth instances for the same pool share one cache"""
+        with patch('boto3.client'):
+            first = authHelper.Auth('test-pool-id')
+            second = authHelper.Auth('test-pool-id')
+
+        self.assertIs(first.jwks_cache, second.jwks_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the verified-token cache in authHelper.py
+Tests LRU bounds, expiry, hit/miss counters and claims-based user attributes.
+"""
+import sys
+import os
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['COGNITO_USER_POOL_ID'] = 'test-pool-id'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+import authHelper
+from authHelper import VerifiedTokenCache
+
+
+class TestVerifiedTokenCache(unittest.TestCase):
+    """Test suite for VerifiedTokenCache"""
+
+    def test_hit_returns_copy_of_attributes(self):
+        """Test that cached attributes can't be mutated by callers"""
+        cache = VerifiedTokenCache(max_entries=4)
+        cache.put('token-a', time.time() + 60, {'sub': 'sub-a'})
+
+        first = cache.get('token-a')
+        first['sub'] = 'tampered'
+
+        self.assertEqual(cache.get('token-a'), {'sub': 'sub-a'})
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_expired_entry_is_a_miss(self):
+        """Test that entries are dropped once the token expires"""
+        cache = VerifiedTokenCache(max_entries=4)
+        cache.put('token-a', time.time() + 60, {'sub': 'sub-a'})
+        cache._entries[cache._key('token-a')] = (time.time() - 1, {'sub': 'sub-a'})
+
+        self.assertIsNone(cache.get('token-a'))
+        stats = cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['size'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache stays bounded"""
+        cache = VerifiedTokenCache(max_entries=2)
+        expires_at = time.time() + 60
+        cache.put('token-a', expires_at, {'sub': 'a'})
+        cache.put('token-b', expires_at, {'sub': 'b'})
+        cache.get('token-a')
+        cache.put('token-c', expires_at, {'sub': 'c'})
+
+        self.assertIsNone(cache.get('token-b'))
+        self.assertIsNotNone(cache.get('token-a'))
+        self.assertIsNotNone(cache.get('token-c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+
+class TestProcessTokenCaching(unittest.TestCase):
+    """Test suite for Auth.process_token with the verified-token cache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.mock_boto_client = self.patcher.start()
+        clientHelper.reset_clients()
+        self.mock_cognito = Mock()
+        self.mock_boto_client.return_value = self.mock_cognito
+        self.mock_cognito.admin_get_user.return_value = {
+            'UserAttributes': [
+                {'Name': 'sub', 'Value': 'sub-123'},
+                {'Name': 'email', 'Value': 'user@example.com'},
+                {'Name': 'given_name', 'Value': 'Steve'}
+            ]
+        }
+
+        self.id_claims = {
+            'token_use': 'id',
+            'sub': 'sub-123',
+            'email': 'user@example.com',
+            'given_name': 'Steve',
+            'family_name': 'Miner',
+            'cognito:username': 'steve',
+            'exp': time.time() + 600
+        }
+        authHelper._token_cache.clear()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+        authHelper._token_cache.clear()
+
+    def test_repeat_token_skips_verification_and_cognito(self):
+        """Test that a cached token is not re-verified"""
+        auth = authHelper.Auth('test-pool-id', attributes_from_claims=False)
+
+        with patch.object(auth, 'is_token_valid', return_value=self.id_claims) as mock_verify:
+            first = auth.process_token('token-1')
+            second = auth.process_token('token-1')
+
+        self.assertEqual(first, second)
+        self.assertEqual(first['email'], 'user@example.com')
+        mock_verify.assert_called_once()
+        self.mock_cognito.admin_get_user.assert_called_once()
+
+    def test_claims_mode_skips_admin_get_user(self):
+        """Test that ID-token claims replace the Cognito lookup"""
+        auth = authHelper.Auth('test-pool-id', attributes_from_claims=True)
+
+        with patch.object(auth, 'is_token_valid', return_value=self.id_claims):
+            attributes = auth.process_token('token-2')
+
+        self.mock_cognito.admin_get_user.assert_not_called()
+        self.assertEqual(attributes['sub'], 'sub-123')
+        self.assertEqual(attributes['email'], 'user@example.com')
+        self.assertEqual(attributes['given_name'], 'Steve')
+        self.assertEqual(attributes['username'], 'steve')
+
+    def test_claims_mode_falls_back_for_access_tokens(self):
+        """Test that access tokens without email still resolve via Cognito"""
+        auth = authHelper.Auth('test-pool-id', attributes_from_claims=True)
+        access_claims = {'token_use': 'access', 'sub': 'sub-123', 'username': 'steve', 'exp': time.time() + 600}
+
+        with patch.object(auth, 'is_token_valid', return_value=access_claims):
+            attributes = auth.process_token('token-3')
+
+        self.mock_cognito.admin_get_user.assert_called_once()
+        self.assertEqual(attributes['email'], 'user@example.com')
+
+    def test_invalid_token_is_not_cached(self):
+        """Test that failed verification is retried on the next request"""
+        auth = authHelper.Auth('test-pool-id')
+
+        with patch.object(auth, 'is_token_valid', return_value=None) as mock_verify:
+            self.assertIsNone(auth.process_token('bad-token'))
+            self.assertIsNone(auth.process_token('bad-token'))
+
+        self.assertEqual(mock_verify.call_count, 2)
+        self.assertEqual(auth.token_cache_stats()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
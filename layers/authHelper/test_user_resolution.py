@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bulk Cognito user resolution in authHelper.py
+Tests the CoreTable profile cache, stale refresh, email index and Cognito fallback behaviour.
+"""
+import sys
+import os
+import unittest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['COGNITO_USER_POOL_ID'] = 'test-pool-id'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+import authHelper
+
+
+def _profile(sub, email, full_name, age=timedelta(minutes=5)):
+    return {
+        'sub': sub,
+        'username': sub,
+        'email': email,
+        'fullName': full_name,
+        'updatedAt': (datetime.now(timezone.utc) - age).isoformat()
+    }
+
+
+def _cognito_user(sub):
+    return {'username': sub, 'email': f'{sub}@example.com', 'fullName': f'User {sub}', 'sub': sub}
+
+
+class TestGetUsersBySub(unittest.TestCase):
+    """Test suite for Auth.get_users_by_sub"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+        self.auth = authHelper.Auth('test-pool-id')
+        self.profile_store = Mock()
+        self.profile_store.get_user_profiles.return_value = {}
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_cached_profiles_skip_cognito(self):
+        """Test that fresh CoreTable profiles are returned without Cognito calls"""
+        self.profile_store.get_user_profiles.return_value = {
+            'sub-a': _profile('sub-a', 'a@example.com', 'Alex A'),
+            'sub-b': _profile('sub-b', 'b@example.com', 'Blair B')
+        }
+
+        with patch.object(self.auth, 'get_user_by_sub') as mock_get_user:
+            result = self.auth.get_users_by_sub(['sub-a', 'sub-b'], profile_store=self.profile_store)
+
+        mock_get_user.assert_not_called()
+        self.profile_store.get_user_profiles.assert_called_once_with(['sub-a', 'sub-b'])
+        self.profile_store.put_user_profiles.assert_not_called()
+        self.assertEqual(result['sub-a']['fullName'], 'Alex A')
+        self.assertEqual(result['sub-b']['email'], 'b@example.com')
+
+    def test_missing_and_stale_profiles_are_resolved_and_cached(self):
+        """Test that only cache misses go to Cognito and are written back"""
+        self.profile_store.get_user_profiles.return_value = {
+            'sub-a': _profile('sub-a', 'a@example.com', 'Alex A'),
+            'sub-b': _profile('sub-b', 'old@example.com', 'Old Name', age=timedelta(days=30))
+        }
+
+        with patch.object(self.auth, 'get_user_by_sub', side_effect=_cognito_user) as mock_get_user:
+            result = self.auth.get_users_by_sub(['sub-a', 'sub-b', 'sub-c'], profile_store=self.profile_store)
+
+        resolved_subs = sorted(call.args[0] for call in mock_get_user.call_args_list)
+        self.assertEqual(resolved_subs, ['sub-b', 'sub-c'])
+        self.assertEqual(result['sub-b']['email'], 'sub-b@example.com')
+
+        written = self.profile_store.put_user_profiles.call_args[0][0]
+        self.assertEqual(sorted(profile['sub'] for profile in written), ['sub-b', 'sub-c'])
+
+    def test_stale_profile_used_when_cognito_fails(self):
+        """Test that a throttled lookup falls back to the stale cached profile"""
+        self.profile_store.get_user_profiles.return_value = {
+            'sub-a': _profile('sub-a', 'a@example.com', 'Alex A', age=timedelta(days=30))
+        }
+
+        with patch.object(self.auth, 'get_user_by_sub', return_value=None):
+            result = self.auth.get_users_by_sub(['sub-a', 'sub-z'], profile_store=self.profile_store)
+
+        self.assertEqual(result['sub-a']['fullName'], 'Alex A')
+        self.assertNotIn('sub-z', result)
+
+    def test_without_profile_store_resolves_from_cognito(self):
+        """Test bulk resolution with no CoreTable cache and duplicate subs"""
+        with patch.object(self.auth, 'get_user_by_sub', side_effect=_cognito_user) as mock_get_user:
+            result = self.auth.get_users_by_sub(['sub-a', 'sub-a', None, 'sub-b'])
+
+        self.assertEqual(mock_get_user.call_count, 2)
+        self.assertEqual(set(result), {'sub-a', 'sub-b'})
+
+    def test_empty_input_makes_no_calls(self):
+        """Test that an empty member list costs nothing"""
+        self.assertEqual(self.auth.get_users_by_sub([], profile_store=self.profile_store), {})
+        self.profile_store.get_user_profiles.assert_not_called()
+
+
+class TestFindUserByEmail(unittest.TestCase):
+    """Test suite for Auth.find_user_by_email with the CoreTable email index"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+        self.auth = authHelper.Auth('test-pool-id')
+        self.profile_store = Mock()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_indexed_email_skips_cognito(self):
+        """Test that an index hit is a single CoreTable read"""
+        self.profile_store.get_user_by_email.return_value = _cognito_user('sub-a')
+
+        with patch.object(self.auth, '_find_cognito_user_by_email') as mock_cognito_lookup:
+            result = self.auth.find_user_by_email('sub-a@example.com', profile_store=self.profile_store)
+
+        mock_cognito_lookup.assert_not_called()
+        self.assertEqual(result['sub'], 'sub-a')
+
+    def test_index_miss_falls_back_and_indexes(self):
+        """Test that a miss resolves via Cognito and writes the mapping"""
+        self.profile_store.get_user_by_email.return_value = None
+
+        with patch.object(self.auth, '_find_cognito_user_by_email', return_value=_cognito_user('sub-b')):
+            result = self.auth.find_user_by_email('sub-b@example.com', profile_store=self.profile_store)
+
+        self.assertEqual(result['sub'], 'sub-b')
+        self.profile_store.put_user_email_index.assert_called_once_with(_cognito_user('sub-b'))
+
+    def test_index_error_falls_back_to_cognito(self):
+        """Test that a CoreTable failure doesn't turn into 'user not found'"""
+        self.profile_store.get_user_by_email.side_effect = Exception("throttled")
+
+        with patch.object(self.auth, '_find_cognito_user_by_email', return_value=_cognito_user('sub-c')):
+            result = self.auth.find_user_by_email('sub-c@example.com', profile_store=self.profile_store)
+
+        self.assertEqual(result['sub'], 'sub-c')
+
+
+if __name__ == '__main__':
+    unittest.main()
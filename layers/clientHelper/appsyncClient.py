@@ -0,0 +1,224 @@
+"""
+Shared AppSync GraphQL publisher.
+
+One SigV4-signing client per endpoint, kept for the life of the container so
+every invocation reuses warm keep-alive connections. Credentials come from the
+shared boto3 session and are only re-read when botocore rotates them. Each
+client records request latency in a histogram that handlers can log.
+"""
+
+import asyncio
+import bisect
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+import time
+
+import urllib3
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+
+import clientHelper
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+APPSYNC_POOL_SIZE = int(os.getenv('APPSYNC_POOL_SIZE', '8'))
+APPSYNC_TIMEOUT_SECONDS = float(os.getenv('APPSYNC_TIMEOUT_SECONDS', '30'))
+CONNECT_TIMEOUT_SECONDS = 5
+# Upper bounds (ms) of the latency histogram buckets; slower requests land in an overflow bucket
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_clients = {}
+_lock = threading.Lock()
+
+
+class AppSyncError(Exception):
+    """Raised when AppSync answers with a non-2xx status or can't be reached."""
+
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram of request latencies in milliseconds."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+
+    def record(self, elapsed_ms):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds, elapsed_ms)] += 1
+            self._total_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+
+    def snapshot(self):
+        """
+        Get the recorded latencies.
+
+        Returns:
+            dict: {'count', 'meanMs', 'maxMs', 'buckets': {'<=10': n, ..., '>5000': n}}
+        """
+        with self._lock:
+            count = sum(self._counts)
+            labels = [f'<={bound}' for bound in self.bounds] + [f'>{self.bounds[-1]}']
+            return {
+                'count': count,
+                'meanMs': round(self._total_ms / count, 1) if count else 0,
+                'maxMs': round(self._max_ms, 1),
+                'buckets': dict(zip(labels, self._counts))
+            }
+
+
+class AppSyncClient:
+    """
+    SigV4-signed GraphQL client for one AppSync endpoint.
+
+    Thread-safe: send() may be called from worker threads, and the async API
+    runs sends on a small executor owned by the client.
+    """
+
+    def __init__(self, endpoint, region_name=None, session=None, pool_size=APPSYNC_POOL_SIZE,
+                 timeout=APPSYNC_TIMEOUT_SECONDS):
+        self.endpoint = endpoint
+        self._session = session or clientHelper.get_session()
+        self.region_name = region_name or self._session.region_name
+        self.pool_size = pool_size
+        self._http = urllib3.PoolManager(
+            maxsize=pool_size,
+            block=False,
+            retries=False,
+            timeout=urllib3.Timeout(connect=CONNECT_TIMEOUT_SECONDS, read=timeout)
+        )
+        self._lock = threading.Lock()
+        self._frozen_credentials = None
+        self._executor = None
+        self.latency = LatencyHistogram()
+
+    def _credentials(self):
+        """Current frozen credentials; botocore only refreshes them when they are about to expire."""
+        frozen = self._session.get_credentials().get_frozen_credentials()
+        with self._lock:
+            previous = self._frozen_credentials
+            if previous is not None and (frozen.access_key, frozen.token) != (previous.access_key, previous.token):
+                logger.info("AppSync credentials rotated")
+            self._frozen_credentials = frozen
+        return frozen
+
+    def send(self, payload):
+        """
+        POST a GraphQL payload ({'query', 'variables'}) and return the decoded body.
+
+        GraphQL-level errors are returned in body['errors'], not raised.
+
+        Raises:
+            AppSyncError: Transport failure, non-2xx response or undecodable body
+        """
+        request = AWSRequest(method='POST', url=self.endpoint, data=json.dumps(payload),
+                             headers={'Content-Type': 'application/json'})
+        SigV4Auth(self._credentials(), 'appsync', self.region_name).add_auth(request)
+
+        started = time.perf_counter()
+        try:
+            response = self._http.request('POST', self.endpoint, body=request.body, headers=dict(request.headers))
+        except urllib3.exceptions.HTTPError as e:
+            raise AppSyncError(f"AppSync request failed: {e}") from e
+        finally:
+            self.latency.record((time.perf_counter() - started) * 1000)
+
+        if not 200 <= response.status < 300:
+            raise AppSyncError(f"AppSync request failed: {response.status}", response.status, response.data)
+        try:
+            return json.loads(response.data or b'{}')
+        except ValueError as e:
+            raise AppSyncError(f"AppSync returned a non-JSON body: {e}", response.status, response.data) from e
+
+    def execute(self, query, variables=None):
+        """Run one GraphQL operation. See send()."""
+        return self.send({'query': query, 'variables': variables or {}})
+
+    def send_many(self, payloads, max_workers=4):
+        """
+        Send payloads concurrently over the shared pool.
+
+        Returns:
+            list: Body or AppSyncError per payload, in input order
+        """
+        if len(payloads) <= 1:
+            return [self._send_or_error(payload) for payload in payloads]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(payloads))) as executor:
+            return list(executor.map(self._send_or_error, payloads))
+
+    async def send_async(self, payload):
+        """Awaitable send(); the request runs on the client's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.send, payload)
+
+    async def send_many_async(self, payloads):
+        """Awaitable send_many(); returns a body or exception per payload, in input order."""
+        return await asyncio.gather(*(self.send_async(payload) for payload in payloads), return_exceptions=True)
+
+    def latency_stats(self):
+        """Latency histogram snapshot for this endpoint."""
+        return self.latency.snapshot()
+
+    def close(self):
+        """Close pooled connections and the async executor."""
+        self._http.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _send_or_error(self, payload):
+        try:
+            return self.send(payload)
+        except AppSyncError as e:
+            return e
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.pool_size,
+                                                                       thread_name_prefix='appsync')
+            return self._executor
+
+
+def get_appsync_client(endpoint=None):
+    """
+    Get the shared client for an AppSync endpoint, creating it on first use.
+
+    Args:
+        endpoint (str, optional): GraphQL URL, defaults to APPSYNC_URL
+
+    Returns:
+        AppSyncClient
+    """
+    endpoint = endpoint or os.getenv('APPSYNC_URL')
+    if not endpoint:
+        raise ValueError("APPSYNC_URL environment variable not set")
+
+    client = _clients.get(endpoint)
+    if client is None:
+        with _lock:
+            client = _clients.get(endpoint)
+            if client is None:
+                client = AppSyncClient(endpoint)
+                _clients[endpoint] = client
+                logger.info(f"Created shared AppSync client: {endpoint}")
+    return client
+
+
+def reset_appsync_clients():
+    """Close and drop every cached AppSync client (used by tests)."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,132 @@
+"""
+Process-wide registry of boto3 clients and resources.
+
+Clients are created on first use and shared by every helper in the
+container, so a cold start only pays for the services a request touches.
+All of them use one tuned botocore Config: TCP keep-alive, a connection
+pool sized for the helpers' thread pools and adaptive retries.
+"""
+
+import logging
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Largest thread pools in use: ec2Discovery (10 workers) plus authHelper user resolution (4)
+MAX_POOL_CONNECTIONS = int(os.getenv('BOTO_MAX_POOL_CONNECTIONS', '16'))
+MAX_RETRY_ATTEMPTS = int(os.getenv('BOTO_MAX_RETRY_ATTEMPTS', '5'))
+CONNECT_TIMEOUT_SECONDS = 5
+
+DEFAULT_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    connect_timeout=CONNECT_TIMEOUT_SECONDS,
+    retries={'max_attempts': MAX_RETRY_ATTEMPTS, 'mode': 'adaptive'}
+)
+
+_session = None
+_clients = {}
+_lock = threading.RLock()
+
+
+def get_session():
+    """Get the shared boto3 session."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = boto3.session.Session()
+    return _session
+
+
+def get_client(service_name, region_name=None, **config_overrides):
+    """
+    Get the shared client for a service, creating it on first use.
+
+    Args:
+        service_name (str): boto3 service name, e.g. 'ec2'
+        region_name (str, optional): Defaults to the session region
+        **config_overrides: botocore Config options merged over DEFAULT_CONFIG,
+            e.g. read_timeout=10. Each distinct set gets its own client.
+
+    Returns:
+        botocore.client.BaseClient
+    """
+    return _get_or_create('client', service_name, region_name, config_overrides)
+
+
+def get_resource(service_name, region_name=None, **config_overrides):
+    """
+    Get the shared boto3 resource for a service, creating it on first use.
+
+    Args:
+        service_name (str): boto3 service name, e.g. 'dynamodb'
+        region_name (str, optional): Defaults to the session region
+        **config_overrides: botocore Config options merged over DEFAULT_CONFIG
+
+    Returns:
+        boto3.resources.base.ServiceResource
+    """
+    return _get_or_create('resource', service_name, region_name, config_overrides)
+
+
+def reset_clients():
+    """Drop every cached client and resource (used by tests)."""
+    global _session
+    with _lock:
+        _clients.clear()
+        _session = None
+
+
+def _get_or_create(kind, service_name, region_name, config_overrides):
+    key = (kind, service_name, region_name, repr(sorted(config_overrides.items())))
+    instance = _clients.get(key)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        instance = _clients.get(key)
+        if instance is None:
+            config = DEFAULT_CONFIG.merge(Config(**config_overrides)) if config_overrides else DEFAULT_CONFIG
+            region = region_name or get_session().region_name
+            factory = boto3.client if kind == 'client' else boto3.resource
+            instance = factory(service_name, region_name=region, config=config)
+            _clients[key] = instance
+            logger.info(f"Created shared boto3 {kind}: {service_name}")
+    return instance
+
+
+class LazyClient:
+    """
+    Class attribute that resolves to the shared client on first access.
+    Instances can still assign their own client (e.g. a Mock in tests).
+
+    Example:
+        class Ec2Utils:
+            ec2_client = LazyClient('ec2')
+    """
+
+    def __init__(self, service_name, **config_overrides):
+        self.service_name = service_name
+        self.config_overrides = config_overrides
+        self.attribute_name = None
+
+    def __set_name__(self, owner, name):
+        self.attribute_name = f'_{name}'
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        client = obj.__dict__.get(self.attribute_name)
+        if client is None:
+            client = get_client(self.service_name, **self.config_overrides)
+            obj.__dict__[self.attribute_name] = client
+        return client
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.attribute_name] = value
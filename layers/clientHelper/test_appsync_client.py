@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared AppSync client in appsyncClient.py
+Tests signing, error handling, concurrent sends, per-endpoint reuse and the latency histogram.
+"""
+import sys
+import os
+import json
+import asyncio
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+sys.path.insert(0, '.')
+import appsyncClient
+from appsyncClient import AppSyncClient, AppSyncError, LatencyHistogram
+
+ENDPOINT = 'https://example.appsync-api.us-east-1.amazonaws.com/graphql'
+
+
+def _credentials(access_key='AKIDEXAMPLE', token='token-1'):
+    frozen = Mock(access_key=access_key, secret_key='secret', token=token)
+    credentials = Mock()
+    credentials.get_frozen_credentials.return_value = frozen
+    return credentials
+
+
+def _response(status=200, body=None):
+    return Mock(status=status, data=json.dumps(body or {'data': {}}).encode())
+
+
+class TestAppSyncClient(unittest.TestCase):
+    """Test suite for AppSyncClient"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.session = Mock(region_name='us-east-1')
+        self.session.get_credentials.return_value = _credentials()
+        self.client = AppSyncClient(ENDPOINT, session=self.session)
+        self.client._http = Mock()
+        self.client._http.request.return_value = _response(body={'data': {'ok': True}})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.client.close()
+
+    def test_send_signs_and_decodes(self):
+        """Test that requests carry a SigV4 header and the body is decoded"""
+        body = self.client.execute('mutation M { m }', {'a': 1})
+
+        self.assertEqual(body, {'data': {'ok': True}})
+        method, url = self.client._http.request.call_args.args
+        kwargs = self.client._http.request.call_args.kwargs
+        self.assertEqual((method, url), ('POST', ENDPOINT))
+        self.assertIn('AWS4-HMAC-SHA256', kwargs['headers']['Authorization'])
+        self.assertEqual(kwargs['headers']['X-Amz-Security-Token'], 'token-1')
+        self.assertEqual(json.loads(kwargs['body'])['variables'], {'a': 1})
+        self.assertEqual(self.client.latency_stats()['count'], 1)
+
+    def test_non_2xx_raises(self):
+        """Test that HTTP failures surface as AppSyncError with the status"""
+        self.client._http.request.return_value = _response(status=401, body={'errors': ['denied']})
+
+        with self.assertRaises(AppSyncError) as ctx:
+            self.client.send({'query': 'q'})
+
+        self.assertEqual(ctx.exception.status_code, 401)
+
+    def test_non_json_body_raises(self):
+        """Test that an HTML error page surfaces as AppSyncError, not ValueError"""
+        self.client._http.request.return_value = Mock(status=200, data=b'<html>502 Bad Gateway</html>')
+
+        results = self.client.send_many([{'query': 'a'}])
+
+        self.assertIsInstance(results[0], AppSyncError)
+
+    def test_send_many_keeps_order_and_errors(self):
+        """Test that failed payloads come back as errors in their slot"""
+        def request(method, url, body, headers):
+            query = json.loads(body)['query']
+            return _response(status=500) if query == 'bad' else _response(body={'data': query})
+
+        self.client._http.request.side_effect = request
+
+        results = self.client.send_many([{'query': 'a'}, {'query': 'bad'}, {'query': 'c'}], max_workers=3)
+
+        self.assertEqual(results[0], {'data': 'a'})
+        self.assertIsInstance(results[1], AppSyncError)
+        self.assertEqual(results[2], {'data': 'c'})
+
+    def test_send_many_async(self):
+        """Test the awaitable API over the client's executor"""
+        results = asyncio.run(self.client.send_many_async([{'query': 'a'}, {'query': 'b'}]))
+
+        self.assertEqual(results, [{'data': {'ok': True}}, {'data': {'ok': True}}])
+
+    def test_credential_rotation_is_logged(self):
+        """Test that new credentials are picked up and logged once"""
+        self.client.send({'query': 'q'})
+        self.session.get_credentials.return_value = _credentials(token='token-2')
+
+        with self.assertLogs(level='INFO') as logs:
+            self.client.send({'query': 'q'})
+
+        self.assertTrue(any('rotated' in line for line in logs.output))
+        headers = self.client._http.request.call_args.kwargs['headers']
+        self.assertEqual(headers['X-Amz-Security-Token'], 'token-2')
+
+
+class TestSharedClients(unittest.TestCase):
+    """Test suite for get_appsync_client"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('clientHelper.get_session', return_value=Mock(region_name='us-east-1'))
+        self.patcher.start()
+        appsyncClient.reset_appsync_clients()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        appsyncClient.reset_appsync_clients()
+        self.patcher.stop()
+
+    def test_client_shared_per_endpoint(self):
+        """Test that each endpoint gets one client for the container"""
+        first = appsyncClient.get_appsync_client(ENDPOINT)
+        second = appsyncClient.get_appsync_client(ENDPOINT)
+        other = appsyncClient.get_appsync_client('https://other/graphql')
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+    def test_missing_endpoint_raises(self):
+        """Test that an unconfigured endpoint fails loudly"""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('APPSYNC_URL', None)
+            with self.assertRaises(ValueError):
+                appsyncClient.get_appsync_client()
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test suite for LatencyHistogram"""
+
+    def test_buckets_and_overflow(self):
+        """Test bucket placement, mean and max"""
+        histogram = LatencyHistogram(bounds=(10, 100))
+        for elapsed in (5, 10, 50, 400):
+            histogram.record(elapsed)
+
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot['buckets'], {'<=10': 2, '<=100': 1, '>100': 1})
+        self.assertEqual(snapshot['count'], 4)
+        self.assertEqual(snapshot['meanMs'], 116.2)
+        self.assertEqual(snapshot['maxMs'], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
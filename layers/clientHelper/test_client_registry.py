@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared boto3 client registry in clientHelper.py
+Tests lazy creation, process-wide reuse, config overrides and LazyClient.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+sys.path.insert(0, '.')
+import clientHelper
+from clientHelper import LazyClient
+
+
+class TestClientRegistry(unittest.TestCase):
+    """Test suite for get_client / get_resource"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client', side_effect=lambda *args, **kwargs: Mock())
+        self.mock_boto_client = self.patcher.start()
+        clientHelper.reset_clients()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+        clientHelper.reset_clients()
+
+    def test_client_created_once_and_shared(self):
+        """Test that repeated lookups return the same client"""
+        first = clientHelper.get_client('cloudwatch')
+        second = clientHelper.get_client('cloudwatch')
+
+        self.assertIs(first, second)
+        self.mock_boto_client.assert_called_once()
+
+    def test_default_config_is_tuned(self):
+        """Test keep-alive, pool size and adaptive retries"""
+        clientHelper.get_client('ec2')
+
+        config = self.mock_boto_client.call_args.kwargs['config']
+        self.assertTrue(config.tcp_keepalive)
+        self.assertEqual(config.max_pool_connections, clientHelper.MAX_POOL_CONNECTIONS)
+        self.assertEqual(config.retries['mode'], 'adaptive')
+
+    def test_config_overrides_get_their_own_client(self):
+        """Test that overrides merge over the defaults without replacing the shared client"""
+        default = clientHelper.get_client('events')
+        short_timeout = clientHelper.get_client('events', read_timeout=10)
+
+        self.assertIsNot(default, short_timeout)
+        config = self.mock_boto_client.call_args.kwargs['config']
+        self.assertEqual(config.read_timeout, 10)
+        self.assertTrue(config.tcp_keepalive)
+
+    def test_lazy_client_defers_creation(self):
+        """Test that LazyClient creates nothing until first access"""
+        class Helper:
+            ec2_client = LazyClient('ec2')
+
+        helper = Helper()
+        self.mock_boto_client.assert_not_called()
+
+        self.assertIs(helper.ec2_client, clientHelper.get_client('ec2'))
+        self.mock_boto_client.assert_called_once()
+
+    def test_lazy_client_can_be_replaced(self):
+        """Test that instances can assign their own client"""
+        class Helper:
+            ec2_client = LazyClient('ec2')
+
+        helper = Helper()
+        replacement = Mock()
+        helper.ec2_client = replacement
+
+        self.assertIs(helper.ec2_client, replacement)
+        self.mock_boto_client.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,41 +1,211 @@
-import boto3
+import base64
+import copy
+import json
 import logging
 import os
+import random
+import threading
+import time
 from datetime import datetime, timezone
 from botocore.exceptions import ClientError
 from boto3.dynamodb.conditions import Key
 from decimal import Decimal, InvalidOperation
+import clientHelper
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-session = boto3.session.Session()
+session = clientHelper.get_session()
 aws_region = session.region_name
 
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_RETRIES = 5
+BATCH_GET_BASE_DELAY = 0.05
+
+# Role hierarchy and the minimum level each permission needs
+PERMISSION_LEVELS = {'viewer': 1, 'moderator': 2, 'support': 3, 'admin': 4}
+REQUIRED_PERMISSION_LEVELS = {
+    'read_server': 1, 'read_metrics': 1, 'read_config': 1,
+    'manage_server': 3, 'manage_users': 4
+}
+
+# Membership queries only need the keys, role and permissions
+MEMBERSHIP_PROJECTION = 'PK, SK, #role, #permissions'
+MEMBERSHIP_ATTRIBUTE_NAMES = {'#role': 'role', '#permissions': 'permissions'}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+# Attributes put_server_config may write; anything else in the config dict is ignored
+SERVER_CONFIG_FIELDS = (
+    'stopScheduleExpression', 'startScheduleExpression', 'alarmThreshold', 'alarmEvaluationPeriod',
+    'runCommand', 'workDir', 'timezone', 'isBootstrapComplete', 'hasCognitoGroup',
+    'minecraftVersion', 'latestPatchUpdate', 'autoConfigured',
+    'runningMinutesCache', 'runningMinutesCacheTimestamp'
+)
+
+# Runtime ledger: one SERVER#<id>/RUNTIME#<startedAt> item per running interval,
+# plus a SERVER#<id>/RUNTIME_LEDGER marker recording how far back it is complete
+RUNTIME_INTERVAL_PREFIX = 'RUNTIME#'
+RUNTIME_LEDGER_SK = 'RUNTIME_LEDGER'
+RUNTIME_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Last metric datapoints published to AppSync, per server: SERVER#<id>/METRIC_WATERMARK
+METRIC_WATERMARK_SK = 'METRIC_WATERMARK'
+
+class VersionConflictError(ValueError):
+    """Raised when a conditional write finds a different item version."""
+
+class AuthorizationDecision:
+    """
+    Result of an authorization check for one user on one server.
+
+    Unpacks as (is_authorized, user_role, auth_reason) so it can replace the
+    tuple returned by check_user_authorization. Keeps the admin marker and
+    membership so callers can evaluate other permissions without re-reading.
+    """
+
+    def __init__(self, user_id, server_id, required_permission, is_global_admin=False, membership=None, error=None):
+        self.user_id = user_id
+        self.server_id = server_id
+        self.required_permission = required_permission
+        self.is_global_admin = is_global_admin
+        self.membership = membership
+        self.error = error
+
+        self.membership_role = membership.get('role') if membership else None
+        self.role = 'admin' if is_global_admin else self.membership_role
+        self.authorized = self.allows(required_permission)
+        self.reason = self._reason()
+
+    def allows(self, permission):
+        """Check whether this user may perform another permission on the same server."""
+        if self.error:
+            return False
+        if self.is_global_admin:
+            return True
+        if not self.membership:
+            return False
+        user_level = PERMISSION_LEVELS.get(self.membership_role, 0)
+        return user_level >= REQUIRED_PERMISSION_LEVELS.get(permission, 1)
+
+    def _reason(self):
+        if self.error:
+            return f"Error checking permissions: {self.error}"
+        if self.is_global_admin:
+            return "User has global admin privileges"
+        if not self.membership:
+            return f"User does not have access to server {self.server_id}"
+        if self.authorized:
+            return f"User has {self.role} role with sufficient permissions"
+        return f"Insufficient permissions. Required: {self.required_permission}, Role: {self.role}"
+
+    def __iter__(self):
+        return iter((self.authorized, self.role, self.reason))
+
+    def __bool__(self):
+        return self.authorized
+
+    def __repr__(self):
+        return (f"AuthorizationDecision(user_id={self.user_id!r}, server_id={self.server_id!r}, "
+                f"authorized={self.authorized}, role={self.role!r})")
+
 class CoreTableDyn:
     """
     DynamoDB helper class for CoreTable operations using PK/SK pattern.
     Handles Users, Servers, Roles, and UserServer relationships in a single table.
+
+    Item reads go through a request-scoped identity map so each item is read
+    at most once per invocation. Writes invalidate the affected key. Handlers
+    that keep an instance across invocations call reset_request_cache() at
+    the start of each request.
     """
 
     def __init__(self, table_name=None):
-        dynamodb = boto3.resource('dynamodb', region_name=aws_region)
+        dynamodb = clientHelper.get_resource('dynamodb', region_name=aws_region)
         core_table = table_name or os.getenv('CORE_TABLE_NAME')
         if not core_table:
             raise ValueError("CORE_TABLE_NAME environment variable not set")
         
+        self.dynamodb = dynamodb
         self.table = dynamodb.Table(core_table)
         self.VALID_ROLES = {'admin', 'moderator', 'viewer', 'support'}
 
+        self._item_cache = {}
+        self._cache_lock = threading.Lock()
+        self._reads = 0
+        self._reads_saved = 0
+
+    # Request cache
+    def reset_request_cache(self):
+        """Drop cached items and counters; call at the start of each invocation."""
+        with self._cache_lock:
+            if self._reads or self._reads_saved:
+                logger.info(f"CoreTable request cache: {self._reads} reads, {self._reads_saved} saved")
+            self._item_cache.clear()
+            self._reads = 0
+            self._reads_saved = 0
+
+    def request_cache_stats(self):
+        """Get read counters for the current request."""
+        with self._cache_lock:
+            return {'reads': self._reads, 'readsSaved': self._reads_saved, 'size': len(self._item_cache)}
+
+    def _get_item(self, pk, sk):
+        """Read one item through the request cache. Returns the item or None."""
+        cache_key = (pk, sk)
+        with self._cache_lock:
+            if cache_key in self._item_cache:
+                self._reads_saved += 1
+                return copy.deepcopy(self._item_cache[cache_key])
+
+        item = self.table.get_item(Key={'PK': pk, 'SK': sk}).get('Item')
+
+        with self._cache_lock:
+            self._reads += 1
+            self._item_cache[cache_key] = item
+        return copy.deepcopy(item)
+
+    def _cache_item(self, item):
+        """Store an item returned by a write (ALL_NEW) in the request cache."""
+        with self._cache_lock:
+            self._item_cache[(item['PK'], item['SK'])] = copy.deepcopy(item)
+
+    def _invalidate(self, pk, sk):
+        """Forget a cached item after writing it."""
+        with self._cache_lock:
+            self._item_cache.pop((pk, sk), None)
+
     # Server Operations
     def get_server_info(self, instance_id):
         """Get server information from CoreTable."""
-        response = self.table.get_item(Key={'PK': f'SERVER#{instance_id}', 'SK': 'METADATA'})
+        item = self._get_item(f'SERVER#{instance_id}', 'METADATA')
         
-        if 'Item' not in response:
+        if not item:
             return None
         
-        item = response['Item']
+        return self._server_info_from_item(instance_id, item)
+
+    def get_servers_bulk(self, instance_ids):
+        """
+        Get server information for many servers with chunked BatchGetItem
+        (100 keys per call). Items also land in the request cache, so later
+        get_server_info / get_server_config calls for these servers are free.
+
+        Args:
+            instance_ids (list): EC2 instance IDs
+
+        Returns:
+            dict: {instance_id: server info} for servers that have metadata
+        """
+        keys = [{'PK': f'SERVER#{instance_id}', 'SK': 'METADATA'} for instance_id in instance_ids]
+        servers = {}
+        for item in self._batch_get_items(keys):
+            instance_id = item['PK'].replace('SERVER#', '')
+            servers[instance_id] = self._server_info_from_item(instance_id, item)
+        return servers
+
+    def _server_info_from_item(self, instance_id, item):
         return {
             'id': instance_id,
             'name': item.get('name'),
@@ -45,6 +215,8 @@ class CoreTableDyn:
             'vCpus': self._safe_int(item.get('vCpus')),
             'memSize': self._safe_int(item.get('memSize')),
             'diskSize': self._safe_int(item.get('diskSize')),
+            'diskVolumeId': item.get('diskVolumeId'),
+            'diskSizeUpdatedAt': item.get('diskSizeUpdatedAt'),
             'launchTime': item.get('launchTime'),
             'publicIp': item.get('publicIp'),
             'initStatus': item.get('initStatus'),
@@ -80,16 +252,99 @@ class CoreTableDyn:
                 item[k] = v
         
         self.table.put_item(Item=item)
+        self._invalidate(item['PK'], item['SK'])
         return {'ResponseMetadata': {'HTTPStatusCode': 200}}
 
     def get_server_config(self, instance_id):
         """Get server configuration from CoreTable."""
-        response = self.table.get_item(Key={'PK': f'SERVER#{instance_id}', 'SK': 'METADATA'})
+        item = self._get_item(f'SERVER#{instance_id}', 'METADATA')
         
-        if 'Item' not in response:
+        if not item:
             return None
         
-        item = response['Item']
+        return self._server_config_from_item(instance_id, item)
+
+    def put_server_config(self, config):
+        """
+        Save server configuration to CoreTable with a single UpdateItem.
+
+        Only the config fields present in `config` are written, so concurrent
+        writers updating different fields don't overwrite each other. Every
+        write bumps a `version` attribute; pass the `version` you last read to
+        make the write conditional on nobody else having written since.
+
+        Args:
+            config (dict): Must include 'id'; optional 'version' for optimistic concurrency
+
+        Returns:
+            dict: The full server configuration after the update
+
+        Raises:
+            VersionConflictError: If 'version' was given and no longer matches
+        """
+        instance_id = config.get('id')
+        if not instance_id:
+            raise ValueError("Instance ID is required")
+        
+        now = datetime.now(timezone.utc).isoformat()
+        set_clauses = [
+            '#Type = if_not_exists(#Type, :type)',
+            'createdAt = if_not_exists(createdAt, :createdAt)',
+            'updatedAt = :updatedAt',
+            '#version = if_not_exists(#version, :zero) + :one'
+        ]
+        names = {'#Type': 'Type', '#version': 'version'}
+        values = {
+            ':type': 'Server',
+            ':createdAt': config.get('createdAt') or now,
+            ':updatedAt': now,
+            ':zero': 0,
+            ':one': 1
+        }
+
+        for field in SERVER_CONFIG_FIELDS:
+            value = config.get(field)
+            if value is None:
+                continue
+            if field == 'alarmThreshold':
+                value = self._to_decimal(round(float(value), 1))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = self._to_decimal(value)
+            set_clauses.append(f'#{field} = :{field}')
+            names[f'#{field}'] = field
+            values[f':{field}'] = value
+
+        request = {
+            'Key': {'PK': f'SERVER#{instance_id}', 'SK': 'METADATA'},
+            'UpdateExpression': 'SET ' + ', '.join(set_clauses),
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': values,
+            'ReturnValues': 'ALL_NEW'
+        }
+
+        expected_version = config.get('version')
+        if expected_version is not None:
+            values[':expectedVersion'] = int(expected_version)
+            if int(expected_version) == 0:
+                request['ConditionExpression'] = 'attribute_not_exists(#version) OR #version = :expectedVersion'
+            else:
+                request['ConditionExpression'] = '#version = :expectedVersion'
+
+        try:
+            response = self.table.update_item(**request)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                self._invalidate(f'SERVER#{instance_id}', 'METADATA')
+                raise VersionConflictError(
+                    f"Server config for {instance_id} was modified concurrently (expected version {expected_version})"
+                )
+            raise
+
+        item = response['Attributes']
+        self._cache_item(item)
+        return self._server_config_from_item(instance_id, item)
+
+    def _server_config_from_item(self, instance_id, item):
         return {
             'id': instance_id,
             'stopScheduleExpression': item.get('stopScheduleExpression', ''),
@@ -107,53 +362,17 @@ class CoreTableDyn:
             'runningMinutesCacheTimestamp': item.get('runningMinutesCacheTimestamp', ''),
             'createdAt': item.get('createdAt', ''),
             'updatedAt': item.get('updatedAt', ''),
-            'autoConfigured': item.get('autoConfigured', False)
+            'autoConfigured': item.get('autoConfigured', False),
+            'version': self._safe_int(item.get('version'), 0)
         }
 
-    def put_server_config(self, config):
-        """Save server configuration to CoreTable."""
-        instance_id = config.get('id')
-        if not instance_id:
-            raise ValueError("Instance ID is required")
-        
-        now = datetime.now(timezone.utc).isoformat()
-        existing = self.table.get_item(Key={'PK': f'SERVER#{instance_id}', 'SK': 'METADATA'}).get('Item', {})
-        
-        existing.update({
-            'PK': f'SERVER#{instance_id}',
-            'SK': 'METADATA',
-            'Type': 'Server',
-            'stopScheduleExpression': config.get('stopScheduleExpression', ''),
-            'startScheduleExpression': config.get('startScheduleExpression', ''),
-            'alarmThreshold': self._to_decimal(round(config.get('alarmThreshold', 0.0), 1)),
-            'alarmEvaluationPeriod': config.get('alarmEvaluationPeriod', 0),
-            'runCommand': config.get('runCommand', ''),
-            'workDir': config.get('workDir', ''),
-            'timezone': config.get('timezone', 'UTC'),
-            'isBootstrapComplete': config.get('isBootstrapComplete', False),
-            'minecraftVersion': config.get('minecraftVersion', ''),
-            'latestPatchUpdate': config.get('latestPatchUpdate', ''),
-            'updatedAt': now,
-            'createdAt': existing.get('createdAt', config.get('createdAt', now))
-        })
-        
-        if 'autoConfigured' in config:
-            existing['autoConfigured'] = config['autoConfigured']
-        
-        if config.get('runningMinutesCache') is not None:
-            existing['runningMinutesCache'] = self._to_decimal(config['runningMinutesCache'])
-        if config.get('runningMinutesCacheTimestamp'):
-            existing['runningMinutesCacheTimestamp'] = config['runningMinutesCacheTimestamp']
-        
-        self.table.put_item(Item=existing)
-        return self.get_server_config(instance_id)
-
     def update_server_config(self, config):
         """Update server configuration."""
         return self.put_server_config(config)
 
     def update_server_name(self, instance_id, new_name):
         """Update server name."""
+        self._invalidate(f'SERVER#{instance_id}', 'METADATA')
         return self.table.update_item(
             Key={'PK': f'SERVER#{instance_id}', 'SK': 'METADATA'},
             UpdateExpression="SET #name = :name",
@@ -162,13 +381,289 @@ class CoreTableDyn:
             ReturnValues="ALL_NEW"
         )
 
+    def update_server_disk_size(self, instance_id, volume_id, disk_size):
+        """
+        Cache the root volume size on an existing server metadata item.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            volume_id (str): Root EBS volume the size belongs to
+            disk_size (int): Volume size in GiB
+
+        Returns:
+            bool: False if the server has no metadata item yet
+        """
+        self._invalidate(f'SERVER#{instance_id}', 'METADATA')
+        try:
+            self.table.update_item(
+                Key={'PK': f'SERVER#{instance_id}', 'SK': 'METADATA'},
+                UpdateExpression="SET diskSize = :size, diskVolumeId = :volume, diskSizeUpdatedAt = :now",
+                ConditionExpression="attribute_exists(PK)",
+                ExpressionAttributeValues={
+                    ':size': disk_size,
+                    ':volume': volume_id,
+                    ':now': datetime.now(timezone.utc).isoformat()
+                }
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    # Runtime Ledger Operations
+    @staticmethod
+    def runtime_timestamp(value):
+        """
+        Normalize a datetime or ISO string to the ledger's sortable UTC form.
+
+        Args:
+            value (datetime|str): Aware datetime, or ISO-8601 string ('Z' or offset)
+
+        Returns:
+            str: Timestamp formatted as YYYY-MM-DDTHH:MM:SSZ
+        """
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).strftime(RUNTIME_TIMESTAMP_FORMAT)
+
+    def get_latest_runtime_interval(self, instance_id):
+        """
+        Get the most recent runtime interval of a server.
+
+        Args:
+            instance_id (str): EC2 instance ID
+
+        Returns:
+            dict: {'startedAt', 'stoppedAt'} (stoppedAt None while open), or None
+        """
+        response = self.table.query(
+            KeyConditionExpression=Key('PK').eq(f'SERVER#{instance_id}') & Key('SK').begins_with(RUNTIME_INTERVAL_PREFIX),
+            ScanIndexForward=False,
+            Limit=1
+        )
+        items = response.get('Items', [])
+        return self._runtime_interval_from_item(items[0]) if items else None
+
+    def open_runtime_interval(self, instance_id, started_at, source='event'):
+        """
+        Append a running interval to the server's runtime ledger.
+
+        A repeated 'running' notification while the latest interval is still
+        open is ignored, so at most one interval is open at a time.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            started_at (datetime|str): When the instance entered 'running'
+            source (str): Where the transition came from ('event' or 'cloudtrail')
+
+        Returns:
+            bool: True if a new interval was written
+        """
+        started_at = self.runtime_timestamp(started_at)
+        latest = self.get_latest_runtime_interval(instance_id)
+        if latest and (latest['stoppedAt'] is None or latest['stoppedAt'] > started_at):
+            logger.info(f"Runtime interval for {instance_id} already covers {started_at}")
+            return False
+
+        try:
+            self.table.put_item(
+                Item=self._runtime_interval_item(instance_id, started_at, None, source),
+                ConditionExpression="attribute_not_exists(PK)"
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def close_runtime_interval(self, instance_id, stopped_at):
+        """
+        Close the server's open runtime interval.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            stopped_at (datetime|str): When the instance left 'running'
+
+        Returns:
+            bool: False if there was no open interval that started before stopped_at
+        """
+        stopped_at = self.runtime_timestamp(stopped_at)
+        latest = self.get_latest_runtime_interval(instance_id)
+        if not latest or latest['stoppedAt'] is not None or latest['startedAt'] > stopped_at:
+            logger.info(f"No open runtime interval for {instance_id} before {stopped_at}")
+            return False
+
+        try:
+            self.table.update_item(
+                Key={'PK': f'SERVER#{instance_id}', 'SK': f"{RUNTIME_INTERVAL_PREFIX}{latest['startedAt']}"},
+                UpdateExpression="SET stoppedAt = :stopped",
+                ConditionExpression="attribute_exists(PK) AND attribute_not_exists(stoppedAt)",
+                ExpressionAttributeValues={':stopped': stopped_at}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def list_runtime_intervals(self, instance_id, start, end):
+        """
+        List the runtime intervals that overlap [start, end).
+
+        Intervals never overlap, so the query walks backwards from end and stops
+        at the first interval that finished before start. Cost is proportional to
+        the intervals in the range, not to the server's history.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            start (datetime|str): Range start
+            end (datetime|str): Range end
+
+        Returns:
+            list: {'startedAt', 'stoppedAt'} dicts in chronological order
+        """
+        start, end = self.runtime_timestamp(start), self.runtime_timestamp(end)
+        query = {
+            'KeyConditionExpression': Key('PK').eq(f'SERVER#{instance_id}') &
+                Key('SK').between(RUNTIME_INTERVAL_PREFIX, f'{RUNTIME_INTERVAL_PREFIX}{end}'),
+            'ScanIndexForward': False
+        }
+
+        intervals = []
+        for items, _ in self._query_pages(query):
+            for item in items:
+                interval = self._runtime_interval_from_item(item)
+                if interval['stoppedAt'] is not None and interval['stoppedAt'] <= start:
+                    intervals.reverse()
+                    return intervals
+                if interval['startedAt'] < end:
+                    intervals.append(interval)
+        intervals.reverse()
+        return intervals
+
+    def put_runtime_intervals(self, instance_id, intervals, source='cloudtrail'):
+        """
+        Write backfilled runtime intervals.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            intervals (list): {'startedAt', 'stoppedAt'} dicts; stoppedAt may be None for the last one
+            source (str): Where the intervals came from
+        """
+        with self.table.batch_writer(overwrite_by_pkeys=['PK', 'SK']) as batch:
+            for interval in intervals:
+                batch.put_item(Item=self._runtime_interval_item(
+                    instance_id,
+                    self.runtime_timestamp(interval['startedAt']),
+                    self.runtime_timestamp(interval['stoppedAt']) if interval.get('stoppedAt') else None,
+                    source
+                ))
+
+    def get_runtime_ledger_since(self, instance_id):
+        """
+        Get the time from which the server's runtime ledger is complete.
+
+        Returns:
+            str: Ledger timestamp, or None if the ledger was never backfilled
+        """
+        item = self._get_item(f'SERVER#{instance_id}', RUNTIME_LEDGER_SK)
+        return item.get('runtimeLedgerSince') if item else None
+
+    def set_runtime_ledger_since(self, instance_id, since):
+        """
+        Record that the runtime ledger is complete from since onwards.
+
+        Only moves the marker earlier; a later value is ignored.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            since (datetime|str): Start of the backfilled range
+
+        Returns:
+            bool: True if the marker was updated
+        """
+        since = self.runtime_timestamp(since)
+        self._invalidate(f'SERVER#{instance_id}', RUNTIME_LEDGER_SK)
+        try:
+            self.table.update_item(
+                Key={'PK': f'SERVER#{instance_id}', 'SK': RUNTIME_LEDGER_SK},
+                UpdateExpression="SET runtimeLedgerSince = :since, #type = :type",
+                ConditionExpression="attribute_not_exists(runtimeLedgerSince) OR runtimeLedgerSince > :since",
+                ExpressionAttributeNames={'#type': 'Type'},
+                ExpressionAttributeValues={':since': since, ':type': 'RuntimeLedger'}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    @staticmethod
+    def _runtime_interval_item(instance_id, started_at, stopped_at, source):
+        item = {
+            'PK': f'SERVER#{instance_id}',
+            'SK': f'{RUNTIME_INTERVAL_PREFIX}{started_at}',
+            'Type': 'RuntimeInterval',
+            'startedAt': started_at,
+            'source': source
+        }
+        if stopped_at:
+            item['stoppedAt'] = stopped_at
+        return item
+
+    @staticmethod
+    def _runtime_interval_from_item(item):
+        return {'startedAt': item['startedAt'], 'stoppedAt': item.get('stoppedAt')}
+
+    # Metric Watermark Operations
+    def get_metric_watermarks(self, instance_ids):
+        """
+        Get the last published metric timestamps for many servers (BatchGetItem).
+
+        Args:
+            instance_ids (list): EC2 instance IDs
+
+        Returns:
+            dict: {instance_id: {'series': {field: epoch ms}, 'fullSyncAt': epoch ms}}
+                for servers that have a watermark
+        """
+        keys = [{'PK': f'SERVER#{instance_id}', 'SK': METRIC_WATERMARK_SK} for instance_id in instance_ids]
+        watermarks = {}
+        for item in self._batch_get_items(keys):
+            instance_id = item['PK'].replace('SERVER#', '')
+            watermarks[instance_id] = {
+                'series': {field: int(value) for field, value in item.get('series', {}).items()},
+                'fullSyncAt': int(item.get('fullSyncAt', 0))
+            }
+        return watermarks
+
+    def put_metric_watermarks(self, watermarks):
+        """
+        Save last published metric timestamps.
+
+        Args:
+            watermarks (dict): {instance_id: {'series': {field: epoch ms}, 'fullSyncAt': epoch ms}}
+        """
+        with self.table.batch_writer(overwrite_by_pkeys=['PK', 'SK']) as batch:
+            for instance_id, watermark in watermarks.items():
+                batch.put_item(Item={
+                    'PK': f'SERVER#{instance_id}',
+                    'SK': METRIC_WATERMARK_SK,
+                    'Type': 'MetricWatermark',
+                    'series': watermark['series'],
+                    'fullSyncAt': watermark['fullSyncAt']
+                })
+                self._invalidate(f'SERVER#{instance_id}', METRIC_WATERMARK_SK)
+
     # User Operations
     def check_user_server_access(self, user_id, server_id):
         """Check if user has access to specific server."""
-        response = self.table.get_item(Key={'PK': f'USER#{user_id}', 'SK': f'SERVER#{server_id}'})
+        item = self._get_item(f'USER#{user_id}', f'SERVER#{server_id}')
         
-        if 'Item' in response:
-            item = response['Item']
+        if item:
             return {
                 'userId': user_id,
                 'serverId': server_id,
@@ -179,45 +674,102 @@ class CoreTableDyn:
 
     def check_global_admin(self, user_id):
         """Check if user has global admin role."""
-        response = self.table.get_item(Key={'PK': f'USER#{user_id}', 'SK': 'ADMIN'})
-        return 'Item' in response
+        return self._get_item(f'USER#{user_id}', 'ADMIN') is not None
 
     def list_user_servers(self, user_id):
         """List all servers a user has access to."""
-        response = self.table.query(
-            KeyConditionExpression=Key('PK').eq(f'USER#{user_id}') & Key('SK').begins_with('SERVER#')
-        )
-        
-        servers = []
-        for item in response.get('Items', []):
-            server_id = item['SK'].replace('SERVER#', '')
-            servers.append({
-                'serverId': server_id,
-                'role': item.get('role'),
-                'permissions': item.get('permissions', [])
-            })
-        
-        return servers
+        return list(self.iter_user_servers(user_id))
 
     def list_server_members(self, server_id):
         """List all members of a server using GSI."""
-        response = self.table.query(
-            IndexName='SK-PK-index',
-            KeyConditionExpression=Key('SK').eq(f'SERVER#{server_id}')
-        )
-        
-        members = []
-        for item in response.get('Items', []):
-            if item['PK'].startswith('USER#'):
-                user_id = item['PK'].replace('USER#', '')
-                members.append({
-                    'userId': user_id,
-                    'serverId': server_id,
-                    'role': item.get('role'),
-                    'permissions': item.get('permissions', [])
-                })
-        
-        return members
+        return list(self.iter_server_members(server_id))
+
+    def iter_user_servers(self, user_id, page_size=None):
+        """
+        Yield a user's server memberships, following LastEvaluatedKey across pages.
+
+        Args:
+            user_id (str): Cognito user sub
+            page_size (int, optional): Query Limit per round trip
+        """
+        for items, _ in self._query_pages(self._user_servers_query(user_id), page_size):
+            for item in items:
+                yield self._membership_from_item(item, user_id=user_id)
+
+    def iter_server_members(self, server_id, page_size=None):
+        """
+        Yield a server's members from the SK-PK-index GSI, following LastEvaluatedKey across pages.
+
+        Args:
+            server_id (str): EC2 instance ID
+            page_size (int, optional): Query Limit per round trip
+        """
+        for items, _ in self._query_pages(self._server_members_query(server_id), page_size):
+            for item in items:
+                if item['PK'].startswith('USER#'):
+                    yield self._membership_from_item(item, server_id=server_id)
+
+    def list_user_servers_page(self, user_id, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        Get one page of a user's server memberships.
+
+        Args:
+            user_id (str): Cognito user sub
+            limit (int): Page size, capped at MAX_PAGE_SIZE
+            cursor (str, optional): nextCursor from the previous page
+
+        Returns:
+            dict: {'items': list, 'nextCursor': str or None}
+        """
+        start_key = self._decode_cursor(cursor, 'PK', f'USER#{user_id}')
+        items, last_key = next(self._query_pages(self._user_servers_query(user_id), self._page_size(limit), start_key))
+        return {
+            'items': [self._membership_from_item(item, user_id=user_id) for item in items],
+            'nextCursor': self._encode_cursor(last_key)
+        }
+
+    def list_server_members_page(self, server_id, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        Get one page of a server's members.
+
+        Args:
+            server_id (str): EC2 instance ID
+            limit (int): Page size, capped at MAX_PAGE_SIZE
+            cursor (str, optional): nextCursor from the previous page
+
+        Returns:
+            dict: {'items': list, 'nextCursor': str or None}
+        """
+        start_key = self._decode_cursor(cursor, 'SK', f'SERVER#{server_id}')
+        items, last_key = next(self._query_pages(self._server_members_query(server_id), self._page_size(limit), start_key))
+        return {
+            'items': [self._membership_from_item(item, server_id=server_id) for item in items if item['PK'].startswith('USER#')],
+            'nextCursor': self._encode_cursor(last_key)
+        }
+
+    def _user_servers_query(self, user_id):
+        return {
+            'KeyConditionExpression': Key('PK').eq(f'USER#{user_id}') & Key('SK').begins_with('SERVER#'),
+            'ProjectionExpression': MEMBERSHIP_PROJECTION,
+            'ExpressionAttributeNames': MEMBERSHIP_ATTRIBUTE_NAMES
+        }
+
+    def _server_members_query(self, server_id):
+        return {
+            'IndexName': 'SK-PK-index',
+            'KeyConditionExpression': Key('SK').eq(f'SERVER#{server_id}'),
+            'ProjectionExpression': MEMBERSHIP_PROJECTION,
+            'ExpressionAttributeNames': MEMBERSHIP_ATTRIBUTE_NAMES
+        }
+
+    @staticmethod
+    def _membership_from_item(item, user_id=None, server_id=None):
+        return {
+            'userId': user_id or item['PK'].replace('USER#', ''),
+            'serverId': server_id or item['SK'].replace('SERVER#', ''),
+            'role': item.get('role'),
+            'permissions': item.get('permissions', [])
+        }
 
     def create_user_server_membership(self, user_id, server_id, role, permissions=None):
         """Create user-server membership."""
@@ -237,6 +789,7 @@ class CoreTableDyn:
                 Item=item,
                 ConditionExpression='attribute_not_exists(PK) AND attribute_not_exists(SK)'
             )
+            self._invalidate(item['PK'], item['SK'])
             return True
         except ClientError as e:
             if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
@@ -253,40 +806,296 @@ class CoreTableDyn:
             required_permission (str): Permission level required
             
         Returns:
-            tuple: (bool, str, str) - (is_authorized, user_role, auth_reason)
+            AuthorizationDecision: unpacks as (is_authorized, user_role, auth_reason)
+        """
+        return self.authorize_user_servers(user_sub, [server_id], required_permission)[server_id]
+
+    def authorize_user_servers(self, user_sub, server_ids, required_permission='read_server'):
+        """
+        Authorize one user against many servers with a single BatchGetItem
+        for the USER#<sub>/ADMIN marker and every USER#<sub>/SERVER#<id> membership.
+
+        Args:
+            user_sub (str): Cognito user sub
+            server_ids (list): EC2 instance IDs
+            required_permission (str): Permission level required
+
+        Returns:
+            dict: {server_id: AuthorizationDecision}
         """
+        server_ids = list(dict.fromkeys(server_ids))
+        keys = [{'PK': f'USER#{user_sub}', 'SK': 'ADMIN'}]
+        keys.extend({'PK': f'USER#{user_sub}', 'SK': f'SERVER#{server_id}'} for server_id in server_ids)
+
         try:
-            # Check if user has global admin role
-            if self.check_global_admin(user_sub):
-                return True, 'admin', "User has global admin privileges"
-            
-            # Check server-specific access
-            server_access = self.check_user_server_access(user_sub, server_id)
-            if server_access:
-                role = server_access['role']
-                
-                # Simple permission check based on role
-                permission_levels = {'viewer': 1, 'moderator': 2, 'support':3, 'admin': 4}
-                required_levels = {
-                    'read_server': 1, 'read_metrics': 1, 'read_config': 1,
-                    'manage_server': 3, 'manage_users': 4
-                }
-                
-                user_level = permission_levels.get(role, 0)
-                required_level = required_levels.get(required_permission, 1)
-                
-                if user_level >= required_level:
-                    return True, role, f"User has {role} role with sufficient permissions"
-                else:
-                    return False, role, f"Insufficient permissions. Required: {required_permission}, Role: {role}"
-            
-            return False, None, f"User does not have access to server {server_id}"
-            
+            items = self._batch_get_items(keys)
         except Exception as e:
             logger.error(f"Error checking user authorization: {str(e)}")
-            return False, None, f"Error checking permissions: {str(e)}"
+            return {
+                server_id: AuthorizationDecision(user_sub, server_id, required_permission, error=str(e))
+                for server_id in server_ids
+            }
+
+        is_global_admin = False
+        memberships = {}
+        for item in items:
+            if item['SK'] == 'ADMIN':
+                is_global_admin = True
+                continue
+            server_id = item['SK'].replace('SERVER#', '')
+            memberships[server_id] = {
+                'userId': user_sub,
+                'serverId': server_id,
+                'role': item.get('role'),
+                'permissions': item.get('permissions', [])
+            }
+
+        return {
+            server_id: AuthorizationDecision(
+                user_sub, server_id, required_permission,
+                is_global_admin=is_global_admin,
+                membership=memberships.get(server_id)
+            )
+            for server_id in server_ids
+        }
+
+    # User Profile Operations
+    def get_user_profiles(self, user_ids):
+        """
+        Get cached user profiles (USER#<sub>/PROFILE) in one batch read.
+
+        Args:
+            user_ids (list): Cognito user subs
+
+        Returns:
+            dict: {user_id: {'sub', 'username', 'email', 'fullName', 'updatedAt'}} for profiles found
+        """
+        keys = [{'PK': f'USER#{user_id}', 'SK': 'PROFILE'} for user_id in user_ids]
+        items = self._batch_get_items(keys)
+
+        profiles = {}
+        for item in items:
+            user_id = item['PK'].replace('USER#', '')
+            profiles[user_id] = {
+                'sub': user_id,
+                'username': item.get('username'),
+                'email': item.get('email'),
+                'fullName': item.get('fullName'),
+                'updatedAt': item.get('updatedAt')
+            }
+        return profiles
+
+    def put_user_profiles(self, profiles):
+        """
+        Save user profiles resolved from Cognito.
+
+        Args:
+            profiles (list): Dicts with 'sub', 'email', 'fullName' and optional 'username'
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        with self.table.batch_writer(overwrite_by_pkeys=['PK', 'SK']) as batch:
+            for profile in profiles:
+                item = {
+                    'PK': f"USER#{profile['sub']}",
+                    'SK': 'PROFILE',
+                    'Type': 'UserProfile',
+                    'email': profile.get('email'),
+                    'fullName': profile.get('fullName'),
+                    'updatedAt': now
+                }
+                if profile.get('username'):
+                    item['username'] = profile['username']
+                batch.put_item(Item={k: v for k, v in item.items() if v is not None})
+                self._invalidate(item['PK'], item['SK'])
+
+    # Email Index Operations
+    @staticmethod
+    def normalize_email(email):
+        """Normalize an email address for EMAIL#<email> keys."""
+        return (email or '').strip().lower()
+
+    def get_user_by_email(self, email):
+        """
+        Look up a user by email in the EMAIL#<email> index.
+
+        Returns:
+            dict: {'username', 'email', 'fullName', 'sub'} or None if not indexed
+        """
+        normalized = self.normalize_email(email)
+        if not normalized:
+            return None
+
+        item = self._get_item(f'EMAIL#{normalized}', 'USER')
+        if not item:
+            return None
+
+        return {
+            'username': item.get('username'),
+            'email': item.get('email', normalized),
+            'fullName': item.get('fullName') or item.get('email', normalized),
+            'sub': item['userId']
+        }
+
+    def put_user_email_index(self, user):
+        """
+        Map a user's email to their sub.
+
+        Args:
+            user (dict): Must include 'sub' and 'email'; 'username' and 'fullName' are optional
+        """
+        normalized = self.normalize_email(user.get('email'))
+        if not normalized or not user.get('sub'):
+            raise ValueError("User must include 'sub' and 'email'")
+
+        item = {
+            'PK': f'EMAIL#{normalized}',
+            'SK': 'USER',
+            'Type': 'UserEmail',
+            'userId': user['sub'],
+            'email': user['email'],
+            'username': user.get('username'),
+            'fullName': user.get('fullName'),
+            'updatedAt': datetime.now(timezone.utc).isoformat()
+        }
+        self.table.put_item(Item={k: v for k, v in item.items() if v is not None})
+        self._invalidate(item['PK'], item['SK'])
+
+    def delete_user_email_index(self, email, user_id):
+        """Remove an email mapping, only if it still points at user_id."""
+        normalized = self.normalize_email(email)
+        self._invalidate(f'EMAIL#{normalized}', 'USER')
+        try:
+            self.table.delete_item(
+                Key={'PK': f'EMAIL#{normalized}', 'SK': 'USER'},
+                ConditionExpression='userId = :userId',
+                ExpressionAttributeValues={':userId': user_id}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
 
     # Utility methods
+    def _query_pages(self, query_kwargs, page_size=None, start_key=None):
+        """
+        Yield (items, last_evaluated_key) for each page of a query until
+        DynamoDB stops returning LastEvaluatedKey.
+        """
+        request = dict(query_kwargs)
+        if page_size:
+            request['Limit'] = page_size
+        if start_key:
+            request['ExclusiveStartKey'] = start_key
+
+        while True:
+            response = self.table.query(**request)
+            last_key = response.get('LastEvaluatedKey')
+            yield response.get('Items', []), last_key
+            if not last_key:
+                return
+            request['ExclusiveStartKey'] = last_key
+
+    @staticmethod
+    def _page_size(limit):
+        try:
+            limit = int(limit or DEFAULT_PAGE_SIZE)
+        except (ValueError, TypeError):
+            limit = DEFAULT_PAGE_SIZE
+        return max(1, min(limit, MAX_PAGE_SIZE))
+
+    @staticmethod
+    def _encode_cursor(last_key):
+        """Encode a LastEvaluatedKey as an opaque, URL-safe cursor."""
+        if not last_key:
+            return None
+        payload = json.dumps(last_key, sort_keys=True, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor, scope_attribute, scope_value):
+        """
+        Decode a cursor back into an ExclusiveStartKey.
+        Rejects cursors that are malformed or belong to a different query.
+        """
+        if not cursor:
+            return None
+        try:
+            start_key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        except (ValueError, TypeError, UnicodeError):
+            raise ValueError("Invalid pagination cursor")
+
+        if (not isinstance(start_key, dict)
+                or not set(start_key) <= {'PK', 'SK'}
+                or not all(isinstance(value, str) for value in start_key.values())
+                or start_key.get(scope_attribute) != scope_value):
+            raise ValueError("Invalid pagination cursor")
+        return start_key
+
+    def _batch_get_items(self, keys, projection_expression=None, expression_attribute_names=None):
+        """
+        Fetch items by primary key with BatchGetItem.
+
+        Keys are de-duplicated and sent in chunks of 100. Unprocessed keys are
+        retried with jittered exponential backoff. Full-item reads are served
+        from and recorded in the request cache.
+
+        Returns:
+            list: Items found, in no particular order
+        """
+        unique_keys = list({(key['PK'], key['SK']): key for key in keys}.values())
+        items = []
+
+        use_cache = projection_expression is None
+        if use_cache:
+            pending_keys = []
+            with self._cache_lock:
+                for key in unique_keys:
+                    cache_key = (key['PK'], key['SK'])
+                    if cache_key in self._item_cache:
+                        self._reads_saved += 1
+                        if self._item_cache[cache_key] is not None:
+                            items.append(copy.deepcopy(self._item_cache[cache_key]))
+                    else:
+                        pending_keys.append(key)
+            fetched_keys = unique_keys = pending_keys
+            fetched_start = len(items)
+
+        for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS):
+            request = {'Keys': unique_keys[start:start + BATCH_GET_MAX_KEYS]}
+            if projection_expression:
+                request['ProjectionExpression'] = projection_expression
+            if expression_attribute_names:
+                request['ExpressionAttributeNames'] = expression_attribute_names
+
+            request_items = {self.table.name: request}
+            attempt = 0
+            while request_items:
+                response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                items.extend(response.get('Responses', {}).get(self.table.name, []))
+
+                request_items = response.get('UnprocessedKeys') or {}
+                if not request_items:
+                    break
+
+                attempt += 1
+                if attempt > BATCH_GET_MAX_RETRIES:
+                    unprocessed = len(request_items.get(self.table.name, {}).get('Keys', []))
+                    raise RuntimeError(f"BatchGetItem left {unprocessed} keys unprocessed after {BATCH_GET_MAX_RETRIES} retries")
+
+                time.sleep(random.uniform(0, BATCH_GET_BASE_DELAY * (2 ** attempt)))
+
+        if use_cache:
+            found = {(item['PK'], item['SK']): item for item in items[fetched_start:]}
+            with self._cache_lock:
+                self._reads += len(fetched_keys)
+                for key in fetched_keys:
+                    cache_key = (key['PK'], key['SK'])
+                    item = found.get(cache_key)
+                    self._item_cache[cache_key] = copy.deepcopy(item) if item is not None else None
+
+        return items
+
     @staticmethod
     def _to_decimal(value):
         if value is None:
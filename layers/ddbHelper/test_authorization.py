@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Unit tests for single-round-trip authorization in ddbHelper.py
+Tests AuthorizationDecision and the BatchGetItem-backed authorization methods.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['CORE_TABLE_NAME'] = 'test-core-table'
+
+# Import after mocking environment
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ddbHelper import CoreTableDyn
+
+
+def _batch_response(items):
+    return {'Responses': {'test-core-table': items}, 'UnprocessedKeys': {}}
+
+
+class TestAuthorizeUserServers(unittest.TestCase):
+    """Test suite for CoreTableDyn.authorize_user_servers and check_user_authorization"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_table = Mock()
+        self.mock_table.name = 'test-core-table'
+
+        self.patcher = patch('boto3.resource')
+        self.mock_boto_resource = self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_dynamodb = Mock()
+        self.mock_dynamodb.Table.return_value = self.mock_table
+        self.mock_boto_resource.return_value = self.mock_dynamodb
+
+        self.core_dyn = CoreTableDyn()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_single_batch_get_for_admin_marker_and_membership(self):
+        """Test that one BatchGetItem replaces the two sequential get_item calls"""
+        self.mock_dynamodb.batch_get_item.return_value = _batch_response([
+            {'PK': 'USER#sub-1', 'SK': 'SERVER#i-1', 'role': 'support'}
+        ])
+
+        is_authorized, role, reason = self.core_dyn.check_user_authorization('sub-1', 'i-1', 'manage_server')
+
+        self.assertTrue(is_authorized)
+        self.assertEqual(role, 'support')
+        self.mock_dynamodb.batch_get_item.assert_called_once()
+        self.mock_table.get_item.assert_not_called()
+        keys = self.mock_dynamodb.batch_get_item.call_args.kwargs['RequestItems']['test-core-table']['Keys']
+        self.assertEqual(keys, [{'PK': 'USER#sub-1', 'SK': 'ADMIN'}, {'PK': 'USER#sub-1', 'SK': 'SERVER#i-1'}])
+
+    def test_decision_evaluates_other_permissions(self):
+        """Test that callers can check manage_users without another read"""
+        self.mock_dynamodb.batch_get_item.return_value = _batch_response([
+            {'PK': 'USER#sub-1', 'SK': 'SERVER#i-1', 'role': 'support'}
+        ])
+
+        decision = self.core_dyn.check_user_authorization('sub-1', 'i-1', 'manage_server')
+
+        self.assertTrue(decision.allows('read_server'))
+        self.assertFalse(decision.allows('manage_users'))
+        self.assertEqual(decision.membership_role, 'support')
+
+    def test_global_admin_is_authorized_everywhere(self):
+        """Test that the admin marker authorizes servers without memberships"""
+        self.mock_dynamodb.batch_get_item.return_value = _batch_response([
+            {'PK': 'USER#sub-1', 'SK': 'ADMIN', 'role': 'admin'}
+        ])
+
+        decisions = self.core_dyn.authorize_user_servers('sub-1', ['i-1', 'i-2'], 'manage_users')
+
+        self.assertTrue(all(decision.authorized for decision in decisions.values()))
+        self.assertTrue(decisions['i-1'].is_global_admin)
+        self.assertIsNone(decisions['i-1'].membership_role)
+
+    def test_vectorized_form_mixes_granted_and_denied(self):
+        """Test one user against several servers in a single call"""
+        self.mock_dynamodb.batch_get_item.return_value = _batch_response([
+            {'PK': 'USER#sub-1', 'SK': 'SERVER#i-1', 'role': 'admin'},
+            {'PK': 'USER#sub-1', 'SK': 'SERVER#i-2', 'role': 'viewer'}
+        ])
+
+        decisions = self.core_dyn.authorize_user_servers('sub-1', ['i-1', 'i-2', 'i-3'], 'manage_server')
+
+        self.assertEqual(self.mock_dynamodb.batch_get_item.call_count, 1)
+        self.assertTrue(decisions['i-1'].authorized)
+        self.assertFalse(decisions['i-2'].authorized)
+        self.assertIn('Insufficient permissions', decisions['i-2'].reason)
+        self.assertFalse(decisions['i-3'].authorized)
+        self.assertIsNone(decisions['i-3'].role)
+
+    def test_read_error_denies_access(self):
+        """Test that a DynamoDB failure fails closed"""
+        self.mock_dynamodb.batch_get_item.side_effect = Exception("throttled")
+
+        is_authorized, role, reason = self.core_dyn.check_user_authorization('sub-1', 'i-1')
+
+        self.assertFalse(is_authorized)
+        self.assertIsNone(role)
+        self.assertIn('Error checking permissions', reason)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batched CoreTable reads in ddbHelper.py
+Tests BatchGetItem chunking, unprocessed-key retries, bulk server metadata, disk size caching, metric watermarks and user profile items.
+"""
+import sys
+import os
+import unittest
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+from botocore.exceptions import ClientError
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['CORE_TABLE_NAME'] = 'test-core-table'
+
+# Import after mocking environment
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ddbHelper import CoreTableDyn
+
+
+class TestBatchGetItems(unittest.TestCase):
+    """Test suite for CoreTableDyn._batch_get_items"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_table = Mock()
+        self.mock_table.name = 'test-core-table'
+
+        self.patcher = patch('boto3.resource')
+        self.mock_boto_resource = self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_dynamodb = Mock()
+        self.mock_dynamodb.Table.return_value = self.mock_table
+        self.mock_boto_resource.return_value = self.mock_dynamodb
+
+        self.sleep_patcher = patch('ddbHelper.time.sleep')
+        self.mock_sleep = self.sleep_patcher.start()
+
+        self.core_dyn = CoreTableDyn()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+        self.sleep_patcher.stop()
+
+    def _echo_batch_get(self, RequestItems):
+        keys = RequestItems['test-core-table']['Keys']
+        return {'Responses': {'test-core-table': [dict(key) for key in keys]}, 'UnprocessedKeys': {}}
+
+    def test_keys_are_chunked_by_100(self):
+        """Test that 250 keys are read with three BatchGetItem calls"""
+        self.mock_dynamodb.batch_get_item.side_effect = self._echo_batch_get
+        keys = [{'PK': f'SERVER#i-{n}', 'SK': 'METADATA'} for n in range(250)]
+
+        items = self.core_dyn._batch_get_items(keys)
+
+        self.assertEqual(len(items), 250)
+        chunk_sizes = [len(call.kwargs['RequestItems']['test-core-table']['Keys'])
+                       for call in self.mock_dynamodb.batch_get_item.call_args_list]
+        self.assertEqual(chunk_sizes, [100, 100, 50])
+
+    def test_duplicate_keys_are_sent_once(self):
+        """Test that duplicate keys don't trigger a ValidationException"""
+        self.mock_dynamodb.batch_get_item.side_effect = self._echo_batch_get
+        keys = [{'PK': 'USER#a', 'SK': 'PROFILE'}, {'PK': 'USER#a', 'SK': 'PROFILE'}]
+
+        items = self.core_dyn._batch_get_items(keys)
+
+        self.assertEqual(len(items), 1)
+
+    def test_unprocessed_keys_are_retried(self):
+        """Test that throttled keys are re-requested with backoff"""
+        first_key = {'PK': 'USER#a', 'SK': 'PROFILE'}
+        second_key = {'PK': 'USER#b', 'SK': 'PROFILE'}
+        self.mock_dynamodb.batch_get_item.side_effect = [
+            {
+                'Responses': {'test-core-table': [first_key]},
+                'UnprocessedKeys': {'test-core-table': {'Keys': [second_key]}}
+            },
+            {'Responses': {'test-core-table': [second_key]}, 'UnprocessedKeys': {}}
+        ]
+
+        items = self.core_dyn._batch_get_items([first_key, second_key])
+
+        self.assertEqual(items, [first_key, second_key])
+        self.assertEqual(self.mock_dynamodb.batch_get_item.call_count, 2)
+        self.mock_sleep.assert_called_once()
+
+    def test_persistent_unprocessed_keys_raise(self):
+        """Test that retries are bounded"""
+        key = {'PK': 'USER#a', 'SK': 'PROFILE'}
+        self.mock_dynamodb.batch_get_item.return_value = {
+            'Responses': {'test-core-table': []},
+            'UnprocessedKeys': {'test-core-table': {'Keys': [key]}}
+        }
+
+        with self.assertRaises(RuntimeError):
+            self.core_dyn._batch_get_items([key])
+
+    def test_get_user_profiles_maps_items_by_sub(self):
+        """Test that profile items are keyed by user sub"""
+        self.mock_dynamodb.batch_get_item.return_value = {
+            'Responses': {'test-core-table': [
+                {'PK': 'USER#sub-a', 'SK': 'PROFILE', 'email': 'a@example.com', 'fullName': 'Alex A',
+                 'updatedAt': '2024-01-01T00:00:00+00:00'}
+            ]},
+            'UnprocessedKeys': {}
+        }
+
+        profiles = self.core_dyn.get_user_profiles(['sub-a', 'sub-b'])
+
+        self.assertEqual(list(profiles), ['sub-a'])
+        self.assertEqual(profiles['sub-a']['fullName'], 'Alex A')
+
+    def test_get_servers_bulk_reads_metadata_in_chunks(self):
+        """Test that 150 servers cost two BatchGetItem calls and no get_item"""
+        def metadata_batch_get(RequestItems):
+            keys = RequestItems['test-core-table']['Keys']
+            return {'Responses': {'test-core-table': [
+                dict(key, configStatus='valid', configValid=True) for key in keys if key['PK'] != 'SERVER#i-7'
+            ]}, 'UnprocessedKeys': {}}
+
+        self.mock_dynamodb.batch_get_item.side_effect = metadata_batch_get
+        instance_ids = [f'i-{n}' for n in range(150)]
+
+        servers = self.core_dyn.get_servers_bulk(instance_ids)
+
+        self.assertEqual(self.mock_dynamodb.batch_get_item.call_count, 2)
+        self.assertEqual(len(servers), 149)
+        self.assertNotIn('i-7', servers)
+        self.assertEqual(servers['i-0']['configStatus'], 'valid')
+
+        # Later per-server reads come from the request cache
+        self.core_dyn.get_server_config('i-0')
+        self.assertIsNone(self.core_dyn.get_server_info('i-7'))
+        self.mock_table.get_item.assert_not_called()
+
+    def test_disk_size_is_cached_on_existing_metadata_only(self):
+        """Test that the disk size write never creates a partial server item"""
+        self.assertTrue(self.core_dyn.update_server_disk_size('i-1', 'vol-1', 30))
+        request = self.mock_table.update_item.call_args.kwargs
+        self.assertEqual(request['ConditionExpression'], 'attribute_exists(PK)')
+        self.assertEqual(request['ExpressionAttributeValues'][':volume'], 'vol-1')
+
+        self.mock_table.update_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'failed'}}, 'UpdateItem'
+        )
+        self.assertFalse(self.core_dyn.update_server_disk_size('i-2', 'vol-2', 30))
+
+    def test_metric_watermarks_are_read_in_bulk(self):
+        """Test that watermark items come back as ints keyed by instance"""
+        self.mock_dynamodb.batch_get_item.return_value = {
+            'Responses': {'test-core-table': [
+                {'PK': 'SERVER#i-1', 'SK': 'METRIC_WATERMARK', 'series': {'cpuStats': Decimal('1704067200000')},
+                 'fullSyncAt': Decimal('1704067100000')}
+            ]},
+            'UnprocessedKeys': {}
+        }
+
+        watermarks = self.core_dyn.get_metric_watermarks(['i-1', 'i-2'])
+
+        self.assertEqual(watermarks, {'i-1': {'series': {'cpuStats': 1704067200000}, 'fullSyncAt': 1704067100000}})
+        self.mock_table.get_item.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,6 +15,8 @@ os.environ['USER_MEMBERSHIP_TABLE_NAME'] = 'test-user-membership-table'
 
 # Import after mocking environment
 sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
 from ddbHelper import UserMembershipDyn
 
 
@@ -35,6 +37,7 @@ class TestUserMembershipDyn(unittest.TestCase):
         # Patch boto3.resource to return mock table
         self.patcher = patch('boto3.resource')
         self.mock_boto_resource = self.patcher.start()
+        clientHelper.reset_clients()
         
         mock_dynamodb = Mock()
         mock_dynamodb.Table.return_value = self.mock_table
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Unit tests for paginated membership queries in ddbHelper.py
+Tests LastEvaluatedKey handling, projections and opaque cursors.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['CORE_TABLE_NAME'] = 'test-core-table'
+
+# Import after mocking environment
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ddbHelper import CoreTableDyn, MAX_PAGE_SIZE
+
+
+def _member(user_id, server_id='i-1', role='viewer'):
+    return {'PK': f'USER#{user_id}', 'SK': f'SERVER#{server_id}', 'role': role}
+
+
+class TestMembershipPagination(unittest.TestCase):
+    """Test suite for iter_*/list_*_page membership queries"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_table = Mock()
+        self.mock_table.name = 'test-core-table'
+
+        self.patcher = patch('boto3.resource')
+        self.mock_boto_resource = self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_dynamodb = Mock()
+        self.mock_dynamodb.Table.return_value = self.mock_table
+        self.mock_boto_resource.return_value = self.mock_dynamodb
+
+        self.core_dyn = CoreTableDyn()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_list_server_members_follows_last_evaluated_key(self):
+        """Test that results past the first 1 MB page aren't truncated"""
+        self.mock_table.query.side_effect = [
+            {'Items': [_member('a'), _member('b')], 'LastEvaluatedKey': {'PK': 'USER#b', 'SK': 'SERVER#i-1'}},
+            {'Items': [_member('c')]}
+        ]
+
+        members = self.core_dyn.list_server_members('i-1')
+
+        self.assertEqual([m['userId'] for m in members], ['a', 'b', 'c'])
+        second_call = self.mock_table.query.call_args_list[1].kwargs
+        self.assertEqual(second_call['ExclusiveStartKey'], {'PK': 'USER#b', 'SK': 'SERVER#i-1'})
+        self.assertEqual(second_call['IndexName'], 'SK-PK-index')
+        self.assertIn('ProjectionExpression', second_call)
+
+    def test_iter_user_servers_is_lazy(self):
+        """Test that the generator stops querying when the caller stops"""
+        self.mock_table.query.side_effect = [
+            {'Items': [_member('u', 'i-1')], 'LastEvaluatedKey': {'PK': 'USER#u', 'SK': 'SERVER#i-1'}},
+            {'Items': [_member('u', 'i-2')]}
+        ]
+
+        first = next(self.core_dyn.iter_user_servers('u', page_size=1))
+
+        self.assertEqual(first['serverId'], 'i-1')
+        self.assertEqual(self.mock_table.query.call_count, 1)
+        self.assertEqual(self.mock_table.query.call_args.kwargs['Limit'], 1)
+
+    def test_page_cursor_round_trip(self):
+        """Test that nextCursor resumes the query where it stopped"""
+        last_key = {'PK': 'USER#b', 'SK': 'SERVER#i-1'}
+        self.mock_table.query.return_value = {'Items': [_member('a'), _member('b')], 'LastEvaluatedKey': last_key}
+
+        page = self.core_dyn.list_server_members_page('i-1', limit=2)
+        self.assertEqual(len(page['items']), 2)
+        self.assertIsInstance(page['nextCursor'], str)
+
+        self.mock_table.query.return_value = {'Items': [_member('c')]}
+        next_page = self.core_dyn.list_server_members_page('i-1', limit=2, cursor=page['nextCursor'])
+
+        self.assertEqual(self.mock_table.query.call_args.kwargs['ExclusiveStartKey'], last_key)
+        self.assertIsNone(next_page['nextCursor'])
+
+    def test_cursor_for_another_server_is_rejected(self):
+        """Test that a cursor can't be replayed against a different server"""
+        cursor = CoreTableDyn._encode_cursor({'PK': 'USER#b', 'SK': 'SERVER#i-1'})
+
+        with self.assertRaises(ValueError):
+            self.core_dyn.list_server_members_page('i-2', cursor=cursor)
+        with self.assertRaises(ValueError):
+            self.core_dyn.list_server_members_page('i-1', cursor='not-a-cursor')
+
+    def test_page_size_is_capped(self):
+        """Test that clients can't request unbounded pages"""
+        self.mock_table.query.return_value = {'Items': []}
+
+        self.core_dyn.list_user_servers_page('u', limit=10000)
+
+        self.assertEqual(self.mock_table.query.call_args.kwargs['Limit'], MAX_PAGE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
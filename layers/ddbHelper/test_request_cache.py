@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the request-scoped CoreTable read cache in ddbHelper.py
+Tests read reuse across accessors, invalidation on writes and per-request reset.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['CORE_TABLE_NAME'] = 'test-core-table'
+
+# Import after mocking environment
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ddbHelper import CoreTableDyn
+
+
+class TestRequestCache(unittest.TestCase):
+    """Test suite for the CoreTableDyn identity map"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_table = Mock()
+        self.mock_table.name = 'test-core-table'
+        self.mock_table.get_item.return_value = {
+            'Item': {'PK': 'SERVER#i-1', 'SK': 'METADATA', 'name': 'survival', 'runCommand': 'java -jar server.jar',
+                     'configWarnings': ['low memory']}
+        }
+
+        self.patcher = patch('boto3.resource')
+        self.mock_boto_resource = self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_dynamodb = Mock()
+        self.mock_dynamodb.Table.return_value = self.mock_table
+        self.mock_boto_resource.return_value = self.mock_dynamodb
+
+        self.core_dyn = CoreTableDyn()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_metadata_read_once_across_accessors(self):
+        """Test that get_server_info and get_server_config share one read"""
+        info = self.core_dyn.get_server_info('i-1')
+        config = self.core_dyn.get_server_config('i-1')
+
+        self.assertEqual(info['name'], 'survival')
+        self.assertEqual(config['runCommand'], 'java -jar server.jar')
+        self.mock_table.get_item.assert_called_once()
+        self.assertEqual(self.core_dyn.request_cache_stats(), {'reads': 1, 'readsSaved': 1, 'size': 1})
+
+    def test_missing_items_are_cached(self):
+        """Test that a miss isn't re-read within the same request"""
+        self.mock_table.get_item.return_value = {}
+
+        self.assertFalse(self.core_dyn.check_global_admin('sub-1'))
+        self.assertFalse(self.core_dyn.check_global_admin('sub-1'))
+
+        self.mock_table.get_item.assert_called_once()
+
+    def test_cached_items_are_isolated_from_callers(self):
+        """Test that mutating a returned value doesn't poison the cache"""
+        info = self.core_dyn.get_server_info('i-1')
+        info['configWarnings'].append('tampered')
+
+        self.assertEqual(self.core_dyn.get_server_info('i-1')['configWarnings'], ['low memory'])
+
+    def test_write_invalidates_cached_item(self):
+        """Test that a write forces the next read back to DynamoDB"""
+        self.core_dyn.get_server_info('i-1')
+        self.core_dyn.update_server_name('i-1', 'creative')
+        self.core_dyn.get_server_info('i-1')
+
+        self.assertEqual(self.mock_table.get_item.call_count, 2)
+
+    def test_batch_reads_share_the_cache(self):
+        """Test that BatchGetItem results serve later single-item reads"""
+        self.mock_dynamodb.batch_get_item.return_value = {
+            'Responses': {'test-core-table': [{'PK': 'USER#sub-1', 'SK': 'SERVER#i-1', 'role': 'admin'}]},
+            'UnprocessedKeys': {}
+        }
+
+        self.core_dyn.check_user_authorization('sub-1', 'i-1', 'manage_users')
+        access = self.core_dyn.check_user_server_access('sub-1', 'i-1')
+
+        self.assertEqual(access['role'], 'admin')
+        self.assertFalse(self.core_dyn.check_global_admin('sub-1'))
+        self.mock_table.get_item.assert_not_called()
+
+    def test_reset_starts_a_new_request(self):
+        """Test that warm containers don't serve the previous request's items"""
+        self.core_dyn.get_server_info('i-1')
+        self.core_dyn.reset_request_cache()
+        self.core_dyn.get_server_info('i-1')
+
+        self.assertEqual(self.mock_table.get_item.call_count, 2)
+        self.assertEqual(self.core_dyn.request_cache_stats()['readsSaved'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the runtime ledger in ddbHelper.py
+Tests opening/closing intervals, range listing and the completeness marker.
+"""
+import sys
+import os
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from botocore.exceptions import ClientError
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['CORE_TABLE_NAME'] = 'test-core-table'
+
+# Import after mocking environment
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ddbHelper import CoreTableDyn
+
+
+def _interval(started_at, stopped_at=None):
+    item = {'PK': 'SERVER#i-1', 'SK': f'RUNTIME#{started_at}', 'Type': 'RuntimeInterval', 'startedAt': started_at}
+    if stopped_at:
+        item['stoppedAt'] = stopped_at
+    return item
+
+
+class TestRuntimeLedger(unittest.TestCase):
+    """Test suite for CoreTableDyn runtime ledger operations"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_table = Mock()
+
+        self.patcher = patch('boto3.resource')
+        self.mock_boto_resource = self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_dynamodb = Mock()
+        self.mock_dynamodb.Table.return_value = self.mock_table
+        self.mock_boto_resource.return_value = self.mock_dynamodb
+
+        self.dyn = CoreTableDyn()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_timestamps_are_normalized(self):
+        """Test that event, CloudTrail and datetime forms sort the same way"""
+        expected = '2024-03-01T10:00:00Z'
+        self.assertEqual(CoreTableDyn.runtime_timestamp('2024-03-01T10:00:00Z'), expected)
+        self.assertEqual(CoreTableDyn.runtime_timestamp('2024-03-01T02:00:00-08:00'), expected)
+        self.assertEqual(CoreTableDyn.runtime_timestamp(datetime(2024, 3, 1, 10, tzinfo=timezone.utc)), expected)
+
+    def test_running_opens_an_interval(self):
+        """Test that a running transition writes a new open interval"""
+        self.mock_table.query.return_value = {'Items': [_interval('2024-03-01T08:00:00Z', '2024-03-01T09:00:00Z')]}
+
+        self.assertTrue(self.dyn.open_runtime_interval('i-1', '2024-03-01T10:00:00Z'))
+
+        item = self.mock_table.put_item.call_args.kwargs['Item']
+        self.assertEqual(item['SK'], 'RUNTIME#2024-03-01T10:00:00Z')
+        self.assertNotIn('stoppedAt', item)
+
+    def test_duplicate_running_is_ignored(self):
+        """Test that a second running event doesn't open another interval"""
+        self.mock_table.query.return_value = {'Items': [_interval('2024-03-01T10:00:00Z')]}
+
+        self.assertFalse(self.dyn.open_runtime_interval('i-1', '2024-03-01T10:00:05Z'))
+        self.mock_table.put_item.assert_not_called()
+
+    def test_stop_closes_the_open_interval(self):
+        """Test that a stop transition closes the latest interval conditionally"""
+        self.mock_table.query.return_value = {'Items': [_interval('2024-03-01T10:00:00Z')]}
+
+        self.assertTrue(self.dyn.close_runtime_interval('i-1', '2024-03-01T12:30:00Z'))
+
+        kwargs = self.mock_table.update_item.call_args.kwargs
+        self.assertEqual(kwargs['Key'], {'PK': 'SERVER#i-1', 'SK': 'RUNTIME#2024-03-01T10:00:00Z'})
+        self.assertIn('attribute_not_exists(stoppedAt)', kwargs['ConditionExpression'])
+
+        # stopping then stopped: the second transition finds nothing open
+        self.mock_table.query.return_value = {'Items': [_interval('2024-03-01T10:00:00Z', '2024-03-01T12:30:00Z')]}
+        self.assertFalse(self.dyn.close_runtime_interval('i-1', '2024-03-01T12:31:00Z'))
+        self.assertEqual(self.mock_table.update_item.call_count, 1)
+
+    def test_listing_stops_at_range_start(self):
+        """Test that the backwards walk ends at the first interval before the range"""
+        self.mock_table.query.side_effect = [
+            {'Items': [_interval('2024-03-05T10:00:00Z'), _interval('2024-03-02T10:00:00Z', '2024-03-02T11:00:00Z')],
+             'LastEvaluatedKey': {'PK': 'SERVER#i-1', 'SK': 'RUNTIME#2024-03-02T10:00:00Z'}},
+            {'Items': [_interval('2024-02-29T23:00:00Z', '2024-03-01T01:00:00Z'),
+                       _interval('2024-02-20T10:00:00Z', '2024-02-20T11:00:00Z')],
+             'LastEvaluatedKey': {'PK': 'SERVER#i-1', 'SK': 'RUNTIME#2024-02-20T10:00:00Z'}}
+        ]
+
+        intervals = self.dyn.list_runtime_intervals('i-1', '2024-03-01T00:00:00Z', '2024-04-01T00:00:00Z')
+
+        self.assertEqual([i['startedAt'] for i in intervals],
+                         ['2024-02-29T23:00:00Z', '2024-03-02T10:00:00Z', '2024-03-05T10:00:00Z'])
+        self.assertIsNone(intervals[-1]['stoppedAt'])
+        self.assertEqual(self.mock_table.query.call_count, 2)
+        self.assertFalse(self.mock_table.query.call_args_list[0].kwargs['ScanIndexForward'])
+
+    def test_ledger_marker_only_moves_back(self):
+        """Test that a later completeness marker is rejected"""
+        self.mock_table.update_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'later'}}, 'UpdateItem')
+
+        self.assertFalse(self.dyn.set_runtime_ledger_since('i-1', '2024-03-01T00:00:00Z'))
+        kwargs = self.mock_table.update_item.call_args.kwargs
+        self.assertEqual(kwargs['Key'], {'PK': 'SERVER#i-1', 'SK': 'RUNTIME_LEDGER'})
+        self.assertEqual(kwargs['ExpressionAttributeValues'][':since'], '2024-03-01T00:00:00Z')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Unit tests for field-level server config writes in ddbHelper.py
+Tests the UpdateItem builder, ALL_NEW mapping and optimistic concurrency.
+"""
+import sys
+import os
+import unittest
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+from botocore.exceptions import ClientError
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['CORE_TABLE_NAME'] = 'test-core-table'
+
+# Import after mocking environment
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ddbHelper import CoreTableDyn, VersionConflictError
+
+
+class TestPutServerConfig(unittest.TestCase):
+    """Test suite for CoreTableDyn.put_server_config"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_table = Mock()
+        self.mock_table.name = 'test-core-table'
+        self.mock_table.update_item.return_value = {
+            'Attributes': {
+                'PK': 'SERVER#i-1', 'SK': 'METADATA', 'Type': 'Server',
+                'runCommand': 'java -jar server.jar', 'alarmThreshold': Decimal('5.0'),
+                'runningMinutesCache': Decimal('120.5'), 'version': Decimal('3')
+            }
+        }
+
+        self.patcher = patch('boto3.resource')
+        self.mock_boto_resource = self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_dynamodb = Mock()
+        self.mock_dynamodb.Table.return_value = self.mock_table
+        self.mock_boto_resource.return_value = self.mock_dynamodb
+
+        self.core_dyn = CoreTableDyn()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_single_update_writes_only_supplied_fields(self):
+        """Test that a partial config doesn't reset other fields"""
+        config = self.core_dyn.put_server_config({
+            'id': 'i-1',
+            'runningMinutesCache': Decimal('120.5'),
+            'runningMinutesCacheTimestamp': '2024-01-01T00:00:00+00:00'
+        })
+
+        self.mock_table.get_item.assert_not_called()
+        self.mock_table.put_item.assert_not_called()
+        self.mock_table.update_item.assert_called_once()
+
+        request = self.mock_table.update_item.call_args.kwargs
+        self.assertEqual(request['ReturnValues'], 'ALL_NEW')
+        self.assertNotIn('ConditionExpression', request)
+        self.assertIn('#runningMinutesCache = :runningMinutesCache', request['UpdateExpression'])
+        self.assertNotIn('runCommand', request['UpdateExpression'])
+        self.assertNotIn('#alarmThreshold', request['UpdateExpression'])
+
+        # Mapped from ALL_NEW, no extra read
+        self.assertEqual(config['runCommand'], 'java -jar server.jar')
+        self.assertEqual(config['runningMinutesCache'], 120.5)
+        self.assertEqual(config['version'], 3)
+
+    def test_numbers_are_converted_to_decimal(self):
+        """Test that floats are stored as Decimal and alarmThreshold is rounded"""
+        self.core_dyn.put_server_config({'id': 'i-1', 'alarmThreshold': 5.04, 'alarmEvaluationPeriod': 30,
+                                         'isBootstrapComplete': True})
+
+        values = self.mock_table.update_item.call_args.kwargs['ExpressionAttributeValues']
+        self.assertEqual(values[':alarmThreshold'], Decimal('5.0'))
+        self.assertEqual(values[':alarmEvaluationPeriod'], Decimal('30'))
+        self.assertIs(values[':isBootstrapComplete'], True)
+
+    def test_version_makes_write_conditional(self):
+        """Test optimistic concurrency on the version attribute"""
+        self.core_dyn.put_server_config({'id': 'i-1', 'runCommand': 'start.sh', 'version': 2})
+
+        request = self.mock_table.update_item.call_args.kwargs
+        self.assertEqual(request['ConditionExpression'], '#version = :expectedVersion')
+        self.assertEqual(request['ExpressionAttributeValues'][':expectedVersion'], 2)
+
+    def test_version_conflict_raises(self):
+        """Test that a stale version surfaces as VersionConflictError"""
+        self.mock_table.update_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'failed'}}, 'UpdateItem'
+        )
+
+        with self.assertRaises(VersionConflictError):
+            self.core_dyn.put_server_config({'id': 'i-1', 'runCommand': 'start.sh', 'version': 2})
+
+    def test_result_primes_request_cache(self):
+        """Test that a read after the write reuses the ALL_NEW item"""
+        self.core_dyn.put_server_config({'id': 'i-1', 'runCommand': 'java -jar server.jar'})
+        config = self.core_dyn.get_server_config('i-1')
+
+        self.assertEqual(config['runCommand'], 'java -jar server.jar')
+        self.mock_table.get_item.assert_not_called()
+
+    def test_missing_id_raises(self):
+        """Test that the instance ID is required"""
+        with self.assertRaises(ValueError):
+            self.core_dyn.put_server_config({'runCommand': 'start.sh'})
+
+
+if __name__ == '__main__':
+    unittest.main()
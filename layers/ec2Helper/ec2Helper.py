@@ -1,33 +1,460 @@
-import boto3
+import base64
+import hashlib
 import logging
 import os
 import json
-from datetime import datetime, timezone
+import threading
+import time
+from datetime import datetime, timezone, timedelta
 from botocore.exceptions import ClientError
+import clientHelper
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-session = boto3.session.Session()
+session = clientHelper.get_session()
 aws_region = session.region_name
 
+# The fleet snapshot is shared by every list_* call for this long; state-change
+# events invalidate it explicitly, the TTL covers changes made elsewhere
+FLEET_SNAPSHOT_TTL_SECONDS = int(os.getenv('FLEET_SNAPSHOT_TTL_SECONDS', '15'))
+# States held in the snapshot; terminated instances are never listed
+FLEET_SNAPSHOT_STATES = ["pending", "running", "shutting-down", "stopping", "stopped"]
+# States returned by the "all servers" style listings
+ACTIVE_INSTANCE_STATES = ("pending", "running", "stopping", "stopped")
+# describe_instances accepts MaxResults between 5 and 1000 when filtering
+EC2_MIN_PAGE_SIZE = 5
+EC2_MAX_PAGE_SIZE = 1000
+# describe_instances accepts up to 1000 InstanceIds per call
+DESCRIBE_IDS_CHUNK_SIZE = 1000
+# describe_instance_status accepts up to 100 InstanceIds per call
+DESCRIBE_STATUS_CHUNK_SIZE = 100
+# describe_volumes is asked for at most 500 VolumeIds per call
+DESCRIBE_VOLUMES_CHUNK_SIZE = 500
+# Per-ID errors that poison a whole batch; the batch is bisected to isolate them
+INSTANCE_ID_ERROR_CODES = ('InvalidInstanceID.NotFound', 'InvalidInstanceID.Malformed')
+VOLUME_ID_ERROR_CODES = ('InvalidVolume.NotFound', 'InvalidVolumeID.Malformed')
+
+# Per-instance schedule rules are named <prefix><instance_id>
+SCHEDULE_RULE_PREFIXES = ('shutdown-', 'start-')
+# Rule names are read in one sweep and reused for this long
+RULE_INDEX_TTL_SECONDS = int(os.getenv('RULE_INDEX_TTL_SECONDS', '60'))
+
+SUPPORTED_INSTANCE_TYPES = ['t3.micro', 't3.small', 't3.medium', 't3.large', 't3.xlarge', 't3.2xlarge']
+# vCPU/memory for the supported types, generated by generate_instance_types.py
+INSTANCE_TYPE_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance_types.json')
+# Types learned from the API survive in /tmp for the life of the execution environment
+INSTANCE_TYPE_CACHE_PATH = os.getenv('INSTANCE_TYPE_CACHE_PATH', '/tmp/instance_types.json')
+# describe_instance_types accepts up to 100 InstanceTypes per call
+DESCRIBE_TYPES_CHUNK_SIZE = 100
+# CloudTrail LookupEvents is throttled at 2 requests per second per account and region
+CLOUDTRAIL_LOOKUP_RATE = float(os.getenv('CLOUDTRAIL_LOOKUP_RATE', '2'))
+# Events that move an instance into or out of 'running'
+RUNTIME_EVENT_NAMES = ('RunInstances', 'StartInstances', 'StopInstances')
+
+def _parse_timestamp(value):
+    """Parse an ISO-8601 timestamp ('Z' or offset) into an aware datetime."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _runtime_transitions(event_name, ct_event, instance_ids):
+    """
+    Fan one parsed CloudTrail event out to (instance_id, kind, event_time) transitions.
+
+    RunInstances starts every launched instance; StartInstances only counts
+    instances that were stopped, and StopInstances those that were running.
+    kind is 'StartInstances' or 'StopInstances'.
+    """
+    items = ct_event.get('responseElements', {}).get('instancesSet', {}).get('items', [])
+    required_state = {'StartInstances': 'stopped', 'StopInstances': 'running'}.get(event_name)
+    kind = 'StopInstances' if event_name == 'StopInstances' else 'StartInstances'
+
+    transitions = []
+    for item in items:
+        instance_id = item.get('instanceId')
+        if instance_id not in instance_ids:
+            continue
+        if required_state and item.get('previousState', {}).get('name') != required_state:
+            continue
+        transitions.append((instance_id, kind, ct_event['eventTime']))
+    return transitions
+
+
+def pair_runtime_transitions(data_points, end_time, current_state, leave_open=True):
+    """
+    Pair sorted start/stop points into running intervals clipped to end_time.
+
+    A trailing start without a stop is kept only if the instance is running
+    now: open when leave_open is set, otherwise closed at end_time.
+
+    Args:
+        data_points (list): {'s': 'StartInstances'|'StopInstances', 'x': ISO time}, oldest first
+        end_time (datetime): Clip intervals here
+        current_state (str): Instance state now; 'running' keeps a trailing start
+        leave_open (bool): Leave the trailing interval open instead of closing it at end_time
+
+    Returns:
+        list: {'startedAt', 'stoppedAt'} dicts with datetime values
+    """
+    intervals = []
+    start_event = None
+    for point in data_points:
+        if point['s'] == "StartInstances":
+            start_event = _parse_timestamp(point['x'])
+        elif point['s'] == "StopInstances" and start_event:
+            intervals.append({'startedAt': start_event, 'stoppedAt': min(_parse_timestamp(point['x']), end_time)})
+            start_event = None
+
+    # Handle case where instance is currently running
+    if start_event and current_state == 'running':
+        intervals.append({'startedAt': start_event, 'stoppedAt': None if leave_open else end_time})
+
+    return [interval for interval in intervals if interval['startedAt'] < end_time]
+
+
+def _as_utc(value):
+    """Accept an aware datetime or ISO string and return an aware datetime."""
+    return _parse_timestamp(value) if isinstance(value, str) else value
+
+
+def _runtime_tz(tz_name):
+    """pytz timezone for a server's configured timezone, UTC if unknown."""
+    import pytz
+    try:
+        return pytz.timezone(tz_name or 'UTC')
+    except pytz.UnknownTimeZoneError:
+        logger.warning(f"Unknown timezone {tz_name}, bucketing runtime in UTC")
+        return pytz.UTC
+
+
+def summarize_runtime(intervals, start_time, end_time, tz_name='UTC', buckets=True, now=None):
+    """
+    Total the running time of intervals within [start_time, end_time).
+
+    Intervals are clipped at the window edges; an open interval (stoppedAt
+    None) counts up to end_time or now, whichever is earlier. With buckets
+    set, time is also split at local hour boundaries in tz_name and rolled up
+    per local day. Seconds are summed exactly and only the results rounded.
+
+    Args:
+        intervals (iterable): {'startedAt', 'stoppedAt'} dicts (datetimes or ISO strings),
+            e.g. from pair_runtime_transitions or the CoreTable runtime ledger
+        start_time (datetime): Window start (timezone-aware)
+        end_time (datetime): Window end (timezone-aware)
+        tz_name (str): Timezone for the buckets, e.g. the server's 'timezone' config
+        buckets (bool): Also return daily/hourly buckets
+        now (datetime, optional): Current time, defaults to datetime.now(UTC)
+
+    Returns:
+        dict: {
+            'totalMinutes': float,
+            'daily': {'YYYY-MM-DD': minutes},
+            'hourly': {'YYYY-MM-DDTHH:00': minutes}
+        } with bucket keys in local time; a repeated DST hour shares one bucket
+    """
+    open_until = min(end_time, now or datetime.now(tz=timezone.utc))
+    tz = _runtime_tz(tz_name) if buckets else None
+
+    total_seconds = 0.0
+    hourly = {}
+    for interval in intervals:
+        started_at = max(_as_utc(interval['startedAt']), start_time)
+        stopped_at = min(_as_utc(interval['stoppedAt']), end_time) if interval.get('stoppedAt') else open_until
+        if stopped_at <= started_at:
+            continue
+
+        total_seconds += (stopped_at - started_at).total_seconds()
+        if not buckets:
+            continue
+
+        cursor = started_at
+        while cursor < stopped_at:
+            local = cursor.astimezone(tz)
+            into_hour = local.minute * 60 + local.second + local.microsecond / 1e6
+            step_end = min(cursor + timedelta(seconds=3600 - into_hour), stopped_at)
+            key = local.strftime('%Y-%m-%dT%H:00')
+            hourly[key] = hourly.get(key, 0.0) + (step_end - cursor).total_seconds()
+            cursor = step_end
+
+    daily = {}
+    for key, seconds in hourly.items():
+        daily[key[:10]] = daily.get(key[:10], 0.0) + seconds
+
+    return {
+        'totalMinutes': round(total_seconds / 60, 2),
+        'daily': {key: round(daily[key] / 60, 2) for key in sorted(daily)},
+        'hourly': {key: round(hourly[key] / 60, 2) for key in sorted(hourly)}
+    }
+
+
 def extract_instance_id(event):
     """Extract instance ID from Lambda event arguments."""
     return (event["arguments"].get("instanceId") or 
             event["arguments"].get("id") or
             event["arguments"].get("input", {}).get("id"))
                
+class FleetSnapshot:
+    """
+    In-memory snapshot of every App-tagged instance, indexed by instance id,
+    state and the Group and User tags.
+
+    One paginated describe_instances fills all indexes; lookups are dict reads
+    until the TTL expires or invalidate() is called. Instance dicts are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, loader, ttl_seconds=FLEET_SNAPSHOT_TTL_SECONDS):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._fetched_at = None
+        self._instances = []
+        self._by_id = {}
+        self._by_state = {}
+        self._by_group = {}
+        self._by_user = {}
+
+    def _is_fresh(self):
+        return self._fetched_at is not None and time.time() - self._fetched_at < self.ttl_seconds
+
+    def invalidate(self):
+        """Drop the snapshot so the next lookup re-describes the fleet."""
+        with self._lock:
+            self._fetched_at = None
+
+    def _ensure_loaded(self):
+        if self._is_fresh():
+            return
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._is_fresh():
+                return
+
+            instances = self.loader()
+            by_id, by_state, by_group, by_user = {}, {}, {}, {}
+            for instance in instances:
+                tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+                by_id[instance['InstanceId']] = instance
+                by_state.setdefault(instance['State']['Name'], []).append(instance)
+                if instance['State']['Name'] not in ACTIVE_INSTANCE_STATES:
+                    continue
+                if 'Group' in tags:
+                    by_group.setdefault(tags['Group'], []).append(instance)
+                if 'User' in tags:
+                    by_user.setdefault(tags['User'], []).append(instance)
+
+            self._instances = [instance for instance in instances
+                               if instance['State']['Name'] in ACTIVE_INSTANCE_STATES]
+            self._by_id, self._by_state, self._by_group, self._by_user = by_id, by_state, by_group, by_user
+            self._fetched_at = time.time()
+            logger.info(f"Fleet snapshot loaded: {len(instances)} instances")
+
+    def all(self):
+        """Instances in an active state (pending, running, stopping, stopped)."""
+        self._ensure_loaded()
+        return list(self._instances)
+
+    def get(self, instance_id):
+        """Instance by id, or None if it is not an App-tagged instance."""
+        self._ensure_loaded()
+        return self._by_id.get(instance_id)
+
+    def by_state(self, state):
+        self._ensure_loaded()
+        return list(self._by_state.get(state, []))
+
+    def by_group(self, group):
+        self._ensure_loaded()
+        return list(self._by_group.get(group, []))
+
+    def by_user(self, user):
+        self._ensure_loaded()
+        return list(self._by_user.get(user, []))
+
+
+class EventBridgeRuleIndex:
+    """
+    Set of schedule rule names (shutdown-/start-) on the default event bus.
+
+    Filled by one paginated list_rules(NamePrefix=...) sweep per prefix and
+    reused until the TTL expires or invalidate() is called, so per-instance
+    existence checks are set lookups.
+    """
+
+    def __init__(self, events_client_getter, ttl_seconds=RULE_INDEX_TTL_SECONDS):
+        self.events_client_getter = events_client_getter
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._fetched_at = None
+        self._rule_names = frozenset()
+
+    def invalidate(self):
+        """Drop the index so the next lookup re-lists the rules."""
+        with self._lock:
+            self._fetched_at = None
+
+    def rule_names(self):
+        """Current schedule rule names, refreshed when stale."""
+        if self._fetched_at is not None and time.time() - self._fetched_at < self.ttl_seconds:
+            return self._rule_names
+
+        with self._lock:
+            if self._fetched_at is None or time.time() - self._fetched_at >= self.ttl_seconds:
+                events_client = self.events_client_getter()
+                names = set()
+                for prefix in SCHEDULE_RULE_PREFIXES:
+                    paginator = events_client.get_paginator('list_rules')
+                    for page in paginator.paginate(NamePrefix=prefix):
+                        names.update(rule['Name'] for rule in page['Rules'])
+                self._rule_names = frozenset(names)
+                self._fetched_at = time.time()
+                logger.info(f"EventBridge rule index loaded: {len(names)} schedule rules")
+        return self._rule_names
+
+
+class InstanceTypeCatalog:
+    """
+    vCPU and memory specs per instance type: {type: {'vCpus': int, 'memSize': MiB}}.
+
+    Seeded from the snapshot shipped in the layer and from the /tmp cache;
+    types in neither are fetched with one batched describe_instance_types
+    call and written back to /tmp.
+    """
+
+    def __init__(self, snapshot_path=INSTANCE_TYPE_SNAPSHOT_PATH, cache_path=INSTANCE_TYPE_CACHE_PATH):
+        self.snapshot_path = snapshot_path
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._specs = None
+
+    def _load(self):
+        if self._specs is not None:
+            return
+        with self._lock:
+            if self._specs is not None:
+                return
+            specs = {}
+            for path in (self.snapshot_path, self.cache_path):
+                try:
+                    with open(path) as catalog_file:
+                        specs.update(json.load(catalog_file))
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable instance type catalog {path}: {e}")
+            self._specs = specs
+
+    def get_many(self, instance_types, ec2_client):
+        """
+        Get specs for several instance types, calling the API only for unknown ones.
+
+        Args:
+            instance_types (list): Instance type names
+            ec2_client: EC2 client used for unknown types
+
+        Returns:
+            dict: {type: {'vCpus', 'memSize'}}. Types the API could not describe are omitted.
+        """
+        self._load()
+        wanted = list(dict.fromkeys(instance_types))
+        missing = [instance_type for instance_type in wanted if instance_type not in self._specs]
+        if missing:
+            self._fetch(missing, ec2_client)
+        return {instance_type: self._specs[instance_type] for instance_type in wanted if instance_type in self._specs}
+
+    def _fetch(self, instance_types, ec2_client):
+        logger.info(f"Describing instance types not in catalog: {instance_types}")
+        fetched = {}
+        try:
+            for start in range(0, len(instance_types), DESCRIBE_TYPES_CHUNK_SIZE):
+                response = ec2_client.describe_instance_types(
+                    InstanceTypes=instance_types[start:start + DESCRIBE_TYPES_CHUNK_SIZE]
+                )
+                for info in response['InstanceTypes']:
+                    fetched[info['InstanceType']] = {
+                        'vCpus': info['VCpuInfo']['DefaultVCpus'],
+                        'memSize': info['MemoryInfo']['SizeInMiB']
+                    }
+        except ClientError as e:
+            logger.error(f"Error describing instance types {instance_types}: {e}")
+
+        if not fetched:
+            return
+        with self._lock:
+            self._specs.update(fetched)
+            self._write_cache()
+
+    def _write_cache(self):
+        try:
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as cache_file:
+                json.dump(self._specs, cache_file)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write instance type cache {self.cache_path}: {e}")
+
+
+_instance_type_catalog = InstanceTypeCatalog()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available, so
+    callers sharing one bucket stay under rate requests per second on average
+    with bursts of up to capacity.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is refilled if the bucket is empty."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            self.sleep(wait)
+
+
+# Shared by every lookup in the execution environment
+_cloudtrail_rate_limiter = TokenBucket(CLOUDTRAIL_LOOKUP_RATE)
+
+
 class Ec2Utils:
+    # Shared clients from clientHelper, created on first use
+    ec2_client = clientHelper.LazyClient('ec2')
+    ssm = clientHelper.LazyClient('ssm')
+    ct_client = clientHelper.LazyClient('cloudtrail')
+    cw_client = clientHelper.LazyClient('cloudwatch')
+    sts_client = clientHelper.LazyClient('sts')
+    events_client = clientHelper.LazyClient('events')
+
     def __init__(self):
         logger.info("------- Ec2Utils Class Initialization")
-        self.ec2_client = boto3.client('ec2')
-        self.ssm = boto3.client('ssm')        
-        self.ct_client = boto3.client('cloudtrail')        
-        self.cw_client = boto3.client('cloudwatch')
-        self.sts_client = boto3.client('sts')
-        self.account_id = self.sts_client.get_caller_identity()['Account']
+        self._account_id = None
         self.appValue = os.getenv('TAG_APP_VALUE')
         self.ec2InstanceProfileArn = os.getenv('EC2_INSTANCE_PROFILE_ARN')
+        self._core_dyn = None
+        self.fleet = FleetSnapshot(self._describe_fleet)
+        self.rule_index = EventBridgeRuleIndex(lambda: self.events_client)
+        self._instance_counts = {}
+
+    @property
+    def account_id(self):
+        """AWS account ID, resolved with one STS call on first use and memoized."""
+        if self._account_id is None:
+            self._account_id = self.sts_client.get_caller_identity()['Account']
+        return self._account_id
 
     def get_latest_ubuntu_ami(self):
         """
@@ -63,13 +490,8 @@ class Ec2Utils:
         logger.info(f"------- create_ec2_instance: {instance_name} ({instance_type})")
         
         # Validate instance type
-        supported_instance_types = [
-            't3.micro', 't3.small', 't3.medium', 
-            't3.large', 't3.xlarge', 't3.2xlarge'
-        ]
-        
-        if instance_type not in supported_instance_types:
-            logger.error(f"Unsupported instance type: {instance_type}. Supported types: {supported_instance_types}")
+        if instance_type not in SUPPORTED_INSTANCE_TYPES:
+            logger.error(f"Unsupported instance type: {instance_type}. Supported types: {SUPPORTED_INSTANCE_TYPES}")
             return None
         
         try:
@@ -150,6 +572,7 @@ class Ec2Utils:
             response = self.ec2_client.run_instances(**run_params)
             
             instance_id = response['Instances'][0]['InstanceId']
+            self.fleet.invalidate()
             logger.info(f"✓ EC2 instance created successfully: {instance_id}")
             logger.info(f"✓ Instance type: {instance_type}")
             
@@ -242,29 +665,53 @@ class Ec2Utils:
         """Check if EventBridge rules exist for the instance.
            This is a read-only check used by the ec2Discovery Lambda function
         """
-        eventbridge = boto3.client('events')
-        shutdown_rule = f"shutdown-{instance_id}"
-        start_rule = f"start-{instance_id}"
-        
+        return self.get_schedule_rules_status([instance_id])[instance_id]
+
+    def get_schedule_rules_status(self, instance_ids):
+        """
+        Schedule rule presence for many instances from the shared rule index.
+
+        Args:
+            instance_ids (list): EC2 instance IDs
+
+        Returns:
+            dict: {instance_id: {'shutdown_rule_exists': bool, 'start_rule_exists': bool}}
+        """
         try:
-            rules = eventbridge.list_rules()
-            rule_names = [rule['Name'] for rule in rules['Rules']]
-            
-            return {
-                'shutdown_rule_exists': shutdown_rule in rule_names,
-                'start_rule_exists': start_rule in rule_names
-            }
+            rule_names = self.rule_index.rule_names()
         except Exception as e:
-            logger.error(f"Error checking EventBridge rules for {instance_id}: {e}")
-            return {'shutdown_rule_exists': False, 'start_rule_exists': False}
+            logger.error(f"Error listing EventBridge rules: {e}")
+            rule_names = frozenset()
+        
+        return {
+            instance_id: {
+                'shutdown_rule_exists': f"shutdown-{instance_id}" in rule_names,
+                'start_rule_exists': f"start-{instance_id}" in rule_names
+            }
+            for instance_id in instance_ids
+        }
 
-    def get_cached_running_minutes(self, instance_id):
+    def invalidate_rule_index(self):
+        """Force the next rule check to re-list EventBridge rules (e.g. after put_rule/delete_rule)."""
+        self.rule_index.invalidate()
+
+    def _get_core_dyn(self):
+        """Lazily create one CoreTable helper per Ec2Utils instance."""
+        if self._core_dyn is None:
+            # Import ddbHelper here to avoid circular dependency
+            import ddbHelper
+            self._core_dyn = ddbHelper.CoreTableDyn()
+        return self._core_dyn
+
+    def get_cached_running_minutes(self, instance_id, core_dyn=None):
         """
         Get cached running minutes from DynamoDB.
         Falls back to real-time calculation if cache is missing.
         
         Args:
             instance_id (str): EC2 instance ID
+            core_dyn (CoreTableDyn, optional): Caller's table helper, so the
+                SERVER#<id>/METADATA read is shared with its request cache
             
         Returns:
             dict: {
@@ -275,9 +722,7 @@ class Ec2Utils:
         logger.info(f"------- get_cached_running_minutes: {instance_id}")
         
         try:
-            # Import ddbHelper here to avoid circular dependency
-            import ddbHelper
-            dyn = ddbHelper.Dyn()
+            dyn = core_dyn or self._get_core_dyn()
             
             # Get server config with cache
             config = dyn.get_server_config(instance_id)
@@ -300,104 +745,289 @@ class Ec2Utils:
             logger.warning(f"Error reading cache for {instance_id}: {e}, falling back to calculation")
         
         # Fallback to real-time calculation
-        return self.get_total_hours_running_per_month(instance_id)
+        return self.get_total_hours_running_per_month(instance_id, core_dyn)
 
-    def get_total_hours_running_per_month(self, instanceId):
+    def get_total_hours_running_per_month(self, instanceId, core_dyn=None):
         """
-        Calculate total running minutes for the current month from CloudTrail events.
-        This is an expensive operation - prefer using get_cached_running_minutes() instead.
+        Calculate total running minutes for the current month from the runtime ledger.
+        Prefer get_cached_running_minutes(); this reads the ledger, and the first
+        call for a server backfills the month from CloudTrail.
+
+        Args:
+            instanceId (str): EC2 instance ID
+            core_dyn (CoreTableDyn, optional): Caller's table helper
+
+        Returns:
+            dict: {'minutes': float, 'timestamp': None}
         """
         logger.info(f"------- get_total_hours_running_per_month {instanceId}")
 
-        total_minutes = 0
+        end_time = datetime.now(tz=timezone.utc)
+        start_time = datetime(end_time.year, end_time.month, 1, tzinfo=timezone.utc)
+
+        # Return dict with minutes and timestamp (None for real-time calculation)
+        return {
+            'minutes': self.get_running_minutes(instanceId, start_time, end_time, core_dyn),
+            'timestamp': None
+        }
+
+    def get_running_minutes(self, instance_id, start_time, end_time, core_dyn=None):
+        """
+        Sum the minutes an instance was running within [start_time, end_time).
+
+        Intervals come from the CoreTable runtime ledger that ec2StateHandler
+        appends to, so the cost is one query per call regardless of how often the
+        server was cycled. An interval still open counts up to end_time.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            start_time (datetime): Range start (timezone-aware)
+            end_time (datetime): Range end (timezone-aware)
+            core_dyn (CoreTableDyn, optional): Caller's table helper
+
+        Returns:
+            float: Running minutes, summed exactly and rounded once to 2 decimals
+        """
+        dyn = core_dyn or self._get_core_dyn()
+        try:
+            self.ensure_runtime_ledger(instance_id, start_time, dyn)
+            intervals = dyn.list_runtime_intervals(instance_id, start_time, end_time)
+        except Exception as e:
+            logger.error(f"Error reading runtime ledger for {instance_id}: {e}")
+            return 0
+
+        return summarize_runtime(intervals, start_time, end_time, buckets=False)['totalMinutes']
+
+    def get_runtime_usage(self, instance_id, start_time, end_time, tz_name=None, core_dyn=None):
+        """
+        Running minutes of an instance over any window, with daily and hourly buckets.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            start_time (datetime): Window start (timezone-aware)
+            end_time (datetime): Window end (timezone-aware)
+            tz_name (str, optional): Bucket timezone; defaults to the server's configured timezone
+            core_dyn (CoreTableDyn, optional): Caller's table helper
+
+        Returns:
+            dict: summarize_runtime() result, or None if the ledger couldn't be read
+        """
+        dyn = core_dyn or self._get_core_dyn()
+        try:
+            if tz_name is None:
+                tz_name = (dyn.get_server_config(instance_id) or {}).get('timezone', 'UTC')
+            self.ensure_runtime_ledger(instance_id, start_time, dyn)
+            intervals = dyn.list_runtime_intervals(instance_id, start_time, end_time)
+        except Exception as e:
+            logger.error(f"Error reading runtime ledger for {instance_id}: {e}")
+            return None
+
+        return summarize_runtime(intervals, start_time, end_time, tz_name)
+
+    def ensure_runtime_ledger(self, instance_id, since, core_dyn=None):
+        """
+        Backfill the runtime ledger from CloudTrail if it doesn't reach back to since.
+
+        Only the gap before the ledger's first recorded interval is filled, so
+        intervals written from state-change events are never duplicated. The
+        completeness marker is moved back only after a successful backfill.
+
+        Args:
+            instance_id (str): EC2 instance ID
+            since (datetime): Earliest time the caller needs (timezone-aware)
+            core_dyn (CoreTableDyn, optional): Caller's table helper
+
+        Returns:
+            bool: True if the ledger covers since
+        """
+        dyn = core_dyn or self._get_core_dyn()
+        window = self._runtime_backfill_window(instance_id, since, dyn)
+        if window is None:
+            return True
+
+        cutoff, leave_open = window
+        if cutoff > since:
+            logger.info(f"Backfilling runtime ledger for {instance_id} from {since.isoformat()} to {cutoff.isoformat()}")
+            intervals = self._runtime_intervals_from_cloudtrail(instance_id, since, cutoff, leave_open)
+            if intervals is None:
+                return False
+            dyn.put_runtime_intervals(instance_id, intervals)
+
+        dyn.set_runtime_ledger_since(instance_id, since)
+        return True
+
+    def backfill_runtime_ledgers(self, instances, since, core_dyn=None):
+        """
+        Backfill the runtime ledgers of many instances with one CloudTrail pass.
+
+        Instead of one ResourceName lookup per instance, the window is scanned
+        once per event name (RunInstances, StartInstances, StopInstances) and
+        each event is fanned out to the instances it touched.
+
+        Args:
+            instances (list): Instance dicts from describe_instances (InstanceId, State)
+            since (datetime): Earliest time the ledgers must cover (timezone-aware)
+            core_dyn (CoreTableDyn, optional): Caller's table helper
+
+        Returns:
+            dict: {instance_id: True if its ledger now covers since}
+        """
+        dyn = core_dyn or self._get_core_dyn()
+        results = {}
+        windows = {}
+        for instance in instances:
+            instance_id = instance['InstanceId']
+            window = self._runtime_backfill_window(instance_id, since, dyn)
+            if window is None:
+                results[instance_id] = True
+            elif window[0] > since:
+                windows[instance_id] = window
+            else:
+                # Events already cover the whole window
+                dyn.set_runtime_ledger_since(instance_id, since)
+                results[instance_id] = True
+
+        if not windows:
+            return results
+
+        end_time = max(cutoff for cutoff, _ in windows.values())
+        logger.info(f"Backfilling runtime ledgers for {len(windows)} instances from {since.isoformat()} to {end_time.isoformat()}")
+        timelines = self.scan_runtime_transitions(list(windows), since, end_time)
+        if timelines is None:
+            results.update({instance_id: False for instance_id in windows})
+            return results
+
+        states = {instance['InstanceId']: instance.get('State', {}).get('Name') for instance in instances}
+        for instance_id, (cutoff, leave_open) in windows.items():
+            cutoff_ts = dyn.runtime_timestamp(cutoff)
+            points = [point for point in timelines.get(instance_id, []) if dyn.runtime_timestamp(point['x']) < cutoff_ts]
+            intervals = pair_runtime_transitions(points, cutoff, states.get(instance_id), leave_open)
+            try:
+                dyn.put_runtime_intervals(instance_id, intervals)
+                dyn.set_runtime_ledger_since(instance_id, since)
+                results[instance_id] = True
+            except Exception as e:
+                logger.error(f"Error writing runtime ledger for {instance_id}: {e}")
+                results[instance_id] = False
+        return results
+
+    def _runtime_backfill_window(self, instance_id, since, dyn):
+        """
+        Work out which part of [since, now) the ledger is missing.
+
+        Returns:
+            tuple: (cutoff, leave_open) - backfill [since, cutoff), leaving a trailing
+                interval open only if nothing is recorded after it - or None if complete
+        """
+        ledger_since = dyn.get_runtime_ledger_since(instance_id)
+        if ledger_since and ledger_since <= dyn.runtime_timestamp(since):
+            return None
+
+        cutoff = _parse_timestamp(ledger_since) if ledger_since else datetime.now(tz=timezone.utc)
+        recorded = dyn.list_runtime_intervals(instance_id, since, cutoff)
+        if recorded:
+            cutoff = min(cutoff, _parse_timestamp(recorded[0]['startedAt']))
+        return cutoff, not recorded
+
+    def _lookup_events(self, lookup_attribute, start_time, end_time, max_items=None):
+        """
+        Yield CloudTrail events for one lookup attribute, page by page.
+
+        Every LookupEvents request takes a token from the shared rate limiter so
+        concurrent scans stay under the CloudTrail throttle.
+        """
+        request = {
+            'LookupAttributes': [lookup_attribute],
+            'StartTime': start_time,
+            'EndTime': end_time,
+            'MaxResults': 50
+        }
+        returned = 0
+        while True:
+            _cloudtrail_rate_limiter.acquire()
+            response = self.ct_client.lookup_events(**request)
+            for event in response.get('Events', []):
+                yield event
+                returned += 1
+                if max_items and returned >= max_items:
+                    return
+            if not response.get('NextToken'):
+                return
+            request['NextToken'] = response['NextToken']
+
+    def scan_runtime_transitions(self, instance_ids, start_time, end_time):
+        """
+        Collect start/stop transitions for many instances from CloudTrail.
+
+        One lookup per event name covers the whole window; each CloudTrailEvent
+        is parsed once and its instancesSet fanned out to per-instance timelines.
+
+        Args:
+            instance_ids (list): Instances to keep
+            start_time (datetime): Window start
+            end_time (datetime): Window end
+
+        Returns:
+            dict: {instance_id: [{'s': 'StartInstances'|'StopInstances', 'x': eventTime}]}
+                sorted by time, or None if CloudTrail failed
+        """
+        wanted = set(instance_ids)
+        timelines = {instance_id: [] for instance_id in instance_ids}
+        try:
+            for event_name in RUNTIME_EVENT_NAMES:
+                for event in self._lookup_events({'AttributeKey': 'EventName', 'AttributeValue': event_name},
+                                                 start_time, end_time):
+                    ct_event = json.loads(event['CloudTrailEvent'])
+                    for instance_id, kind, event_time in _runtime_transitions(event_name, ct_event, wanted):
+                        timelines[instance_id].append({'s': kind, 'x': event_time})
+        except Exception as e:
+            logger.error(f"Error scanning CloudTrail events: {e}")
+            return None
+
+        for points in timelines.values():
+            points.sort(key=lambda k: k['x'])
+        return timelines
+
+    def _runtime_intervals_from_cloudtrail(self, instance_id, start_time, end_time, leave_open=True):
+        """
+        Rebuild running intervals for one instance from CloudTrail events.
+
+        Intervals are clipped to end_time. A trailing start without a stop is
+        kept open only when leave_open is set and the instance is running now.
+
+        Returns:
+            list: {'startedAt', 'stoppedAt'} dicts, or None if CloudTrail failed
+        """
         event_data = []
 
         # Get current instance state to handle running instances
         try:
-            instance_response = self.ec2_client.describe_instances(InstanceIds=[instanceId])
+            instance_response = self.ec2_client.describe_instances(InstanceIds=[instance_id])
             current_state = instance_response['Reservations'][0]['Instances'][0]['State']['Name']
         except Exception as e:
             logger.error(f"Error getting instance state: {e}")
             current_state = None
 
-        paginator = self.ct_client.get_paginator('lookup_events')
-        start_time = datetime(datetime.now().year, datetime.now().month, 1, tzinfo=timezone.utc)
-        end_time = datetime.now(tz=timezone.utc)
-
-        # Limit to relevant event names only
-        event_names = ['RunInstances', 'StartInstances', 'StopInstances']
-        
         try:
-            for page in paginator.paginate(
-                LookupAttributes=[{'AttributeKey': 'ResourceName', 'AttributeValue': instanceId}],
-                StartTime=start_time,
-                EndTime=end_time,
-                PaginationConfig={'MaxItems': 1000}  # Limit total items to prevent excessive API calls
-            ):
-                for event in page['Events']:
-                    event_name = event['EventName']
-                    
-                    # Skip irrelevant events early
-                    if event_name not in event_names:
-                        continue
-                    
-                    # Parse CloudTrail event once
-                    ct_event = json.loads(event['CloudTrailEvent'])
-                    event_time = ct_event['eventTime']
-                    
-                    if event_name == "RunInstances":
-                        event_data.append({'s': 'StartInstances', 'x': event_time})
-                    elif event_name == "StartInstances":
-                        # Check if this was a transition from stopped state
-                        response_elements = ct_event.get('responseElements', {})
-                        instances_set = response_elements.get('instancesSet', {})
-                        items = instances_set.get('items', [])
-                        
-                        for item in items:
-                            if (item.get('instanceId') == instanceId and 
-                                item.get('previousState', {}).get('name') == 'stopped'):
-                                event_data.append({'s': 'StartInstances', 'x': event_time})
-                                break
-                                
-                    elif event_name == "StopInstances":
-                        # Check if this was a transition from running state
-                        response_elements = ct_event.get('responseElements', {})
-                        instances_set = response_elements.get('instancesSet', {})
-                        items = instances_set.get('items', [])
-                        
-                        for item in items:
-                            if (item.get('instanceId') == instanceId and 
-                                item.get('previousState', {}).get('name') == 'running'):
-                                event_data.append({'s': 'StopInstances', 'x': event_time})
-                                break
+            for event in self._lookup_events({'AttributeKey': 'ResourceName', 'AttributeValue': instance_id},
+                                             start_time, end_time, max_items=1000):
+                event_name = event['EventName']
+                
+                # Skip irrelevant events early
+                if event_name not in RUNTIME_EVENT_NAMES:
+                    continue
+                
+                # Parse CloudTrail event once
+                ct_event = json.loads(event['CloudTrailEvent'])
+                for _, kind, event_time in _runtime_transitions(event_name, ct_event, {instance_id}):
+                    event_data.append({'s': kind, 'x': event_time})
         except Exception as e:
             logger.error(f"Error fetching CloudTrail events: {e}")
-            return {'minutes': 0, 'timestamp': None}
+            return None
 
         # Sort events chronologically
         data_points = sorted(event_data, key=lambda k: k['x'])
-
-        # Calculate runtime from event pairs
-        start_event = None
-        for point in data_points:
-            if point['s'] == "StartInstances":
-                start_event = datetime.fromisoformat(point['x'].replace("Z", "+00:00"))
-            elif point['s'] == "StopInstances" and start_event:
-                stop_event = datetime.fromisoformat(point['x'].replace("Z", "+00:00"))
-                delta = stop_event - start_event
-                total_minutes += round(delta.total_seconds() / 60, 2)
-                start_event = None
-
-        # Handle case where instance is currently running
-        if start_event and current_state == 'running':
-            delta = end_time - start_event
-            total_minutes += round(delta.total_seconds() / 60, 2)
-
-        # Return dict with minutes and timestamp (None for real-time calculation)
-        return {
-            'minutes': total_minutes,
-            'timestamp': None
-        }
+        return pair_runtime_transitions(data_points, end_time, current_state, leave_open)
 
     def extract_state_event_time(self, evt, previous_state, instance_id):
         logger.info(f"------- extract_state_event_time {instance_id}")
@@ -417,20 +1047,10 @@ class Ec2Utils:
         return None
     
     def list_instances_by_user_group(self, user_groups):
-        user_instances = []
-        for group_name in user_groups:
-            # check if group_name starts with i- (instance_id)
-            if not group_name.startswith("i-"):
-                continue
-
-            logger.info(f"Processing group: {group_name}")
-            response = self.ec2_client.describe_instances(InstanceIds=[group_name])
-            logger.info(response)
-            if not response["Reservations"]:
-                continue
-            else:
-                reservations = response["Reservations"]
-                user_instances.extend([user_instances for reservation in reservations for user_instances in reservation["Instances"]])
+        # Groups named after an instance ID grant access to that instance
+        instance_ids = [group_name for group_name in user_groups if group_name.startswith("i-")]
+        logger.info(f"Processing groups: {instance_ids}")
+        user_instances = self.describe_instances_by_ids(instance_ids)
 
         # Get the total number of instances
         total_instances = len(user_instances)
@@ -442,6 +1062,84 @@ class Ec2Utils:
             "Instances": user_instances,
             "TotalInstances": total_instances
         }
+
+    def describe_instances_by_ids(self, instance_ids, app_tag_value=None):
+        """
+        Describe many instances by ID with as few calls as possible.
+
+        IDs are de-duplicated and sent DESCRIBE_IDS_CHUNK_SIZE at a time. A batch
+        rejected because one ID is unknown or malformed is bisected until the bad
+        IDs are isolated and skipped, so they don't hide the rest.
+
+        Args:
+            instance_ids (list): Instance IDs, in the order results should follow
+            app_tag_value (str, optional): Only keep instances with this App tag
+
+        Returns:
+            list: Instance dicts, in input order, without missing IDs
+        """
+        unique_ids = list(dict.fromkeys(instance_id for instance_id in instance_ids if instance_id))
+        found = {}
+        for start in range(0, len(unique_ids), DESCRIBE_IDS_CHUNK_SIZE):
+            for instance in self._describe_id_batch(unique_ids[start:start + DESCRIBE_IDS_CHUNK_SIZE]):
+                found[instance['InstanceId']] = instance
+
+        instances = []
+        for instance_id in unique_ids:
+            instance = found.get(instance_id)
+            if instance is None:
+                continue
+            if app_tag_value is not None:
+                app_tag = next((tag['Value'] for tag in instance.get('Tags', []) if tag['Key'] == 'App'), None)
+                if app_tag != app_tag_value:
+                    logger.warning(f"Instance {instance_id} does not have App={app_tag_value} tag")
+                    continue
+            instances.append(instance)
+        return instances
+
+    def _describe_id_batch(self, instance_ids):
+        def describe(batch):
+            response = self.ec2_client.describe_instances(InstanceIds=batch)
+            return [instance for reservation in response["Reservations"] for instance in reservation["Instances"]]
+
+        return self._describe_isolating_bad_ids(describe, instance_ids, INSTANCE_ID_ERROR_CODES)
+
+    def describe_volume_sizes(self, volume_ids):
+        """
+        Get EBS volume sizes with one describe_volumes call per 500 volumes.
+        Unknown volume IDs are bisected out of their batch and skipped.
+
+        Args:
+            volume_ids (list): EBS volume IDs
+
+        Returns:
+            dict: {volume_id: size in GiB}
+        """
+        def describe(batch):
+            return self.ec2_client.describe_volumes(VolumeIds=batch)['Volumes']
+
+        unique_ids = list(dict.fromkeys(volume_id for volume_id in volume_ids if volume_id))
+        sizes = {}
+        for start in range(0, len(unique_ids), DESCRIBE_VOLUMES_CHUNK_SIZE):
+            batch = unique_ids[start:start + DESCRIBE_VOLUMES_CHUNK_SIZE]
+            for volume in self._describe_isolating_bad_ids(describe, batch, VOLUME_ID_ERROR_CODES):
+                sizes[volume['VolumeId']] = volume['Size']
+        return sizes
+
+    def _describe_isolating_bad_ids(self, describe, ids, error_codes):
+        """Call describe(ids); on a per-ID error, bisect until the bad IDs are isolated and dropped."""
+        try:
+            return describe(ids)
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code')
+            if error_code not in error_codes:
+                raise
+            if len(ids) == 1:
+                logger.warning(f"Skipping {ids[0]}: {error_code}")
+                return []
+            middle = len(ids) // 2
+            return (self._describe_isolating_bad_ids(describe, ids[:middle], error_codes)
+                    + self._describe_isolating_bad_ids(describe, ids[middle:], error_codes))
         
     def list_instances_by_app_tag(self, app_tag_value):
         """
@@ -455,16 +1153,14 @@ class Ec2Utils:
         """
         logger.info(f"Listing instances by app tag: {app_tag_value}")
         
-        filters = [
-            {"Name": "tag:App", "Values": [app_tag_value]},
-            {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]}
-        ]
-        
-        response = self.ec2_client.describe_instances(Filters=filters)
-        
-        instances = []
-        for reservation in response["Reservations"]:
-            instances.extend(reservation["Instances"])
+        if app_tag_value == self.appValue:
+            instances = self.fleet.all()
+        else:
+            filters = [
+                {"Name": "tag:App", "Values": [app_tag_value]},
+                {"Name": "instance-state-name", "Values": list(ACTIVE_INSTANCE_STATES)}
+            ]
+            instances = self._describe_all_instances(filters)
             
         total_instances = len(instances)
         logger.info(f"Found {total_instances} instances with App tag: {app_tag_value}")
@@ -486,49 +1182,37 @@ class Ec2Utils:
         }
 
     def list_servers_by_user(self, email, page=1, results_per_page=10):
-        filters = [
-            {"Name": "tag:App", "Values": [self.appValue]},
-            {"Name":"instance-state-name", "Values":["pending","running","stopping","stopped"]},
-            {"Name": "tag:User", "Values": [email]}
-        ]
+        return self._page_of(self.fleet.by_user(email), page, results_per_page)
 
-        return self.paginate_instances(filters, page, results_per_page)
+    def list_servers_by_state(self, state, page=1, results_per_page=10, cursor=None):
+        if state not in FLEET_SNAPSHOT_STATES:
+            return self.paginate_instances(self._fleet_filters([state]), page, results_per_page, cursor=cursor)
 
-    def list_servers_by_state(self, state, page=1, results_per_page=10):
-        filters = [
-            {"Name": "tag:App", "Values": [self.appValue]},
-            {"Name": "instance-state-name", "Values": [state]}
-        ]
-
-        return self.paginate_instances(filters, page, results_per_page)
+        return self._page_of(self.fleet.by_state(state), page, results_per_page)
 
     def list_servers_by_group(self, group, page=1, results_per_page=10):
-        filters = [
-            {"Name": "tag:App", "Values": [self.appValue]},
-            {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]},
-            {"Name": "tag:Group", "Values": [group]}
-        ]
-
-        return self.paginate_instances(filters, page, results_per_page)
+        return self._page_of(self.fleet.by_group(group), page, results_per_page)
 
     def list_all_servers(self, page=1, results_per_page=10):
-        filters = [
-            {"Name": "tag:App", "Values": [self.appValue]},
-            {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]}
-        ]
+        return self._page_of(self.fleet.all(), page, results_per_page)
+
+    def invalidate_fleet_snapshot(self):
+        """Force the next list_* call to re-describe the fleet (e.g. after a state change)."""
+        self.fleet.invalidate()
 
-        return self.paginate_instances(filters, page, results_per_page)
+    def _describe_fleet(self):
+        """Loader for the fleet snapshot: every App-tagged, non-terminated instance."""
+        return self._describe_all_instances(self._fleet_filters(FLEET_SNAPSHOT_STATES))
 
-    def paginate_instances(self, filters, page=1, results_per_page=10):
+    def _describe_all_instances(self, filters):
         instances = []
         next_token = None
-        logger.info(f"paginate_instances filter: {filters}")
 
         while True:
+            params = {"Filters": filters, "MaxResults": EC2_MAX_PAGE_SIZE}
             if next_token:
-                response = self.ec2_client.describe_instances(Filters=filters, NextToken=next_token)
-            else:
-                response = self.ec2_client.describe_instances(Filters=filters)
+                params["NextToken"] = next_token
+            response = self.ec2_client.describe_instances(**params)
 
             reservations = response["Reservations"]
             instances.extend([instance for reservation in reservations for instance in reservation["Instances"]])
@@ -536,6 +1220,9 @@ class Ec2Utils:
             if not next_token:
                 break
 
+        return instances
+
+    def _page_of(self, instances, page=1, results_per_page=10):
         if not instances:
             logger.info("No instances found")
             return {
@@ -557,6 +1244,117 @@ class Ec2Utils:
             "TotalInstances": total_instances
         }
 
+    def paginate_instances(self, filters, page=1, results_per_page=10, cursor=None, include_total=True):
+        """
+        Fetch one page of instances matching the filters, passing MaxResults and
+        NextToken through to EC2 instead of describing everything and slicing.
+
+        Args:
+            filters (list): describe_instances filters
+            page (int): 1-based page number, used only when no cursor is given.
+                Reaching page N walks N-1 pages; prefer cursors.
+            results_per_page (int): Page size. EC2 filters after paging, so the
+                page may run up to EC2_MIN_PAGE_SIZE - 1 instances over.
+            cursor (str, optional): NextCursor from the previous page
+            include_total (bool): Add TotalInstances from count_instances (cached)
+
+        Returns:
+            dict: {"Instances": [...], "NextCursor": str or None, "TotalInstances": int}
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for other filters
+        """
+        logger.info(f"paginate_instances filter: {filters}")
+        next_token = self._decode_instance_cursor(cursor, filters)
+        pages_to_skip = 0 if cursor else max(0, page - 1)
+
+        for index in range(pages_to_skip + 1):
+            instances, next_token = self._describe_page(filters, results_per_page, next_token)
+            if not next_token and index < pages_to_skip:
+                # Requested page is past the end
+                instances = []
+                break
+
+        result = {
+            "Instances": instances,
+            "NextCursor": self._encode_instance_cursor(next_token, filters)
+        }
+        if include_total:
+            result["TotalInstances"] = self.count_instances(filters)
+        return result
+
+    def count_instances(self, filters):
+        """
+        Count instances matching the filters. Counts for the App-tagged fleet come
+        from the fleet snapshot; other filter sets are counted once and cached for
+        FLEET_SNAPSHOT_TTL_SECONDS.
+        """
+        key = self._filters_fingerprint(filters)
+        if key == self._filters_fingerprint(self._fleet_filters(list(ACTIVE_INSTANCE_STATES))):
+            return len(self.fleet.all())
+
+        cached = self._instance_counts.get(key)
+        if cached and time.time() - cached[1] < FLEET_SNAPSHOT_TTL_SECONDS:
+            return cached[0]
+
+        total = len(self._describe_all_instances(filters))
+        self._instance_counts[key] = (total, time.time())
+        return total
+
+    def _describe_page(self, filters, results_per_page, next_token=None):
+        """Describe until results_per_page instances are collected or EC2 runs out."""
+        instances = []
+        while True:
+            remaining = results_per_page - len(instances)
+            params = {
+                "Filters": filters,
+                "MaxResults": max(EC2_MIN_PAGE_SIZE, min(remaining, EC2_MAX_PAGE_SIZE))
+            }
+            if next_token:
+                params["NextToken"] = next_token
+            response = self.ec2_client.describe_instances(**params)
+
+            instances.extend([instance for reservation in response["Reservations"]
+                              for instance in reservation["Instances"]])
+            next_token = response.get("NextToken")
+            if not next_token or len(instances) >= results_per_page:
+                return instances, next_token
+
+    def _fleet_filters(self, states):
+        return [
+            {"Name": "tag:App", "Values": [self.appValue]},
+            {"Name": "instance-state-name", "Values": states}
+        ]
+
+    @staticmethod
+    def _filters_fingerprint(filters):
+        payload = json.dumps(filters, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def _encode_instance_cursor(cls, next_token, filters):
+        """Wrap an EC2 NextToken in an opaque cursor bound to its filters."""
+        if not next_token:
+            return None
+        payload = json.dumps({'t': next_token, 'f': cls._filters_fingerprint(filters)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    @classmethod
+    def _decode_instance_cursor(cls, cursor, filters):
+        """Unwrap a cursor into an EC2 NextToken, rejecting cursors from other queries."""
+        if not cursor:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        except (ValueError, TypeError, UnicodeError):
+            raise ValueError("Invalid pagination cursor")
+
+        if (not isinstance(payload, dict)
+                or not isinstance(payload.get('t'), str)
+                or payload.get('f') != cls._filters_fingerprint(filters)):
+            raise ValueError("Invalid pagination cursor")
+        return payload['t']
+
     def describe_iam_profile(self, instance_id, status, association_id=None):
         logger.info(f"------- describe_iam_profile: {instance_id} - {status}")
 
@@ -587,28 +1385,92 @@ class Ec2Utils:
                  
     def describe_instance_status(self, instance_id):
         logger.info(f"------- describe_instance_status: {instance_id}") 
-        iamStatus = 'fail'
-        initStatus = 'fail'
 
         statusRsp = self.ec2_client.describe_instance_status(InstanceIds=[instance_id])
+        status = statusRsp["InstanceStatuses"][0] if statusRsp["InstanceStatuses"] else None
+
+        # Check IAM profile regardless of instance state
+        iamProfile = self.describe_iam_profile(instance_id,"associated")
+        
+        return self._build_instance_status(instance_id, status, iamProfile['Arn'] if iamProfile else None)
+
+    def describe_instance_statuses(self, instance_ids=None):
+        """
+        Fleet-wide variant of describe_instance_status.
+
+        Without instance_ids, reads every instance status (IncludeAllInstances,
+        paginated) and every associated IAM instance profile in one filtered sweep.
+        With instance_ids, both calls are narrowed to those instances, 100 IDs
+        per call, so asking about a few servers doesn't scan the account. The two
+        are joined in memory instead of making two calls per instance.
+
+        Args:
+            instance_ids (list, optional): Limit the result to these instances
+
+        Returns:
+            dict: {instanceId: {'instanceId', 'initStatus', 'iamStatus'}}. Requested
+                instances EC2 did not report get 'fail' for both.
+        """
+        logger.info("------- describe_instance_statuses")
 
-        if not statusRsp["InstanceStatuses"]:
-            instanceStatus =  "fail" 
-            systemStatus = "fail" 
+        associated = {'Name': 'state', 'Values': ['associated']}
+        statuses = {}
+        profile_arns = {}
+
+        if instance_ids is None:
+            paginator = self.ec2_client.get_paginator('describe_instance_status')
+            for page in paginator.paginate(IncludeAllInstances=True, PaginationConfig={'PageSize': EC2_MAX_PAGE_SIZE}):
+                for status in page['InstanceStatuses']:
+                    statuses[status['InstanceId']] = status
+            profile_arns = self._associated_profile_arns([associated])
+            instance_ids = statuses.keys()
         else:
-            instanceStatus = statusRsp["InstanceStatuses"][0]["InstanceStatus"]["Status"]
-            systemStatus = statusRsp["InstanceStatuses"][0]["SystemStatus"]["Status"]
+            def describe(batch):
+                return self.ec2_client.describe_instance_status(InstanceIds=batch, IncludeAllInstances=True)['InstanceStatuses']
+
+            unique_ids = list(dict.fromkeys(instance_id for instance_id in instance_ids if instance_id))
+            for start in range(0, len(unique_ids), DESCRIBE_STATUS_CHUNK_SIZE):
+                batch = unique_ids[start:start + DESCRIBE_STATUS_CHUNK_SIZE]
+                for status in self._describe_isolating_bad_ids(describe, batch, INSTANCE_ID_ERROR_CODES):
+                    statuses[status['InstanceId']] = status
+                profile_arns.update(self._associated_profile_arns([associated, {'Name': 'instance-id', 'Values': batch}]))
+
+        return {
+            instance_id: self._build_instance_status(instance_id, statuses.get(instance_id), profile_arns.get(instance_id))
+            for instance_id in instance_ids
+        }
 
-        if instanceStatus == 'ok' and systemStatus == 'ok':
+    def _associated_profile_arns(self, filters):
+        """Map instance ID to IAM instance profile ARN for associations matching filters."""
+        profile_arns = {}
+        paginator = self.ec2_client.get_paginator('describe_iam_instance_profile_associations')
+        for page in paginator.paginate(Filters=filters):
+            for association in page['IamInstanceProfileAssociations']:
+                profile_arns[association['InstanceId']] = association['IamInstanceProfile']['Arn']
+        return profile_arns
+
+    def _build_instance_status(self, instance_id, status, profile_arn):
+        initStatus = 'fail'
+        iamStatus = 'fail'
+
+        # Stopped instances report 'not-applicable' and count as not initialized
+        if status and status["InstanceStatus"]["Status"] == 'ok' and status["SystemStatus"]["Status"] == 'ok':
             initStatus = 'ok'
-        
-        # Check IAM profile regardless of instance state
-        iamProfile = self.describe_iam_profile(instance_id,"associated")
-        if iamProfile is not None and iamProfile['Arn'] == self.ec2InstanceProfileArn:
+
+        if profile_arn is not None and profile_arn == self.ec2InstanceProfileArn:
             iamStatus = 'ok'
-        
+
         return { 'instanceId': instance_id, 'initStatus': initStatus, 'iamStatus': iamStatus }
 
+    def get_instance_type_specs(self, instance_types):
+        """
+        vCPU and memory for instance types from the shared catalog.
+
+        Returns:
+            dict: {type: {'vCpus': int, 'memSize': int (MiB)}}
+        """
+        return _instance_type_catalog.get_many(instance_types, self.ec2_client)
+
     def describe_instance_attribute(self, instance_id, attribute):
         logger.info(f"------- describe_instance_attributes: {instance_id}")
         return self.ec2_client.describe_instance_attribute(
@@ -640,6 +1502,7 @@ class Ec2Utils:
                     }
                 ]
             )
+            self.fleet.invalidate()
             logger.info(f"Successfully updated Name tag for instance {instance_id} to '{new_name}'")
             return True
             
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Unit tests for multi-ID describe_instances in ec2Helper.py
+Tests chunking, NotFound bisection, App-tag filtering, user-group listings and volume sizes.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+from botocore.exceptions import ClientError
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ec2Helper import Ec2Utils
+
+
+def _instance(instance_id, app='test-app'):
+    return {'InstanceId': instance_id, 'Tags': [{'Key': 'App', 'Value': app}]}
+
+
+def _not_found():
+    return ClientError({'Error': {'Code': 'InvalidInstanceID.NotFound', 'Message': 'not found'}}, 'DescribeInstances')
+
+
+class TestDescribeInstancesByIds(unittest.TestCase):
+    """Test suite for Ec2Utils.describe_instances_by_ids"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_ec2_client = Mock()
+        self.ec2_utils = Ec2Utils()
+        self.ec2_utils.ec2_client = self.mock_ec2_client
+        self.missing = set()
+
+        def describe(InstanceIds):
+            if self.missing & set(InstanceIds):
+                raise _not_found()
+            return {'Reservations': [{'Instances': [_instance(iid) for iid in InstanceIds]}]}
+
+        self.mock_ec2_client.describe_instances.side_effect = describe
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_thirty_servers_cost_one_call(self):
+        """Test that IDs are packed into a single call and keep input order"""
+        instance_ids = [f'i-{n:03d}' for n in range(30)]
+
+        instances = self.ec2_utils.describe_instances_by_ids(list(reversed(instance_ids)) + ['i-000'])
+
+        self.assertEqual(self.mock_ec2_client.describe_instances.call_count, 1)
+        self.assertEqual([i['InstanceId'] for i in instances], list(reversed(instance_ids)))
+
+    def test_ids_are_chunked_by_1000(self):
+        """Test that large membership lists are split across calls"""
+        self.ec2_utils.describe_instances_by_ids([f'i-{n}' for n in range(2500)])
+
+        chunk_sizes = [len(call.kwargs['InstanceIds']) for call in self.mock_ec2_client.describe_instances.call_args_list]
+        self.assertEqual(chunk_sizes, [1000, 1000, 500])
+
+    def test_missing_ids_are_bisected_out(self):
+        """Test that a deleted instance doesn't fail the whole batch"""
+        self.missing = {'i-5'}
+
+        instances = self.ec2_utils.describe_instances_by_ids([f'i-{n}' for n in range(8)])
+
+        self.assertEqual([i['InstanceId'] for i in instances], ['i-0', 'i-1', 'i-2', 'i-3', 'i-4', 'i-6', 'i-7'])
+        self.assertLess(self.mock_ec2_client.describe_instances.call_count, 8)
+
+    def test_app_tag_is_checked_in_the_same_pass(self):
+        """Test that instances from another app are dropped"""
+        self.mock_ec2_client.describe_instances.side_effect = None
+        self.mock_ec2_client.describe_instances.return_value = {
+            'Reservations': [{'Instances': [_instance('i-1'), _instance('i-2', app='other-app')]}]
+        }
+
+        instances = self.ec2_utils.describe_instances_by_ids(['i-1', 'i-2'], app_tag_value='test-app')
+
+        self.assertEqual([i['InstanceId'] for i in instances], ['i-1'])
+
+    def test_user_group_listing_uses_instance_groups_only(self):
+        """Test that only i- group names are described, in one call"""
+        result = self.ec2_utils.list_instances_by_user_group(['admins', 'i-1', 'i-2'])
+
+        self.assertEqual(result['TotalInstances'], 2)
+        self.mock_ec2_client.describe_instances.assert_called_once_with(InstanceIds=['i-1', 'i-2'])
+
+
+class TestDescribeVolumeSizes(unittest.TestCase):
+    """Test suite for Ec2Utils.describe_volume_sizes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_ec2_client = Mock()
+        self.ec2_utils = Ec2Utils()
+        self.ec2_utils.ec2_client = self.mock_ec2_client
+
+        def describe_volumes(VolumeIds):
+            if 'vol-gone' in VolumeIds:
+                raise ClientError({'Error': {'Code': 'InvalidVolume.NotFound', 'Message': 'gone'}}, 'DescribeVolumes')
+            return {'Volumes': [{'VolumeId': volume_id, 'Size': 30} for volume_id in VolumeIds]}
+
+        self.mock_ec2_client.describe_volumes.side_effect = describe_volumes
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_volumes_are_chunked_by_500(self):
+        """Test that 1,200 volumes cost three calls"""
+        sizes = self.ec2_utils.describe_volume_sizes([f'vol-{n}' for n in range(1200)])
+
+        self.assertEqual(len(sizes), 1200)
+        chunk_sizes = [len(call.kwargs['VolumeIds']) for call in self.mock_ec2_client.describe_volumes.call_args_list]
+        self.assertEqual(chunk_sizes, [500, 500, 200])
+
+    def test_deleted_volume_is_skipped(self):
+        """Test that one missing volume doesn't hide the others"""
+        sizes = self.ec2_utils.describe_volume_sizes(['vol-1', 'vol-gone', 'vol-2'])
+
+        self.assertEqual(sizes, {'vol-1': 30, 'vol-2': 30})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the multi-instance CloudTrail backfill in ec2Helper.py
+Tests the per-event-name scan, instancesSet fan-out, bulk ledger writes and the token bucket.
+"""
+import sys
+import os
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+sys.path.insert(0, '../ddbHelper')
+import clientHelper
+from ddbHelper import CoreTableDyn
+from ec2Helper import Ec2Utils, TokenBucket
+
+MARCH = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _cloudtrail(event_name, event_time, instances):
+    items = [{'instanceId': instance_id, 'previousState': {'name': previous_state}}
+             for instance_id, previous_state in instances]
+    detail = {'eventTime': event_time, 'responseElements': {'instancesSet': {'items': items}}}
+    return {'EventName': event_name, 'CloudTrailEvent': json.dumps(detail)}
+
+
+class TestCloudTrailBackfill(unittest.TestCase):
+    """Test suite for Ec2Utils.scan_runtime_transitions and backfill_runtime_ledgers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+        self.limiter_patcher = patch('ec2Helper._cloudtrail_rate_limiter')
+        self.mock_limiter = self.limiter_patcher.start()
+
+        self.events = {
+            'RunInstances': [{'Events': [_cloudtrail('RunInstances', '2024-03-02T08:00:00Z', [('i-3', 'pending')])]}],
+            'StartInstances': [
+                {'Events': [_cloudtrail('StartInstances', '2024-03-03T10:00:00Z', [('i-1', 'stopped'), ('i-2', 'stopped')])],
+                 'NextToken': 'page-2'},
+                {'Events': [_cloudtrail('StartInstances', '2024-03-04T10:00:00Z', [('i-1', 'running'), ('i-other', 'stopped')])]}
+            ],
+            'StopInstances': [{'Events': [_cloudtrail('StopInstances', '2024-03-03T12:00:00Z', [('i-1', 'running'), ('i-2', 'running')]),
+                                          _cloudtrail('StopInstances', '2024-03-03T11:00:00Z', [('i-3', 'running')])]}]
+        }
+
+        def lookup_events(LookupAttributes, NextToken=None, **kwargs):
+            pages = self.events[LookupAttributes[0]['AttributeValue']]
+            return pages[1] if NextToken else pages[0]
+
+        self.mock_ct_client = Mock()
+        self.mock_ct_client.lookup_events.side_effect = lookup_events
+
+        self.mock_dyn = Mock()
+        self.mock_dyn.runtime_timestamp.side_effect = CoreTableDyn.runtime_timestamp
+        self.mock_dyn.get_runtime_ledger_since.return_value = None
+        self.mock_dyn.list_runtime_intervals.return_value = []
+
+        self.ec2_utils = Ec2Utils()
+        self.ec2_utils.ct_client = self.mock_ct_client
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.limiter_patcher.stop()
+        self.patcher.stop()
+
+    def test_one_scan_per_event_name(self):
+        """Test that events are fanned out to every instance they name"""
+        timelines = self.ec2_utils.scan_runtime_transitions(['i-1', 'i-2', 'i-3'], MARCH, datetime.now(timezone.utc))
+
+        self.assertEqual(timelines['i-1'], [{'s': 'StartInstances', 'x': '2024-03-03T10:00:00Z'},
+                                            {'s': 'StopInstances', 'x': '2024-03-03T12:00:00Z'}])
+        self.assertEqual([p['s'] for p in timelines['i-3']], ['StartInstances', 'StopInstances'])
+        self.assertNotIn('i-other', timelines)
+
+        attributes = [call.kwargs['LookupAttributes'][0] for call in self.mock_ct_client.lookup_events.call_args_list]
+        self.assertEqual({a['AttributeKey'] for a in attributes}, {'EventName'})
+        self.assertEqual(len(attributes), 4)
+        self.assertEqual(self.mock_limiter.acquire.call_count, 4)
+
+    def test_bulk_backfill_writes_each_ledger(self):
+        """Test that every instance's ledger is filled from the shared scan"""
+        instances = [{'InstanceId': iid, 'State': {'Name': 'stopped'}} for iid in ('i-1', 'i-2', 'i-3')]
+
+        results = self.ec2_utils.backfill_runtime_ledgers(instances, MARCH, core_dyn=self.mock_dyn)
+
+        self.assertEqual(results, {'i-1': True, 'i-2': True, 'i-3': True})
+        written = {call.args[0]: call.args[1] for call in self.mock_dyn.put_runtime_intervals.call_args_list}
+        self.assertEqual(written['i-2'], [{'startedAt': datetime(2024, 3, 3, 10, tzinfo=timezone.utc),
+                                           'stoppedAt': datetime(2024, 3, 3, 12, tzinfo=timezone.utc)}])
+        self.assertEqual(len(written['i-3']), 1)
+        self.assertEqual(self.mock_ct_client.lookup_events.call_count, 4)
+        self.assertEqual(self.mock_dyn.set_runtime_ledger_since.call_count, 3)
+
+    def test_complete_ledgers_skip_cloudtrail(self):
+        """Test that nothing is scanned when every ledger is already complete"""
+        self.mock_dyn.get_runtime_ledger_since.return_value = '2024-02-01T00:00:00Z'
+
+        results = self.ec2_utils.backfill_runtime_ledgers([{'InstanceId': 'i-1'}], MARCH, core_dyn=self.mock_dyn)
+
+        self.assertEqual(results, {'i-1': True})
+        self.mock_ct_client.lookup_events.assert_not_called()
+
+    def test_scan_failure_marks_every_instance(self):
+        """Test that a failed scan leaves every ledger for the next run"""
+        self.mock_ct_client.lookup_events.side_effect = Exception("throttled")
+
+        results = self.ec2_utils.backfill_runtime_ledgers([{'InstanceId': 'i-1'}, {'InstanceId': 'i-2'}], MARCH,
+                                                          core_dyn=self.mock_dyn)
+
+        self.assertEqual(results, {'i-1': False, 'i-2': False})
+        self.mock_dyn.set_runtime_ledger_since.assert_not_called()
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test suite for TokenBucket"""
+
+    def test_waits_once_the_burst_is_spent(self):
+        """Test that requests beyond the burst are spaced at the refill rate"""
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            bucket.acquire()
+
+        self.assertEqual(sleeps, [0.5, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the fleet snapshot in ec2Helper.py
+Tests single-describe indexing, TTL expiry, invalidation and list_* lookups.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ec2Helper import Ec2Utils
+
+
+def _instance(instance_id, state, **tags):
+    tags.setdefault('App', 'test-app')
+    return {
+        'InstanceId': instance_id,
+        'State': {'Name': state},
+        'Tags': [{'Key': key, 'Value': value} for key, value in tags.items()]
+    }
+
+
+class TestFleetSnapshot(unittest.TestCase):
+    """Test suite for Ec2Utils list_* methods backed by FleetSnapshot"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_ec2_client = Mock()
+        self.mock_ec2_client.describe_instances.side_effect = [
+            {
+                'Reservations': [{'Instances': [
+                    _instance('i-1', 'running', Group='g1', User='a@example.com'),
+                    _instance('i-2', 'stopped', Group='g1')
+                ]}],
+                'NextToken': 'page-2'
+            },
+            {
+                'Reservations': [{'Instances': [
+                    _instance('i-3', 'running', User='a@example.com'),
+                    _instance('i-4', 'shutting-down', Group='g1')
+                ]}]
+            }
+        ]
+
+        self.ec2_utils = Ec2Utils()
+        self.ec2_utils.ec2_client = self.mock_ec2_client
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_list_methods_share_one_describe(self):
+        """Test that every listing is served from one paginated describe"""
+        running = self.ec2_utils.list_servers_by_state('running')
+        group = self.ec2_utils.list_servers_by_group('g1')
+        user = self.ec2_utils.list_servers_by_user('a@example.com')
+        everything = self.ec2_utils.list_instances_by_app_tag('test-app')
+
+        self.assertEqual(self.mock_ec2_client.describe_instances.call_count, 2)
+        self.assertEqual([i['InstanceId'] for i in running['Instances']], ['i-1', 'i-3'])
+        self.assertEqual([i['InstanceId'] for i in group['Instances']], ['i-1', 'i-2'])
+        self.assertEqual(user['TotalInstances'], 2)
+        self.assertEqual(everything['TotalInstances'], 3)
+        self.assertIsNotNone(self.ec2_utils.fleet.get('i-4'))
+
+    def test_pages_are_sliced_from_the_index(self):
+        """Test that page/results_per_page still apply"""
+        page = self.ec2_utils.list_all_servers(page=2, results_per_page=2)
+
+        self.assertEqual([i['InstanceId'] for i in page['Instances']], ['i-3'])
+        self.assertEqual(page['TotalInstances'], 3)
+
+    def test_invalidate_forces_a_new_describe(self):
+        """Test that a state change drops the snapshot"""
+        self.ec2_utils.list_all_servers()
+        self.mock_ec2_client.describe_instances.side_effect = None
+        self.mock_ec2_client.describe_instances.return_value = {
+            'Reservations': [{'Instances': [_instance('i-1', 'stopped')]}]
+        }
+
+        self.ec2_utils.invalidate_fleet_snapshot()
+        stopped = self.ec2_utils.list_servers_by_state('stopped')
+
+        self.assertEqual(self.mock_ec2_client.describe_instances.call_count, 3)
+        self.assertEqual([i['InstanceId'] for i in stopped['Instances']], ['i-1'])
+
+    def test_expired_snapshot_is_reloaded(self):
+        """Test that the TTL bounds staleness"""
+        self.ec2_utils.list_all_servers()
+        self.mock_ec2_client.describe_instances.side_effect = None
+        self.mock_ec2_client.describe_instances.return_value = {'Reservations': []}
+
+        self.ec2_utils.fleet._fetched_at -= self.ec2_utils.fleet.ttl_seconds + 1
+
+        self.assertEqual(self.ec2_utils.list_all_servers()['TotalInstances'], 0)
+        self.assertEqual(self.mock_ec2_client.describe_instances.call_count, 3)
+
+    def test_state_outside_snapshot_queries_ec2(self):
+        """Test that terminated instances are still listed with a direct describe"""
+        self.mock_ec2_client.describe_instances.side_effect = None
+        self.mock_ec2_client.describe_instances.return_value = {
+            'Reservations': [{'Instances': [_instance('i-9', 'terminated')]}]
+        }
+
+        result = self.ec2_utils.list_servers_by_state('terminated')
+
+        self.assertEqual(result['TotalInstances'], 1)
+        filters = self.mock_ec2_client.describe_instances.call_args.kwargs['Filters']
+        self.assertIn({'Name': 'instance-state-name', 'Values': ['terminated']}, filters)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for cursor pagination in ec2Helper.py
+Tests MaxResults/NextToken pass-through, opaque cursors, legacy page numbers and cached counts.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ec2Helper import Ec2Utils
+
+FILTERS = [{'Name': 'tag:App', 'Values': ['test-app']}, {'Name': 'instance-state-name', 'Values': ['terminated']}]
+
+
+def _page(instance_ids, next_token=None):
+    response = {'Reservations': [{'Instances': [{'InstanceId': iid, 'State': {'Name': 'terminated'}}
+                                                for iid in instance_ids]}]}
+    if next_token:
+        response['NextToken'] = next_token
+    return response
+
+
+class TestPaginateInstances(unittest.TestCase):
+    """Test suite for Ec2Utils.paginate_instances"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_ec2_client = Mock()
+        self.ec2_utils = Ec2Utils()
+        self.ec2_utils.ec2_client = self.mock_ec2_client
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_first_page_makes_one_call(self):
+        """Test that page 1 passes MaxResults and stops at the first full page"""
+        self.mock_ec2_client.describe_instances.return_value = _page(['i-1', 'i-2', 'i-3', 'i-4', 'i-5'], 'token-2')
+
+        result = self.ec2_utils.paginate_instances(FILTERS, results_per_page=5, include_total=False)
+
+        self.assertEqual(len(result['Instances']), 5)
+        self.assertIsNotNone(result['NextCursor'])
+        self.assertNotIn('TotalInstances', result)
+        self.mock_ec2_client.describe_instances.assert_called_once_with(Filters=FILTERS, MaxResults=5)
+
+    def test_cursor_resumes_from_next_token(self):
+        """Test that the opaque cursor carries the EC2 NextToken"""
+        self.mock_ec2_client.describe_instances.return_value = _page(['i-1', 'i-2', 'i-3', 'i-4', 'i-5'], 'token-2')
+        cursor = self.ec2_utils.paginate_instances(FILTERS, results_per_page=5, include_total=False)['NextCursor']
+
+        self.mock_ec2_client.describe_instances.return_value = _page(['i-6'])
+        result = self.ec2_utils.paginate_instances(FILTERS, results_per_page=5, cursor=cursor, include_total=False)
+
+        self.assertEqual([i['InstanceId'] for i in result['Instances']], ['i-6'])
+        self.assertIsNone(result['NextCursor'])
+        self.assertEqual(self.mock_ec2_client.describe_instances.call_args.kwargs['NextToken'], 'token-2')
+
+    def test_short_filtered_pages_are_topped_up(self):
+        """Test that sparse EC2 pages are followed until the page is full"""
+        self.mock_ec2_client.describe_instances.side_effect = [
+            _page([], 'token-2'),
+            _page(['i-1', 'i-2'], 'token-3'),
+            _page(['i-3', 'i-4', 'i-5', 'i-6'], 'token-4')
+        ]
+
+        result = self.ec2_utils.paginate_instances(FILTERS, results_per_page=5, include_total=False)
+
+        self.assertEqual(len(result['Instances']), 6)
+        self.assertEqual(self.mock_ec2_client.describe_instances.call_count, 3)
+
+    def test_cursor_for_other_filters_is_rejected(self):
+        """Test that a cursor can't be replayed against a different query"""
+        self.mock_ec2_client.describe_instances.return_value = _page(['i-1', 'i-2', 'i-3', 'i-4', 'i-5'], 'token-2')
+        cursor = self.ec2_utils.paginate_instances(FILTERS, results_per_page=5, include_total=False)['NextCursor']
+
+        other_filters = [{'Name': 'tag:App', 'Values': ['other-app']}]
+        with self.assertRaises(ValueError):
+            self.ec2_utils.paginate_instances(other_filters, cursor=cursor)
+        with self.assertRaises(ValueError):
+            self.ec2_utils.paginate_instances(FILTERS, cursor='not-a-cursor')
+
+    def test_page_number_walks_cursors_and_total_is_cached(self):
+        """Test legacy page numbers and that TotalInstances is counted once"""
+        self.mock_ec2_client.describe_instances.side_effect = [
+            _page(['i-1', 'i-2', 'i-3', 'i-4', 'i-5'], 'token-2'),
+            _page(['i-6']),
+            _page(['i-1', 'i-2', 'i-3', 'i-4', 'i-5', 'i-6'])
+        ]
+
+        result = self.ec2_utils.paginate_instances(FILTERS, page=2, results_per_page=5)
+        self.assertEqual([i['InstanceId'] for i in result['Instances']], ['i-6'])
+        self.assertEqual(result['TotalInstances'], 6)
+
+        self.mock_ec2_client.describe_instances.side_effect = None
+        self.mock_ec2_client.describe_instances.return_value = _page(['i-1'])
+        self.assertEqual(self.ec2_utils.count_instances(FILTERS), 6)
+        self.assertEqual(self.mock_ec2_client.describe_instances.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Unit tests for fleet-wide instance status in ec2Helper.py
+Tests the status/IAM association join, narrowing to requested IDs and parity with describe_instance_status.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+from botocore.exceptions import ClientError
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+os.environ['EC2_INSTANCE_PROFILE_ARN'] = 'arn:aws:iam::123456789012:instance-profile/test-profile'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ec2Helper import Ec2Utils
+
+PROFILE_ARN = 'arn:aws:iam::123456789012:instance-profile/test-profile'
+
+
+def _status(instance_id, instance_status='ok', system_status='ok'):
+    return {
+        'InstanceId': instance_id,
+        'InstanceStatus': {'Status': instance_status},
+        'SystemStatus': {'Status': system_status}
+    }
+
+
+def _association(instance_id, arn=PROFILE_ARN):
+    return {'AssociationId': f'assoc-{instance_id}', 'InstanceId': instance_id,
+            'IamInstanceProfile': {'Arn': arn}, 'State': 'associated'}
+
+
+class TestDescribeInstanceStatuses(unittest.TestCase):
+    """Test suite for Ec2Utils.describe_instance_statuses"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_ec2_client = Mock()
+        self.ec2_utils = Ec2Utils()
+        self.ec2_utils.ec2_client = self.mock_ec2_client
+
+        self.status_pages = [
+            {'InstanceStatuses': [_status('i-1'), _status('i-2', 'initializing')]},
+            {'InstanceStatuses': [_status('i-3', 'not-applicable', 'not-applicable')]}
+        ]
+        self.association_pages = [
+            {'IamInstanceProfileAssociations': [_association('i-1'), _association('i-2', arn='arn:other')]}
+        ]
+        paginators = {
+            'describe_instance_status': Mock(paginate=Mock(return_value=self.status_pages)),
+            'describe_iam_instance_profile_associations': Mock(paginate=Mock(return_value=self.association_pages))
+        }
+        self.paginators = paginators
+        self.mock_ec2_client.get_paginator.side_effect = paginators.get
+
+        reported = {status['InstanceId']: status for page in self.status_pages for status in page['InstanceStatuses']}
+        self.mock_ec2_client.describe_instance_status.side_effect = lambda InstanceIds, **kwargs: {
+            'InstanceStatuses': [reported[instance_id] for instance_id in InstanceIds if instance_id in reported]
+        }
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_statuses_and_associations_are_joined(self):
+        """Test that one status call and one association sweep replace two calls per instance"""
+        statuses = self.ec2_utils.describe_instance_statuses(['i-1', 'i-2', 'i-3'])
+
+        self.assertEqual(statuses['i-1'], {'instanceId': 'i-1', 'initStatus': 'ok', 'iamStatus': 'ok'})
+        self.assertEqual(statuses['i-2'], {'instanceId': 'i-2', 'initStatus': 'fail', 'iamStatus': 'fail'})
+        self.assertEqual(statuses['i-3']['initStatus'], 'fail')
+        self.mock_ec2_client.describe_instance_status.assert_called_once_with(
+            InstanceIds=['i-1', 'i-2', 'i-3'], IncludeAllInstances=True)
+        self.mock_ec2_client.describe_iam_instance_profile_associations.assert_not_called()
+
+    def test_requested_ids_narrow_both_calls(self):
+        """Test that asking about a few instances doesn't sweep the account"""
+        self.ec2_utils.describe_instance_statuses(['i-1'])
+
+        self.paginators['describe_instance_status'].paginate.assert_not_called()
+        association_kwargs = self.paginators['describe_iam_instance_profile_associations'].paginate.call_args.kwargs
+        self.assertEqual(association_kwargs['Filters'], [{'Name': 'state', 'Values': ['associated']},
+                                                         {'Name': 'instance-id', 'Values': ['i-1']}])
+
+    def test_unknown_ids_are_isolated(self):
+        """Test that a terminated ID doesn't fail the whole batch"""
+        reported = self.mock_ec2_client.describe_instance_status.side_effect
+
+        def describe_instance_status(InstanceIds, **kwargs):
+            if 'i-gone' in InstanceIds:
+                raise ClientError({'Error': {'Code': 'InvalidInstanceID.NotFound'}}, 'DescribeInstanceStatus')
+            return reported(InstanceIds, **kwargs)
+
+        self.mock_ec2_client.describe_instance_status.side_effect = describe_instance_status
+
+        statuses = self.ec2_utils.describe_instance_statuses(['i-1', 'i-gone'])
+
+        self.assertEqual(statuses['i-1']['initStatus'], 'ok')
+        self.assertEqual(statuses['i-gone']['initStatus'], 'fail')
+
+    def test_unreported_instances_fail(self):
+        """Test that requested instances missing from EC2 get fail statuses"""
+        statuses = self.ec2_utils.describe_instance_statuses(['i-9'])
+
+        self.assertEqual(statuses, {'i-9': {'instanceId': 'i-9', 'initStatus': 'fail', 'iamStatus': 'fail'}})
+
+    def test_without_ids_returns_whole_fleet(self):
+        """Test the fleet-wide form"""
+        statuses = self.ec2_utils.describe_instance_statuses()
+
+        self.assertEqual(set(statuses), {'i-1', 'i-2', 'i-3'})
+        status_kwargs = self.paginators['describe_instance_status'].paginate.call_args.kwargs
+        self.assertTrue(status_kwargs['IncludeAllInstances'])
+        association_kwargs = self.paginators['describe_iam_instance_profile_associations'].paginate.call_args.kwargs
+        self.assertEqual(association_kwargs['Filters'], [{'Name': 'state', 'Values': ['associated']}])
+
+    def test_single_instance_form_matches(self):
+        """Test that describe_instance_status builds the same shape"""
+        self.mock_ec2_client.describe_iam_instance_profile_associations.return_value = {
+            'IamInstanceProfileAssociations': [_association('i-1')]
+        }
+
+        self.assertEqual(self.ec2_utils.describe_instance_status('i-1'),
+                         self.ec2_utils.describe_instance_statuses(['i-1'])['i-1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
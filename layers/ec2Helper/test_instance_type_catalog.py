@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the instance-type catalog in ec2Helper.py
+Tests the shipped snapshot, the /tmp cache and the batched API fallback.
+"""
+import sys
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import Mock
+from botocore.exceptions import ClientError
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+from ec2Helper import InstanceTypeCatalog, INSTANCE_TYPE_SNAPSHOT_PATH, SUPPORTED_INSTANCE_TYPES
+
+
+def _type_info(instance_type, vcpus, memory):
+    return {'InstanceType': instance_type, 'VCpuInfo': {'DefaultVCpus': vcpus}, 'MemoryInfo': {'SizeInMiB': memory}}
+
+
+class TestInstanceTypeCatalog(unittest.TestCase):
+    """Test suite for InstanceTypeCatalog"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'instance_types.json')
+        self.catalog = InstanceTypeCatalog(cache_path=self.cache_path)
+        self.mock_ec2_client = Mock()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_supported_types_never_call_the_api(self):
+        """Test that the shipped snapshot covers every supported type"""
+        specs = self.catalog.get_many(SUPPORTED_INSTANCE_TYPES, self.mock_ec2_client)
+
+        self.assertEqual(set(specs), set(SUPPORTED_INSTANCE_TYPES))
+        self.assertEqual(specs['t3.xlarge'], {'vCpus': 4, 'memSize': 16384})
+        self.mock_ec2_client.describe_instance_types.assert_not_called()
+
+    def test_unknown_types_are_fetched_in_one_call_and_cached(self):
+        """Test that unknown types cost one batched call, then none"""
+        self.mock_ec2_client.describe_instance_types.return_value = {
+            'InstanceTypes': [_type_info('m5.large', 2, 8192), _type_info('c5.xlarge', 4, 8192)]
+        }
+
+        self.catalog.get_many(['t3.micro', 'm5.large', 'c5.xlarge', 'm5.large'], self.mock_ec2_client)
+        specs = self.catalog.get_many(['m5.large'], self.mock_ec2_client)
+
+        self.assertEqual(specs['m5.large'], {'vCpus': 2, 'memSize': 8192})
+        self.mock_ec2_client.describe_instance_types.assert_called_once_with(InstanceTypes=['m5.large', 'c5.xlarge'])
+
+        # A new container picks the learned types up from /tmp
+        with open(self.cache_path) as cache_file:
+            self.assertIn('c5.xlarge', json.load(cache_file))
+        fresh_catalog = InstanceTypeCatalog(cache_path=self.cache_path)
+        fresh_catalog.get_many(['c5.xlarge'], self.mock_ec2_client)
+        self.assertEqual(self.mock_ec2_client.describe_instance_types.call_count, 1)
+
+    def test_api_failure_omits_unknown_types(self):
+        """Test that a failed lookup still returns the known types"""
+        self.mock_ec2_client.describe_instance_types.side_effect = ClientError(
+            {'Error': {'Code': 'InvalidInstanceType', 'Message': 'bad type'}}, 'DescribeInstanceTypes')
+
+        specs = self.catalog.get_many(['t3.small', 'x9.huge'], self.mock_ec2_client)
+
+        self.assertEqual(list(specs), ['t3.small'])
+
+    def test_snapshot_file_is_shipped_next_to_module(self):
+        """Test that the layer snapshot exists and parses"""
+        with open(INSTANCE_TYPE_SNAPSHOT_PATH) as snapshot_file:
+            self.assertEqual(set(json.load(snapshot_file)), set(SUPPORTED_INSTANCE_TYPES))
+
+
+if __name__ == '__main__':
+    unittest.main()
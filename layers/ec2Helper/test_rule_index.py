@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the EventBridge rule index in ec2Helper.py
+Tests the paginated prefix sweep, TTL reuse, invalidation and bulk schedule checks.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+import clientHelper
+from ec2Helper import Ec2Utils
+
+
+class TestEventBridgeRuleIndex(unittest.TestCase):
+    """Test suite for Ec2Utils schedule rule checks backed by EventBridgeRuleIndex"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.pages = {
+            'shutdown-': [{'Rules': [{'Name': f'shutdown-i-{n}'} for n in range(100)]},
+                          {'Rules': [{'Name': 'shutdown-i-150'}]}],
+            'start-': [{'Rules': [{'Name': 'start-i-1'}]}]
+        }
+        self.mock_paginator = Mock()
+        self.mock_paginator.paginate.side_effect = lambda NamePrefix: self.pages[NamePrefix]
+
+        self.mock_events_client = Mock()
+        self.mock_events_client.get_paginator.return_value = self.mock_paginator
+
+        self.ec2_utils = Ec2Utils()
+        self.ec2_utils.events_client = self.mock_events_client
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.patcher.stop()
+
+    def test_rules_past_the_first_page_are_found(self):
+        """Test that paginated sweeps don't miss rules beyond 100"""
+        status = self.ec2_utils.check_eventbridge_rules_exist('i-150')
+
+        self.assertEqual(status, {'shutdown_rule_exists': True, 'start_rule_exists': False})
+        prefixes = [call.kwargs['NamePrefix'] for call in self.mock_paginator.paginate.call_args_list]
+        self.assertEqual(prefixes, ['shutdown-', 'start-'])
+
+    def test_bulk_status_reuses_one_sweep(self):
+        """Test that fleet-wide checks cost one sweep per prefix"""
+        statuses = self.ec2_utils.get_schedule_rules_status(['i-1', 'i-2', 'i-999'])
+        self.ec2_utils.check_eventbridge_rules_exist('i-1')
+
+        self.assertEqual(statuses['i-1'], {'shutdown_rule_exists': True, 'start_rule_exists': True})
+        self.assertFalse(statuses['i-999']['shutdown_rule_exists'])
+        self.assertEqual(self.mock_paginator.paginate.call_count, 2)
+        self.mock_events_client.list_rules.assert_not_called()
+
+    def test_invalidate_relists_rules(self):
+        """Test that a rule change is visible after invalidation"""
+        self.ec2_utils.check_eventbridge_rules_exist('i-2')
+        self.pages['start-'] = [{'Rules': [{'Name': 'start-i-1'}, {'Name': 'start-i-2'}]}]
+
+        self.ec2_utils.invalidate_rule_index()
+
+        self.assertTrue(self.ec2_utils.check_eventbridge_rules_exist('i-2')['start_rule_exists'])
+        self.assertEqual(self.mock_paginator.paginate.call_count, 4)
+
+    def test_listing_error_reports_no_rules(self):
+        """Test that a failed sweep keeps the read-only check's fallback"""
+        self.mock_paginator.paginate.side_effect = Exception("throttled")
+
+        self.assertEqual(self.ec2_utils.check_eventbridge_rules_exist('i-1'),
+                         {'shutdown_rule_exists': False, 'start_rule_exists': False})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Unit tests for ledger-based runtime in ec2Helper.py
+Tests interval clipping, one-time CloudTrail backfill and de-duplication against event intervals.
+"""
+import sys
+import os
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+sys.path.insert(0, '../ddbHelper')
+import clientHelper
+from ddbHelper import CoreTableDyn
+from ec2Helper import Ec2Utils
+
+MARCH = datetime(2024, 3, 1, tzinfo=timezone.utc)
+NOW = datetime(2024, 3, 10, tzinfo=timezone.utc)
+
+
+def _cloudtrail(event_name, event_time, previous_state):
+    detail = {'eventTime': event_time, 'responseElements': {'instancesSet': {'items': [
+        {'instanceId': 'i-1', 'previousState': {'name': previous_state}}]}}}
+    return {'EventName': event_name, 'CloudTrailEvent': json.dumps(detail)}
+
+
+class TestRuntimeLedger(unittest.TestCase):
+    """Test suite for Ec2Utils.get_running_minutes and ensure_runtime_ledger"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.patcher = patch('boto3.client')
+        self.patcher.start()
+        clientHelper.reset_clients()
+
+        self.mock_dyn = Mock()
+        self.mock_dyn.runtime_timestamp.side_effect = CoreTableDyn.runtime_timestamp
+        self.mock_dyn.get_runtime_ledger_since.return_value = '2024-02-01T00:00:00Z'
+        self.mock_dyn.list_runtime_intervals.return_value = []
+
+        self.limiter_patcher = patch('ec2Helper._cloudtrail_rate_limiter')
+        self.limiter_patcher.start()
+        self.mock_ct_client = Mock()
+        self.mock_ec2_client = Mock()
+        self.mock_ec2_client.describe_instances.return_value = {
+            'Reservations': [{'Instances': [{'State': {'Name': 'running'}}]}]
+        }
+
+        self.ec2_utils = Ec2Utils()
+        self.ec2_utils.ct_client = self.mock_ct_client
+        self.ec2_utils.ec2_client = self.mock_ec2_client
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.limiter_patcher.stop()
+        self.patcher.stop()
+
+    def test_minutes_come_from_the_ledger(self):
+        """Test that a complete ledger needs no CloudTrail and clips to the range"""
+        self.mock_dyn.list_runtime_intervals.return_value = [
+            {'startedAt': '2024-02-29T23:00:00Z', 'stoppedAt': '2024-03-01T01:00:00Z'},
+            {'startedAt': '2024-03-02T10:00:00Z', 'stoppedAt': '2024-03-02T10:30:00Z'},
+            {'startedAt': '2024-03-09T23:00:00Z', 'stoppedAt': None}
+        ]
+
+        minutes = self.ec2_utils.get_running_minutes('i-1', MARCH, NOW, core_dyn=self.mock_dyn)
+
+        self.assertEqual(minutes, 60 + 30 + 60)
+        self.mock_ct_client.lookup_events.assert_not_called()
+        self.mock_dyn.put_runtime_intervals.assert_not_called()
+
+    def test_missing_ledger_is_backfilled_once(self):
+        """Test that the first calculation rebuilds the month from CloudTrail"""
+        self.mock_dyn.get_runtime_ledger_since.return_value = None
+        self.mock_ct_client.lookup_events.return_value = {'Events': [
+            _cloudtrail('StopInstances', '2024-03-08T12:00:00Z', 'running'),
+            _cloudtrail('StartInstances', '2024-03-08T10:00:00Z', 'stopped'),
+            _cloudtrail('StartInstances', '2024-03-09T10:00:00Z', 'stopped')
+        ]}
+
+        self.assertTrue(self.ec2_utils.ensure_runtime_ledger('i-1', MARCH, self.mock_dyn))
+
+        instance_id, intervals = self.mock_dyn.put_runtime_intervals.call_args.args
+        self.assertEqual(instance_id, 'i-1')
+        self.assertEqual(len(intervals), 2)
+        self.assertEqual(intervals[0]['stoppedAt'], datetime(2024, 3, 8, 12, tzinfo=timezone.utc))
+        self.assertIsNone(intervals[1]['stoppedAt'])
+        self.mock_dyn.set_runtime_ledger_since.assert_called_once_with('i-1', MARCH)
+
+    def test_backfill_stops_at_event_intervals(self):
+        """Test that CloudTrail doesn't duplicate intervals recorded from events"""
+        self.mock_dyn.get_runtime_ledger_since.return_value = None
+        self.mock_dyn.list_runtime_intervals.return_value = [{'startedAt': '2024-03-05T00:00:00Z', 'stoppedAt': None}]
+        self.mock_ct_client.lookup_events.return_value = {'Events': [
+            _cloudtrail('StartInstances', '2024-03-04T22:00:00Z', 'stopped')
+        ]}
+
+        self.ec2_utils.ensure_runtime_ledger('i-1', MARCH, self.mock_dyn)
+
+        self.assertEqual(self.mock_ct_client.lookup_events.call_args.kwargs['EndTime'],
+                         datetime(2024, 3, 5, tzinfo=timezone.utc))
+        intervals = self.mock_dyn.put_runtime_intervals.call_args.args[1]
+        self.assertEqual(intervals, [{'startedAt': datetime(2024, 3, 4, 22, tzinfo=timezone.utc),
+                                      'stoppedAt': datetime(2024, 3, 5, tzinfo=timezone.utc)}])
+
+    def test_cloudtrail_failure_leaves_marker_unset(self):
+        """Test that a failed backfill is retried on the next calculation"""
+        self.mock_dyn.get_runtime_ledger_since.return_value = None
+        self.mock_ct_client.lookup_events.side_effect = Exception("throttled")
+
+        self.assertFalse(self.ec2_utils.ensure_runtime_ledger('i-1', MARCH, self.mock_dyn))
+        self.mock_dyn.set_runtime_ledger_since.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
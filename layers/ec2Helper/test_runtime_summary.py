@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the runtime interval engine in ec2Helper.py
+Tests window clipping, open intervals and daily/hourly buckets in the server timezone.
+"""
+import sys
+import os
+import unittest
+from datetime import datetime, timezone
+
+# Mock environment variables before importing
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['TAG_APP_VALUE'] = 'test-app'
+
+sys.path.insert(0, '.')
+sys.path.insert(0, '../clientHelper')
+from ec2Helper import pair_runtime_transitions, summarize_runtime
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestSummarizeRuntime(unittest.TestCase):
+    """Test suite for summarize_runtime"""
+
+    def test_intervals_are_clipped_to_the_window(self):
+        """Test that only the part inside the window counts"""
+        intervals = [
+            {'startedAt': '2024-02-29T23:30:00Z', 'stoppedAt': '2024-03-01T00:30:00Z'},
+            {'startedAt': '2024-03-01T10:00:00Z', 'stoppedAt': '2024-03-01T10:00:20Z'},
+            {'startedAt': '2024-03-01T10:00:00Z', 'stoppedAt': '2024-03-01T10:00:20Z'},
+        ]
+
+        summary = summarize_runtime(intervals, _utc(2024, 3, 1), _utc(2024, 4, 1), buckets=False)
+
+        # Seconds are summed before rounding, so short intervals aren't lost
+        self.assertEqual(summary['totalMinutes'], 30.67)
+        self.assertEqual(summary['daily'], {})
+
+    def test_running_instance_counts_until_now(self):
+        """Test that an open interval stops at now, not at a future window end"""
+        intervals = [{'startedAt': _utc(2024, 3, 1, 22), 'stoppedAt': None}]
+
+        summary = summarize_runtime(intervals, _utc(2024, 3, 1), _utc(2024, 3, 8), now=_utc(2024, 3, 2, 1, 30))
+
+        self.assertEqual(summary['totalMinutes'], 210)
+        self.assertEqual(summary['daily'], {'2024-03-01': 120, '2024-03-02': 90})
+        self.assertEqual(summary['hourly']['2024-03-02T01:00'], 30)
+
+    def test_buckets_follow_the_server_timezone(self):
+        """Test that hours and days are split in local time, including half-hour offsets"""
+        intervals = [{'startedAt': '2024-03-01T07:00:00Z', 'stoppedAt': '2024-03-01T09:00:00Z'}]
+
+        pacific = summarize_runtime(intervals, _utc(2024, 3, 1), _utc(2024, 3, 2), 'America/Los_Angeles')
+        india = summarize_runtime(intervals, _utc(2024, 3, 1), _utc(2024, 3, 2), 'Asia/Kolkata')
+
+        self.assertEqual(pacific['daily'], {'2024-02-29': 60, '2024-03-01': 60})
+        self.assertEqual(india['hourly'], {'2024-03-01T12:00': 30, '2024-03-01T13:00': 60, '2024-03-01T14:00': 30})
+
+    def test_unknown_timezone_falls_back_to_utc(self):
+        """Test that a bad timezone config doesn't break the summary"""
+        intervals = [{'startedAt': '2024-03-01T10:15:00Z', 'stoppedAt': '2024-03-01T10:45:00Z'}]
+
+        summary = summarize_runtime(intervals, _utc(2024, 3, 1), _utc(2024, 3, 2), 'Mars/Olympus_Mons')
+
+        self.assertEqual(summary['hourly'], {'2024-03-01T10:00': 30})
+
+    def test_transitions_feed_the_engine(self):
+        """Test pairing sorted transitions and summarizing them"""
+        transitions = [
+            {'s': 'StartInstances', 'x': '2024-03-01T10:00:00Z'},
+            {'s': 'StopInstances', 'x': '2024-03-01T11:00:00Z'},
+            {'s': 'StopInstances', 'x': '2024-03-01T11:05:00Z'},
+            {'s': 'StartInstances', 'x': '2024-03-01T12:00:00Z'}
+        ]
+
+        intervals = pair_runtime_transitions(transitions, _utc(2024, 3, 1, 12, 45), 'running')
+        summary = summarize_runtime(intervals, _utc(2024, 3, 1), _utc(2024, 3, 2), now=_utc(2024, 3, 1, 12, 45))
+
+        self.assertEqual(summary['totalMinutes'], 105)
+
+
+if __name__ == '__main__':
+    unittest.main()
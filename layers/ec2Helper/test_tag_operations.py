@@ -15,6 +15,7 @@ os.environ['EC2_INSTANCE_PROFILE_ARN'] = 'arn:aws:iam::123456789012:instance-pro
 
 # Mock boto3 and dependencies
 sys.path.insert(0, '/opt/utilHelper')
+sys.path.insert(0, '../clientHelper')
 
 # Create mock utilHelper module with proper capitalize_first_letter function
 class MockUtils:
@@ -34,6 +35,7 @@ mock_util_helper.Utils = MockUtils
 sys.modules['utilHelper'] = mock_util_helper
 
 # Import after mocking
+import clientHelper
 from ec2Helper import Ec2Utils
 
 
@@ -53,12 +55,13 @@ class TestGetInstanceAttributesFromTags(unittest.TestCase):
         self.patcher = patch('boto3.client')
         self.mock_boto_client = self.patcher.start()
         
-        def client_factory(service_name):
+        def client_factory(service_name, **kwargs):
             if service_name == 'sts':
                 return self.mock_sts_client
             return self.mock_ec2_client
         
         self.mock_boto_client.side_effect = client_factory
+        clientHelper.reset_clients()
         
         # Create Ec2Utils instance
         self.ec2_utils = Ec2Utils()
@@ -280,12 +283,13 @@ class TestSetInstanceAttributesToTags(unittest.TestCase):
         self.patcher = patch('boto3.client')
         self.mock_boto_client = self.patcher.start()
         
-        def client_factory(service_name):
+        def client_factory(service_name, **kwargs):
             if service_name == 'sts':
                 return self.mock_sts_client
             return self.mock_ec2_client
         
         self.mock_boto_client.side_effect = client_factory
+        clientHelper.reset_clients()
         
         # Create Ec2Utils instance
         self.ec2_utils = Ec2Utils()
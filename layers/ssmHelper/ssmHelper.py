@@ -1,18 +1,20 @@
-import boto3
 import json
 import logging
 import os
 from datetime import datetime, timezone
+import clientHelper
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 
 class SSMHelper:
+    # Shared client from clientHelper, created on first use
+    sqs = clientHelper.LazyClient('sqs')
+
     def __init__(self,queue_url, bootstrap_doc_name):
         """Initialize SSM Helper with SQS client and configuration."""
         logger.info(f"------- SSMHelper Class Initialization {queue_url} {bootstrap_doc_name}")
-        self.sqs = boto3.client('sqs')
 
         queue_url = queue_url or os.getenv('SSM_COMMAND_QUEUE_URL')
         bootstrap_doc_name = bootstrap_doc_name or os.getenv('BOOTSTRAP_SSM_DOC_NAME')
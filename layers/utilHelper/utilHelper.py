@@ -1,5 +1,5 @@
-import boto3
 from botocore.exceptions import ClientError
+import clientHelper
 import requests
 import json
 import os
@@ -12,11 +12,17 @@ from typing import Dict, Any, Optional
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# GetMetricData accepts at most 500 MetricDataQueries per request
+GET_METRIC_DATA_MAX_QUERIES = 500
+
 class Utils:
+    # Shared clients from clientHelper, created on first use
+    ssm = clientHelper.LazyClient('ssm')
+    ses = clientHelper.LazyClient('ses')
+    cw_client = clientHelper.LazyClient('cloudwatch')
+
     def __init__(self):
         logger.info("------- Utils Class Initialization")
-        self.ssm = boto3.client('ssm')
-        self.ses = boto3.client('ses')
         self.admin_group_name = os.getenv('ADMIN_GROUP_NAME', 'admin')  # Default to 'admin' if not set
     
     def capitalize_first_letter(self, text):
@@ -35,7 +41,7 @@ class Utils:
     
     def get_metrics_data(self, instance_id, namespace, metric_name, unit, statistics, start_time, end_time, period=300):
         logger.info(f"------- get_metrics_data: {metric_name} - {instance_id}")
-        cw_client = boto3.client('cloudwatch')
+        cw_client = self.cw_client
 
         dimensions = [
             {'Name': 'InstanceId', 'Value': instance_id}
@@ -78,6 +84,88 @@ class Utils:
             logger.error(f'Something went wrong: {str(e)}')
             return "[]"
 
+    def get_instance_metrics(self, instance_ids, metrics, start_time, end_time, period=300):
+        """
+        Fetch several metrics for many instances with batched GetMetricData calls.
+
+        One query is built per instance x metric pair and sent
+        GET_METRIC_DATA_MAX_QUERIES at a time, following NextToken, instead of
+        one get_metric_statistics call per pair.
+
+        Args:
+            instance_ids (list): EC2 instance IDs (InstanceId dimension)
+            metrics (dict): {field: (namespace, metric_name, unit, statistic)},
+                e.g. {'cpuStats': ('MinecraftDashboard', 'cpu_usage', 'Percent', 'Average')}
+            start_time (datetime): Start of the window
+            end_time (datetime): End of the window
+            period (int): Period in seconds
+
+        Returns:
+            dict: {instance_id: {field: JSON string}} in the same [{'x': ms, 'y': value}]
+                format as get_metrics_data, "[]" for a series with no data; None for an
+                instance whose batch failed, so callers can tell a failure from no data
+        """
+        logger.info(f"------- get_instance_metrics: {len(instance_ids)} instances x {len(metrics)} metrics")
+
+        queries = []
+        targets = {}
+        for instance_id in instance_ids:
+            for field, (namespace, metric_name, unit, statistic) in metrics.items():
+                query_id = f"m{len(queries)}"
+                targets[query_id] = (instance_id, field)
+                queries.append({
+                    'Id': query_id,
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': namespace,
+                            'MetricName': metric_name,
+                            'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}]
+                        },
+                        'Period': period,
+                        'Stat': statistic,
+                        'Unit': unit
+                    },
+                    'ReturnData': True
+                })
+
+        series = {query_id: ([], []) for query_id in targets}
+        failed = set()
+        for i in range(0, len(queries), GET_METRIC_DATA_MAX_QUERIES):
+            batch = queries[i:i + GET_METRIC_DATA_MAX_QUERIES]
+            request = {
+                'MetricDataQueries': batch,
+                'StartTime': start_time,
+                'EndTime': end_time,
+                'ScanBy': 'TimestampAscending'
+            }
+            try:
+                while True:
+                    response = self.cw_client.get_metric_data(**request)
+                    for result in response.get('MetricDataResults', []):
+                        timestamps, values = series[result['Id']]
+                        timestamps.extend(result.get('Timestamps', []))
+                        values.extend(result.get('Values', []))
+                    if not response.get('NextToken'):
+                        break
+                    request['NextToken'] = response['NextToken']
+            except Exception as e:
+                logger.error(f'Something went wrong fetching metric batch {i // GET_METRIC_DATA_MAX_QUERIES}: {str(e)}')
+                failed.update(targets[query['Id']][0] for query in batch)
+
+        results = {instance_id: None if instance_id in failed else {} for instance_id in instance_ids}
+        for query_id, (instance_id, field) in targets.items():
+            if instance_id in failed:
+                continue
+            timestamps, values = series[query_id]
+            datapoints = [
+                # Convert to milliseconds
+                {'x': int(timestamp.timestamp() * 1000), 'y': round(value, 2)}
+                for timestamp, value in zip(timestamps, values)
+            ]
+            results[instance_id][field] = json.dumps(sorted(datapoints, key=lambda x: x['x']))
+
+        return results
+
     def response(self, status_code, body, headers={}):
         """
         Returns a dictionary containing the status code, body, and headers.
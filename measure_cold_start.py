@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Measure the cold-start cost of each Lambda function: module import time, AWS
+calls made during init, heavyweight modules loaded during init and the latency
+of the first invocation. Every function is measured in a fresh interpreter with
+botocore stubbed and outbound sockets disabled, so no credentials are needed.
+Usage: python measure_cold_start.py [FUNCTION ...] [--json] [--strict] [--max-import-ms MS]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+LAMBDAS_DIR = os.path.join(REPO_ROOT, 'lambdas')
+LAYERS_DIR = os.path.join(REPO_ROOT, 'layers')
+RESULT_MARKER = '__COLD_START_RESULT__'
+
+# Modules that should only be imported by the code paths that need them
+HEAVY_MODULES = ('pytz', 'httpx', 'httpx_aws_auth', 'aws_croniter', 'jose', 'gql')
+
+STUB_ENVIRONMENT = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'testing',
+    'AWS_SECRET_ACCESS_KEY': 'testing',
+    'AWS_SESSION_TOKEN': 'testing',
+    'TAG_APP_VALUE': 'minecraft-server',
+    'APP_NAME': 'minecraft-dashboard',
+    'ENVIRONMENT_NAME': 'dev',
+    'CORE_TABLE_NAME': 'cold-start-core-table',
+    'SERVERS_TABLE_NAME': 'cold-start-core-table',
+    'COGNITO_USER_POOL_ID': 'us-east-1_coldstart',
+    'APPSYNC_URL': 'https://example.invalid/graphql',
+    'SERVER_ACTION_QUEUE_URL': 'https://sqs.us-east-1.amazonaws.com/123456789012/actions',
+    'SSM_COMMAND_QUEUE_URL': 'https://sqs.us-east-1.amazonaws.com/123456789012/commands',
+    'BOOTSTRAP_SSM_DOC_NAME': 'cold-start-bootstrap',
+}
+
+# Canned responses for operations whose result shape the helpers index into
+STUB_RESPONSES = {
+    'GetCallerIdentity': {'Account': '123456789012', 'Arn': 'arn:aws:iam::123456789012:user/stub', 'UserId': 'stub'},
+    'GetParameter': {'Parameter': {'Name': 'stub', 'Value': 'stub-value'}},
+    'GetParameters': {'Parameters': [], 'InvalidParameters': []},
+    'DescribeInstances': {'Reservations': []},
+    'GetItem': {},
+    'Query': {'Items': [], 'Count': 0},
+    'BatchGetItem': {'Responses': {}, 'UnprocessedKeys': {}},
+    'GetMetricStatistics': {'Datapoints': []},
+    'GetMetricData': {'MetricDataResults': []},
+}
+
+# Minimal first-invocation events; each should take the function's cheapest real path
+SAMPLE_EVENTS = {
+    'calculateEc2MonthlyRuntime': {},
+    'cognitoUserSync': {
+        'triggerSource': 'PostAuthentication_Authentication',
+        'request': {'userAttributes': {'sub': 'sub-cold-start', 'email': 'cold@example.com'}},
+    },
+    'ec2ActionWorker': {'Records': []},
+    'ec2BootWorker': {'detail': {'instance-id': 'i-0123456789abcdef0', 'state': 'running'}},
+    'ec2MetricsHandler': {'arguments': {'id': 'i-0123456789abcdef0'}},
+    'ec2StateHandler': {'detail-type': 'Scheduled Event'},
+    'ssmCommandWorker': {'Records': []},
+}
+
+
+class StubContext:
+    """Just enough of the Lambda context object for the handlers."""
+    function_name = 'cold-start'
+    aws_request_id = 'cold-start-request'
+    invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:cold-start'
+
+    def get_remaining_time_in_millis(self):
+        return 30000
+
+
+def list_functions():
+    """Names of all Lambda functions with an index.py."""
+    return sorted(name for name in os.listdir(LAMBDAS_DIR)
+                  if os.path.isfile(os.path.join(LAMBDAS_DIR, name, 'index.py')))
+
+
+def install_stubs(aws_calls):
+    """Answer every botocore call locally and refuse real network connections."""
+    from botocore.client import BaseClient
+
+    def _stub_api_call(client, operation_name, api_params):
+        aws_calls.append(f"{client.meta.service_model.service_name}:{operation_name}")
+        return dict(STUB_RESPONSES.get(operation_name, {}))
+
+    def _refuse_connect(sock, address):
+        raise ConnectionRefusedError(f"network disabled by measure_cold_start: {address}")
+
+    BaseClient._make_api_call = _stub_api_call
+    socket.socket.connect = _refuse_connect
+    socket.socket.connect_ex = _refuse_connect
+
+
+def measure_function(function_name):
+    """Import and invoke one function in this interpreter. Returns a result dict."""
+    for key, value in STUB_ENVIRONMENT.items():
+        os.environ.setdefault(key, value)
+
+    sys.path.insert(0, os.path.join(LAMBDAS_DIR, function_name))
+    for layer in sorted(os.listdir(LAYERS_DIR)):
+        sys.path.insert(1, os.path.join(LAYERS_DIR, layer))
+
+    aws_calls = []
+    install_stubs(aws_calls)
+
+    result = {'function': function_name, 'importMs': None, 'initAwsCalls': [], 'initHeavyModules': [],
+              'firstInvokeMs': None, 'invokeAwsCalls': 0, 'error': None}
+    modules_before = set(sys.modules)
+
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module('index')
+    except Exception as e:
+        result['error'] = f"import failed: {e!r}"
+        return result
+    result['importMs'] = round((time.perf_counter() - start) * 1000, 1)
+    result['initAwsCalls'] = list(aws_calls)
+    result['initHeavyModules'] = [name for name in HEAVY_MODULES
+                                  if name in sys.modules and name not in modules_before]
+
+    if function_name not in SAMPLE_EVENTS:
+        return result
+
+    del aws_calls[:]
+    start = time.perf_counter()
+    try:
+        module.handler(SAMPLE_EVENTS[function_name], StubContext())
+    except Exception as e:
+        result['error'] = f"invoke failed: {e!r}"
+    result['firstInvokeMs'] = round((time.perf_counter() - start) * 1000, 1)
+    result['invokeAwsCalls'] = len(aws_calls)
+    return result
+
+
+def run_isolated(function_name):
+    """Measure a function in a fresh interpreter so earlier imports don't hide its cost."""
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', function_name],
+                               capture_output=True, text=True, timeout=120)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+
+    stderr_tail = completed.stderr.strip().splitlines()[-1:] or ['no output']
+    return {'function': function_name, 'importMs': None, 'initAwsCalls': [], 'initHeavyModules': [],
+            'firstInvokeMs': None, 'invokeAwsCalls': 0, 'error': f"child failed: {stderr_tail[0]}"}
+
+
+def find_regressions(results, max_import_ms=None):
+    """List init-phase budget violations."""
+    problems = []
+    for result in results:
+        name = result['function']
+        if result['initAwsCalls']:
+            problems.append(f"{name}: AWS calls during init: {', '.join(result['initAwsCalls'])}")
+        if result['initHeavyModules']:
+            problems.append(f"{name}: heavy modules imported during init: {', '.join(result['initHeavyModules'])}")
+        if max_import_ms is not None and result['importMs'] is not None and result['importMs'] > max_import_ms:
+            problems.append(f"{name}: import took {result['importMs']}ms (budget {max_import_ms}ms)")
+    return problems
+
+
+def print_table(results):
+    """Print results as a fixed-width table."""
+    print(f"{'Function':<28}{'Import ms':>10}{'Init calls':>12}{'Invoke ms':>11}{'Invoke calls':>14}  Notes")
+    print('-' * 100)
+    for result in results:
+        import_ms = '-' if result['importMs'] is None else f"{result['importMs']:.1f}"
+        invoke_ms = '-' if result['firstInvokeMs'] is None else f"{result['firstInvokeMs']:.1f}"
+        notes = ', '.join(result['initHeavyModules'])
+        if result['error']:
+            notes = f"{notes}; {result['error']}" if notes else result['error']
+        print(f"{result['function']:<28}{import_ms:>10}{len(result['initAwsCalls']):>12}"
+              f"{invoke_ms:>11}{result['invokeAwsCalls']:>14}  {notes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Lambda cold-start cost with stubbed AWS endpoints')
+    parser.add_argument('functions', nargs='*', help='Functions to measure (default: all)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--strict', action='store_true',
+                        help='Exit non-zero on init-phase AWS calls, heavy imports or a blown import budget')
+    parser.add_argument('--max-import-ms', type=float, help='Import time budget per function')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(RESULT_MARKER + json.dumps(measure_function(args.child)))
+        return
+
+    available = list_functions()
+    unknown = [name for name in args.functions if name not in available]
+    if unknown:
+        print(f"Unknown function(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+        sys.exit(2)
+
+    results = [run_isolated(name) for name in (args.functions or available)]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    problems = find_regressions(results, args.max_import_ms)
+    if problems:
+        print("\nInit-phase budget violations:")
+        for problem in problems:
+            print(f"  - {problem}")
+        if args.strict:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -89,6 +89,20 @@ export const getServerUsers = /* GraphQL */ `
   }
 `;
 
+export const getServerUsersPage = /* GraphQL */ `
+  query GetServerUsersPage($instanceId: String!, $limit: Int, $nextToken: String) {
+    getServerUsersPage(instanceId: $instanceId, limit: $limit, nextToken: $nextToken) {
+      items {
+        id
+        email
+        fullName
+        role
+      }
+      nextToken
+    }
+  }
+`;
+
 export const getAdminUsers = /* GraphQL */ `
   query GetAdminUsers {
     getAdminUsers {
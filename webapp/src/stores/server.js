@@ -89,9 +89,10 @@ export const useServerStore = defineStore("server", {
       
       console.log('Processing metrics for', serverId, { cpuValues, memValues, netValues, activeUsers: m.activeUsers })
       
-      // Get latest value for current metrics
-      const latestCpu = cpuValues.length ? cpuValues[cpuValues.length - 1] : 0
-      const latestMem = memValues.length ? memValues[memValues.length - 1] : 0
+      // Deltas only carry new datapoints, so keep the previous value for an empty series
+      const previous = m.isDelta ? this.serverMetrics[serverId] : null
+      const latestCpu = cpuValues.length ? cpuValues[cpuValues.length - 1] : (previous?.cpuStats ?? 0)
+      const latestMem = memValues.length ? memValues[memValues.length - 1] : (previous?.memStats ?? 0)
       
       this.serverMetrics = {
         ...this.serverMetrics,
@@ -104,8 +105,10 @@ export const useServerStore = defineStore("server", {
         }
       }
       
-      // Update history - only add if we have new values
-      const oldHistory = this.metricsHistory[serverId] || { cpu: [], mem: [], net: [], players: [] }
+      // Deltas append to the history; a full push (isDelta false) replaces it
+      const oldHistory = m.isDelta === false
+        ? { cpu: [], mem: [], net: [], players: [] }
+        : this.metricsHistory[serverId] || { cpu: [], mem: [], net: [], players: [] }
       
       if (cpuValues.length > 0 || memValues.length > 0 || netValues.length > 0) {
         this.metricsHistory = {